@@ -0,0 +1,127 @@
+#! /usr/bin/env python
+""" Simulate only as many seeds as the averages need.
+
+The seed simulations of each <road>_<traffic> group are released in rounds:
+first min_seeds, then round_seeds more each time all released seeds of the
+group are simulated, until the 95% confidence interval of every key metric
+(see seed_stats.KEY_METRICS) is within tolerance of its mean or no seeds are
+left. Each OUT file is read as it arrives, so the remaining seeds of a
+converged group are never simulated. OUT files already simulated (or
+restored from the run cache) count towards the first round, so a group may
+converge without simulating any seeds.
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+from collections import OrderedDict, deque
+import os
+import outfile
+
+
+MIN_SEEDS = 3
+ROUND_SEEDS = 2
+TOLERANCE = 0.05                        # Fraction of the mean
+
+
+def group_name(road, traffic):
+    """ Return <road>_<traffic> name of seed simulation without _seed<n> """
+    return (os.path.splitext(os.path.basename(road))[0] + '_' +
+            os.path.basename(traffic).split('_seed')[0])
+
+
+class SeedRounds(object):
+    """ Iterator of the (road, traffic) jobs released so far.
+
+    Call done() with the simon_run Result of each job, which may release
+    more jobs. The iterator stops when no job is released, until done()
+    releases more. existing is {(road, traffic): OUT filename} of jobs
+    already simulated, not in jobs. messages has the text of groups
+    converged on their existing OUT files.
+    """
+
+    def __init__(self, jobs, tolerance=TOLERANCE, min_seeds=MIN_SEEDS,
+                 round_seeds=ROUND_SEEDS, existing=None):
+        self.tolerance = tolerance
+        self.round_seeds = round_seeds
+        self._groups = OrderedDict()    # name: jobs not yet released
+        for road, traffic in jobs:
+            self._groups.setdefault(group_name(road, traffic),
+                                    []).append((road, traffic))
+        self._results = dict((name, []) for name in self._groups)
+        self._running = dict((name, 0) for name in self._groups)
+        self._released = deque()
+        self.skipped = 0
+        self.messages = []
+        for (road, traffic), filename in sorted((existing or {}).items()):
+            name = group_name(road, traffic)
+            if name in self._results:
+                self._read(name, filename)
+        # First round in job order, less the OUT files of each group
+        first = set()
+        for name in self._groups:
+            first.update(self._groups[name][:max(
+                0, min_seeds - len(self._results[name]))])
+        self._release(job for job in jobs if job in first)
+        for name in self._groups:
+            if not self._running[name]:
+                message = self._next_round(name)
+                if message:
+                    self.messages.append(message)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self._released:
+            raise StopIteration
+        return self._released.popleft()
+
+    def _release(self, jobs):
+        """ Release jobs to the iterator """
+        for road, traffic in jobs:
+            name = group_name(road, traffic)
+            self._groups[name].remove((road, traffic))
+            self._running[name] += 1
+            self._released.append((road, traffic))
+
+    def _read(self, name, filename):
+        """ Add OutFile of filename to the results of group name """
+        try:
+            self._results[name].append(outfile.read(filename))
+        except (IOError, OSError, ValueError):
+            pass                        # Left to avg_seeds.py to report
+
+    def done(self, result):
+        """ Read OUT file of finished job, return text if its group is
+        finished early, else None """
+        name = group_name(result.road, result.traffic)
+        self._running[name] -= 1
+        if result.passed:
+            self._read(name, result.outfile)
+        if self._running[name]:
+            return None
+        return self._next_round(name)
+
+    def _next_round(self, name):
+        """ Release next round of group name, none if converged.
+
+        Returns text if the group converged, else None.
+        """
+        if not self._groups[name]:
+            return None
+        results = self._results[name]
+        if len(results) > 1:
+            import seed_stats           # numpy only once seeds are compared
+            stats = seed_stats.statistics(seed_stats.stack(results))
+            if seed_stats.converged(stats, self.tolerance):
+                skipped = len(self._groups[name])
+                self.skipped += skipped
+                del self._groups[name][:]
+                return ("%s converged after %i seeds (%s) - %i seeds not"
+                        " simulated" % (name, len(results), ', '.join(
+                            "%s +/-%.1f%%" % (metric, 100 * value) for
+                            metric, value in seed_stats.precision(stats)),
+                            skipped))
+        self._release(self._groups[name][:self.round_seeds])
+        return None
@@ -1,292 +1,494 @@
 #! /usr/bin/env python
 """ Make standard average output sheets from Trarr simulations.
 
+Only option groups with added, removed or changed seed files since the last
+run are averaged again, see avg_seeds.manifest. Seed files archived by
+out_archive.py are read from their summary or compressed files.
+
 By Neale Irons version 06/04/2019 (CC BY-SA 4.0)
 todo: resize and centre columns, font to Arial 10
 """
 
 from __future__ import print_function
-from itertools import tee, zip_longest
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font
-from openpyxl.styles import Font, colors
 from openpyxl.utils import column_index_from_string
-from sys import argv
+from collections import OrderedDict
 import argparse
-import fnmatch
+import concurrent.futures
 import glob
+import hashlib
+import json
+from instrument import file_size, stage
 import openpyxl
 import os
 import sys
+import tempfile
+import outfile
+import out_archive
+import results_store
+import seed_stats
+from run_cache import file_hashcode
+
+
+BLOCK_DATA_ROWS = outfile.BLOCK_DATA_ROWS
+BLOCK_LAYOUT_ROWS = 13
+INDICIES = outfile.INDICIES
+# Blocks in outfile.BLOCKS order
+#      ['col_hdr',         'out_col', 'av_col]
+BLK = [['Direction 1',     'R',       'H'],
+       ['Direction 2',     'AI',      'O'],
+       ['Both Directions', 'A',       'A']]
+#      ['unimpeded_speed', 'F']
+#      ['Seed',            'A']
+
+COL_HDR = [['Vehicle Category'],
+           ['Travel Time (sec)'],
+           ['Speed (km/hr)'],
+           ['Petrol Cons ML'],
+           ['Diesel Cons ML'],
+           ['% Time Spent Foll'],
+           ['Flow (v/hr)'],
+           ['LOS']]
+
+ROW_HDR = [['Length (m)'],
+           ['Cars'],
+           ['Cars Towing'],
+           ['Rigids'],
+           ['Single Artics'],
+           ['Double Artics'],
+           ['Road Trains'],
+           ['All'],
+           ['All Vehicle Averages'],
+           ['Speed'],
+           ['PTSF'],
+           ['Unimpeded Speed'],
+           ['HCM Highway Class'],
+           ['If Class I Hwy'],
+           ['If Class II Hwy'],
+           ['If Class III Hwy']]
+
+MANIFEST = 'avg_seeds.manifest'
+AVERAGES = '_AVERAGES.xls'
+
+BOLD = Font(bold=True)
+GREY = Font(color="FF969696")
 
 
 def usage():
-    """ Display usage information """
+    """ Return command line parser """
     parser = argparse.ArgumentParser(description=
             "Make standard excel average sheets from Trarr output files.",
             epilog=' eg: avg_seed HW2S3*')
     parser.add_argument('filename', nargs='?',
                         help='full or part file specification (default: all)')
-    args = parser.parse_args()
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of option groups to average at once'
+                             ' (default: 1)')
+    parser.add_argument('--force', action='store_true',
+                        help='Average all option groups, changed or not')
+    parser.add_argument('--store', default=None,
+                        help='Also save seed results to a .parquet, .feather'
+                             ' or .csv file (csv if pyarrow is missing)')
+    return parser
 
 
-def finalise_sheet(wb, output, nfile, length, sum_unimpeded_speed, basefile):
+def finalise_sheet(wb, results, length, sum_unimpeded_speed, basefile):
     """ Calculate averages and write file """
-    output, unimpeded_speed = calculate_averages(output, nfile,
-                                                 sum_unimpeded_speed)
-    write_average_sheet(wb, output, nfile, length, unimpeded_speed)
-    wb.save(str(basefile) + '_AVERAGES.xls')
+    with stage('aggregate', basefile, items=len(results)):
+        values = seed_stats.stack(results)
+        output, unimpeded_speed = calculate_averages(values, len(results),
+                                                     sum_unimpeded_speed)
+        stats = seed_stats.statistics(values)
+    write_average_sheet(wb, output, len(results), length, unimpeded_speed)
+    write_stats_sheet(wb, stats)
+    filename = str(basefile) + AVERAGES
+    with stage('wb.save', filename) as timing:
+        wb.save(filename)
+        timing.add(bytes_written=file_size(filename))
 
 
-def calculate_averages(output, nfile, sum_unimpeded_speed):
+def calculate_averages(values, nfile, sum_unimpeded_speed):
     """ Average output and unimpeded speed """
-    # Divide array_sum by number seed files
-    for i in range(len(BLK)):
-        for j in range(BLOCK_DATA_ROWS - 2):
-            for k in range(len(INDICIES)):
-                if output[0][i][j][k] > 0:
-                    output[0][i][j][k] = round(output[0][i][j][k] /
-                                            output[1][i][j][k], 1)
-                # print(output[0][i][j][k], end = " ")    # Debug
-            # print()                                     # Debug
+    # Divide sum of seed values by number of positive values
+    output = seed_stats.averages(values).tolist()
     unimpeded_speed = round(sum_unimpeded_speed / nfile, 1)
     return(output, unimpeded_speed)
 
 
+def styled(ws, value, font):
+    """ Return write-only cell with shared font """
+    cell = WriteOnlyCell(ws, value=value)
+    cell.font = font
+    return cell
+
+
+class RowWriter(object):
+    """ Append rows of {column: value} to a write-only worksheet in order.
+
+    Skipped rows are written blank.
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.row = 0
+
+    def write(self, row, cells):
+        while self.row < row - 1:
+            self.ws.append([])
+            self.row += 1
+        values = [None] * max(cells or [0])
+        for col, value in cells.items():
+            values[col - 1] = value
+        self.ws.append(values)
+        self.row = row
+
+    def write_cells(self, cells):
+        """ Write {(row, column): value} cells """
+        rows = OrderedDict()
+        for (row, col) in sorted(cells):
+            rows.setdefault(row, {})[col] = cells[row, col]
+        for row, values in rows.items():
+            self.write(row, values)
+
+
 def write_average_sheet(wb, output, nfile, length, unimpeded_speed):
     """ Write summary sheet in compatible format """
     ws = wb.create_sheet("Average")
-    for sheet in range(len(wb.sheetnames)):
-        if wb.sheetnames[sheet] == "Average":
-            break
-    wb.active = sheet
-    ws['A2'] = nfile
-    ws['A2'].font = Font(bold=True)
-    ws['B2'] = "Seed files averaged"
-    ws['B2'].font = Font(bold=True)
-    ws['A5'] = ROW_HDR[0][0]
-    ws['B5'] = length
+    wb.active = wb.sheetnames.index("Average")
+    cells = {}
+    cells[2, 1] = styled(ws, nfile, BOLD)
+    cells[2, 2] = styled(ws, "Seed files averaged", BOLD)
+    cells[5, 1] = ROW_HDR[0][0]
+    cells[5, 2] = length
 
     # For each block
     for bidx in range(len(BLK)):
         # Upper block
         row = 9
-        xcol = column_index_from_string(BLK[bidx][4])
-        ws.cell(row=row, column=xcol).value = BLK[bidx][0]
-        ws.cell(row=row, column=xcol).font = Font(bold=True)
+        xcol = column_index_from_string(BLK[bidx][2])
+        cells[row, xcol] = styled(ws, BLK[bidx][0], BOLD)
         row += 1
         # Column headings
         for col in range(0, 6):
-            ws.cell(row=row, column=xcol + col).value = COL_HDR[col][0]
+            cells[row, xcol + col] = COL_HDR[col][0]
         # Row details
         xrow = 10
         for row in range(1, 8):
             idx = 0
-            ws.cell(row=xrow + row, column=xcol + idx).value = ROW_HDR[row][0]
+            cells[xrow + row, xcol + idx] = ROW_HDR[row][0]
             # Selected columns from array
             for col in (2, 4, 12, 13, 6):
                 idx += 1
-                # print(bidx, xrow, row, xcol, col)  # Debug
-                ws.cell(row=xrow + row,
-                        column=xcol + idx).value = output[0][bidx][row][col-1]
+                cells[xrow + row, xcol + idx] = output[bidx][row][col-1]
         # Lower block
         xrow = 19
-        ws.cell(row=xrow, column=xcol).value = COL_HDR[0][0]
-        ws.cell(row=xrow, column=xcol + 1).value = COL_HDR[6][0]
+        cells[xrow, xcol] = COL_HDR[0][0]
+        cells[xrow, xcol + 1] = COL_HDR[6][0]
         for row in range(1, 8):
-            ws.cell(row=xrow + row, column=xcol).value = ROW_HDR[row][0]
-            ws.cell(row=xrow + row,
-                    column=xcol + 1).value = round(output[0][bidx][row][15-1])
+            cells[xrow + row, xcol] = ROW_HDR[row][0]
+            cells[xrow + row, xcol + 1] = round(output[bidx][row][15-1])
 
     # Footer details
     xrow = 29
     for row in range(0, 8):
-        ws.cell(row=xrow + row, column=2).value = ROW_HDR[row + 8][0]
+        cells[xrow + row, 2] = ROW_HDR[row + 8][0]
         if row == 0:
-            ws.cell(row=xrow + row, column=2).font = Font(bold=True)
+            cells[xrow + row, 2] = styled(ws, ROW_HDR[row + 8][0], BOLD)
         elif row == 1:
-            ws.cell(row=xrow + row, column=3).value = "=C17"
-            ws.cell(row=xrow + row, column=4).value = "=IF(C30>90,1,IF(C30>80,2,IF(C30>70,3,IF(C30>60,4,5))))"
-            ws.cell(row=xrow + row, column=4).font = Font(color="FF969696")
+            cells[xrow + row, 3] = "=C17"
+            cells[xrow + row, 4] = styled(ws, "=IF(C30>90,1,IF(C30>80,2,IF(C30>70,3,IF(C30>60,4,5))))", GREY)
         elif row == 2:
-            ws.cell(row=xrow + row, column=3).value = "=F17"
-            ws.cell(row=xrow + row, column=4).value = "=IF(C31>80,5,IF(C31>65,4,IF(C31>50,3,IF(C31>35,2,1))))"
-            ws.cell(row=xrow + row, column=4).font = Font(color="FF969696")
+            cells[xrow + row, 3] = "=F17"
+            cells[xrow + row, 4] = styled(ws, "=IF(C31>80,5,IF(C31>65,4,IF(C31>50,3,IF(C31>35,2,1))))", GREY)
         elif row == 3:
-            ws.cell(row=xrow + row, column=3).value = unimpeded_speed
-            ws.cell(row=xrow + row, column=4).value = "=MAX(D30:D31)"
-            ws.cell(row=xrow + row, column=4).font = Font(color="FF969696")
+            cells[xrow + row, 3] = unimpeded_speed
+            cells[xrow + row, 4] = styled(ws, "=MAX(D30:D31)", GREY)
             xrow += 2  # Blank rows
         elif row == 4:
-            ws.cell(row=xrow + row, column=2).font = Font(bold=True)
-            ws.cell(row=xrow + row, column=3).value = COL_HDR[7][0]
-            ws.cell(row=xrow + row, column=3).font = Font(bold=True)
+            cells[xrow + row, 2] = styled(ws, ROW_HDR[row + 8][0], BOLD)
+            cells[xrow + row, 3] = styled(ws, COL_HDR[7][0], BOLD)
         elif row == 5:
-            ws.cell(row=xrow + row, column=3).value = '=IF(D32=1,"A",IF(D32=2,"B",IF(D32=3,"C",IF(D32=4,"D","E"))))'
+            cells[xrow + row, 3] = '=IF(D32=1,"A",IF(D32=2,"B",IF(D32=3,"C",IF(D32=4,"D","E"))))'
         elif row == 6:
-            ws.cell(row=xrow + row, column=3).value = '=IF(C31>85,"E",IF(C31>70,"D",IF(C31>55,"C",IF(C31>40,"B","A"))))'
+            cells[xrow + row, 3] = '=IF(C31>85,"E",IF(C31>70,"D",IF(C31>55,"C",IF(C31>40,"B","A"))))'
         elif row == 7:
-            ws.cell(row=xrow + row, column=3).value = '=IF(C32>91.7,"A",IF(C32>83.3,"B",IF(C32>75,"C",IF(C32>66.7,"D","E"))))'
+            cells[xrow + row, 3] = '=IF(C32>91.7,"A",IF(C32>83.3,"B",IF(C32>75,"C",IF(C32>66.7,"D","E"))))'
+    RowWriter(ws).write_cells(cells)
+
+
+def write_stats_sheet(wb, stats):
+    """ Write variability of seed outputs for each block and vehicle """
+    ws = wb.create_sheet("Seed_Stats")
+    ws.append([styled(ws, "Variability across seeds of positive values",
+                      BOLD)])
+    # Precision of key metrics, as used by simon_run.py --adaptive
+    precision = ["%s +/-%.1f%%" % (name, 100 * value)
+                 for name, value in seed_stats.precision(stats)
+                 if value == value]
+    ws.append(["Precision of %s %s: %s" % (BLK[seed_stats.KEY_BLOCK][0],
+               ROW_HDR[seed_stats.KEY_ROW][0], ', '.join(precision) or
+               "not known for one seed")])
+    headings = ['Block', COL_HDR[0][0], 'Measure', 'Seeds', 'Mean',
+                'Std Dev', 'Min', 'Max', '95% CI +/-', '95% CI % of Mean']
+    ws.append([styled(ws, heading, BOLD) for heading in headings])
+    relative = seed_stats.relative_ci(stats) * 100
+    for bidx in range(len(BLK)):
+        for row in range(1, 8):
+            # Selected columns from array
+            for idx, col in enumerate((2, 4, 12, 13, 6, 15), start=1):
+                values = [BLK[bidx][0], ROW_HDR[row][0], COL_HDR[idx][0],
+                          int(stats.count[bidx, row, col-1])]
+                for stat in (stats.mean, stats.std, stats.min, stats.max,
+                             stats.ci, relative):
+                    value = float(stat[bidx, row, col-1])
+                    values.append(round(value, 2) if value == value  # Not nan
+                                  else None)
+                ws.append(values)
+
+
+def group_files(pattern):
+    """ Return OUT files, archived or not, matching pattern grouped by
+    basefile """
+    groups = OrderedDict()
+    for file in out_archive.out_names(pattern, os.listdir('.')):
+        groups.setdefault(str(file.split('_seed')[0]), []).append(file)
+    return groups
+
+
+def result_digest(result):
+    """ Return hashcode of the OutFile values and fields averaged, the same
+    whether read from the OUT file or its archive """
+    digest = hashlib.md5(repr((result.seed, result.length,
+                               result.unimpeded_speed)).encode())
+    digest.update(result.values.tobytes())
+    for block in result.lines:
+        for line in block:
+            digest.update(b'\0'.join(outfile.fields(line)) + b'\n')
+    return digest.hexdigest()
+
+
+def file_entry(file):
+    """ Return manifest entry of file size, time and hashcode """
+    stored = out_archive.stored_name(file)
+    stat = os.stat(stored)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime,
+            'md5': file_hashcode(stored)}
+
+
+def load_manifest():
+    """ Return manifest of seed files, option groups last averaged and the
+    option groups in each results store """
+    try:
+        with open(MANIFEST) as fp:
+            manifest = json.load(fp)
+    except (IOError, OSError, ValueError):
+        manifest = {}
+    manifest.setdefault('files', {})
+    manifest.setdefault('groups', {})
+    manifest.setdefault('stores', {})
+    return manifest
+
+
+def save_manifest(manifest):
+    """ Write manifest through a temporary file """
+    with tempfile.NamedTemporaryFile('w', dir='.', delete=False) as tmp:
+        json.dump(manifest, tmp, indent=1, sort_keys=True)
+    os.replace(tmp.name, MANIFEST)
+
+
+def group_changed(basefile, files, manifest):
+    """ Return True if seed files of group changed since manifest """
+    if manifest['groups'].get(basefile) != files or \
+            not os.path.isfile(basefile + AVERAGES):
+        return True
+    for file in files:
+        entry = manifest['files'].get(file)
+        stored = out_archive.stored_name(file)
+        stat = os.stat(stored)
+        if not entry:
+            return True
+        if entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime:
+            if entry['size'] != stat.st_size or \
+                    entry['md5'] != file_hashcode(stored):
+                # Archived (see out_archive.py) or changed
+                try:
+                    if entry.get('digest') != result_digest(
+                            out_archive.read(file)):
+                        return True
+                except ValueError:
+                    return True
+                entry.update(file_entry(file))
+            entry['mtime'] = stat.st_mtime     # Touched, not changed
+    return False
+
+
+def average_group(basefile, files, store=False):
+    """ Write _AVERAGES workbook for seed files of basefile.
+
+    Returns (error message or None, manifest file entries,
+    results store rows if store).
+    """
+    try:
+        entries = dict((file, file_entry(file)) for file in files)
+        with stage('average group', basefile, items=len(files)):
+            results = write_group(basefile, files)
+    except SystemExit as err:
+        return str(err.code), {}, []
+    except (IOError, OSError) as err:
+        return "Error writing %s - %s. Exiting..." % (basefile, err), {}, []
+    for file, result in zip(files, results):
+        entries[file]['digest'] = result_digest(result)
+    if store:
+        return None, entries, list(results_store.tidy_rows(basefile,
+                                                           results))
+    return None, entries, []
+
+
+def write_group(basefile, files):
+    """ Read seed files and write _AVERAGES workbook """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('Model_Output')
+    rows = RowWriter(ws)
+    # Get extra column offset for each block
+    xcols = [column_index_from_string(BLK[bidx][1])
+             for bidx in range(len(BLK))]
+    rows.write(3, dict((xcols[bidx], styled(ws, BLK[bidx][0], BOLD))
+                       for bidx in range(len(BLK))))
+    results = []
+    length = 0
+    sum_unimpeded_speed = 0.0
+
+    for file in files:
+        seed = int(str(file.split('_seed')[1].split('.')[0]))
+        if seed <= 0 or seed > 999999:
+            sys.exit("Invalid filename %s - seed must be between 0 and"
+                     " 999999. Exiting..." % file)
+        try:
+            with stage('parse OUT', file, bytes_read=file_size(
+                    out_archive.stored_name(file)), items=1):
+                result = out_archive.read(file)
+        except ValueError as err:
+            sys.exit("Invalid file %s - %s. Exiting..." % (file, err))
+        # Check seed
+        if seed != result.seed:
+            sys.exit("Filename %s does not contain seed %i."
+                     " Exiting..." % (file, result.seed))
+        if length == 0:
+            length = result.length
+        results.append(result)
+        # Get extra row offset for block
+        xrow = BLOCK_LAYOUT_ROWS * len(results)
+
+        # Write seed and unimpeded speed all
+        cells = dict((xcol, seed) for xcol in xcols)
+        cells[3] = "Unimpeded Speed All Vehicles"
+        cells[6] = result.unimpeded_speed
+        rows.write(xrow - 1, cells)
+        # Write each model output row line from blocks
+        for index in range(BLOCK_DATA_ROWS):
+            cells = {}
+            for bidx in range(len(BLK)):
+                fields = outfile.fields(result.lines[bidx][index])
+                for col, field in enumerate(fields):
+                    cells[col + xcols[bidx]] = field
+            rows.write(index + xrow, cells)
+        sum_unimpeded_speed += result.unimpeded_speed
+
+    # Calculate averages and write file
+    finalise_sheet(wb, results, length, sum_unimpeded_speed, basefile)
+    return results
+
+
+def record_groups(groups, outcomes, manifest):
+    """ Report outcomes of average_group in group order and record them in
+    manifest, return (number failed, groups averaged, store rows) """
+    failed = 0
+    averaged = []
+    rows = []
+    for basefile, (error, entries, group_rows) in zip(groups, outcomes):
+        print(basefile,)
+        if error:
+            failed += 1
+            print(error, file=sys.stderr)
+            manifest['groups'].pop(basefile, None)
+            continue
+        manifest['groups'][basefile] = groups[basefile]
+        manifest['files'].update(entries)
+        rows.extend(group_rows)
+        averaged.append(basefile)
+    return failed, averaged, rows
 
 
 def main():
 
-    global BLOCK_DATA_ROWS
-    global BLOCK_LAYOUT_ROWS
-    global INDICIES
-    global BLK
-    global COL_HDR
-    global ROW_HDR
-
-    BLOCK_DATA_ROWS = 10
-    BLOCK_LAYOUT_ROWS = 13
-    INDICIES = [0, 9, 17, 23, 33, 38, 46, 54, 65, 72, 82, 91, 100, 110, 119]
-    #      ['col_hdr',         'search',   'extra rows', 'out_col', 'av_col]
-    BLK = [['Direction 1',     b' DIR1',     2,           'R',       'H'],
-           ['Direction 2',     b' DIR2',     2,           'AI',      'O'],
-           ['Both Directions',
-                    b'          * INTERVAL', 3,           'A',       'A']]
-    #      ['unimpeded_speed', ' ** FREE',  13, 21:27,   'F']
-    #      ['Seed',            '_seed',     0,           'A']
-
-    COL_HDR = [['Vehicle Category'],
-               ['Travel Time (sec)'],
-               ['Speed (km/hr)'],
-               ['Petrol Cons ML'],
-               ['Diesel Cons ML'],
-               ['% Time Spent Foll'],
-               ['Flow (v/hr)'],
-               ['LOS']]
-
-    ROW_HDR = [['Length (m)'],
-               ['Cars'],
-               ['Cars Towing'],
-               ['Rigids'],
-               ['Single Artics'],
-               ['Double Artics'],
-               ['Road Trains'],
-               ['All'],
-               ['All Vehicle Averages'],
-               ['Speed'],
-               ['PTSF'],
-               ['Unimpeded Speed'],
-               ['HCM Highway Class'],
-               ['If Class I Hwy'],
-               ['If Class II Hwy'],
-               ['If Class III Hwy']]
-
-    dirlist = os.listdir('.')
+    parser = usage()
+    args = parser.parse_args()
     pattern = '*.OUT'
-    if len(argv) > 1:
+    if args.filename:
         # File integrity check
-        if next(glob.iglob(argv[1]), None):
-            pattern = argv[1] + '.OUT'
+        if next(glob.iglob(args.filename), None) or out_archive.out_names(
+                args.filename + '.OUT', os.listdir('.')):
+            pattern = args.filename + '.OUT'
         else:
-            if not '-h' in argv[1]:
-                print("File path %s does not exist." % argv[1])
-            usage()
+            print("File path %s does not exist." % args.filename)
+            parser.print_usage()
             sys.exit()
-    basefile = ""
-
-    for file in dirlist:
-        if fnmatch.fnmatch(file, pattern):
-            if not basefile or basefile != str(file.split('_seed')[0]):
-                if basefile and basefile != str(file.split('_seed')[0]):
-                    # Calculate averages and write file
-                    finalise_sheet(wb, output, nfile, length,
-                                   sum_unimpeded_speed, basefile)
-                wb = openpyxl.Workbook()
-                ws = wb.active
-                ws.title = 'Model_Output'
-                output = [[[[0.0 for i in range(len(INDICIES))]     # Data
-                             for j in range(BLOCK_DATA_ROWS - 2)]   # Dir
-                             for k in range(len(BLK))]              # Vehicle
-                             for n in range(2)]                     # Totals
-                nfile = 0
-                seed = ""
-                length = 0
-                sum_unimpeded_speed = 0.0
-                basefile = str(file.split('_seed')[0])
-                print(basefile,)
-            seed = int(str(file.split('_seed')[1].split('.')[0]))
-            if seed <= 0 or seed > 999999:
-                sys.exit("Invalid filename %s - seed must be between 0 and"
-                         " 999999. Exiting..." % file)
+    if args.jobs < 1:
+        sys.exit("Invalid number of jobs %i - must be at least 1. Exiting..."
+                 % args.jobs)
 
-            for bidx in range(len(BLK)):
-                # Get extra column offset for block
-                xcol = column_index_from_string(BLK[bidx][3])
-                ws.cell(row=3, column=xcol).value = BLK[bidx][0]
-                ws.cell(row=3, column=xcol).font = Font(bold=True)
-            df = file
-            with open(df, 'rb') as f:
-                nfile += 1
-                # Get extra row offset for block
-                xrow = BLOCK_LAYOUT_ROWS * nfile
-                # For each block ***
-                for bidx in range(len(BLK)):
-                    # print("Processing: ", nfile, BLK[bidx][0], xrow)  # Debug
-                    xcol = column_index_from_string(BLK[bidx][3])
-                    if not bidx:
-                        # Skip file header
-                        for index, line in enumerate(f):
-                            if index == 2:
-                                break
-                        # Check seed
-                        if seed != int(line.split(b'.')[0].split(b'_seed')[1]):
-                            print(seed,  int(line.split(b'.')[0].split(b'_seed')[1]))
-                            seed = line.split(b'.')[0].split(b'_seed')[1]
-                            sys.exit("Filename %s does not contain seed."
-                                     " Exiting..." % file)
-                    # Find block
-                    for index, line in enumerate(f):
-                        if line.startswith(BLK[bidx][1]):
-                            # print(length)
-                            if length == 0:
-                                length = (int(line.split(b'(')[1].split(b'.')[0]))
-                            break
-                    # Skip block header
-                    for line in range(BLK[bidx][2] - 1):
-                        next(f)
-                    # write seed
-                    ws.cell(row=xrow - 1, column=xcol).value = seed
-                    # Load each model output row line from block
-                    for index, line in enumerate(f):
-                        if index == BLOCK_DATA_ROWS:
-                            break
-                        start, end = tee(INDICIES)
-                        next(end)
-                        line = line.rstrip(b'\r\n')
-                        fields = [line[i:j].strip(b' ') for i, j in zip_longest(start, end)]
-
-                        for col, field in enumerate(fields, start=0):
-                            ws.cell(row=index + xrow, column=col + xcol).value = field
-                        if index > 2:  # Number of header lines - 1
-                            for k in range(1, len(INDICIES)):  # Data for each field
-                                if fields[k] != b'':
-                                    output[0][bidx][index-2][k] += float(fields[k])
-                                    if float(fields[k]) > 0:
-                                        output[1][bidx][index-2][k] += 1
-
-                # Find unimpeded speed all
-                for index, line in enumerate(f):
-                    if line.startswith(b' ** FREE'):
-                        break
-                # Skip block header
-                for index, line in enumerate(f):
-                    if index == 12:
-                        break
-                # Write
-                ws.cell(row=xrow - 1, column=3).value = "Unimpeded Speed All Vehicles"
-                ws.cell(row=xrow - 1, column=6).value = float(line[20:26])
-                sum_unimpeded_speed += float(line[20:26])
-
-    # Last file
-    if basefile:
-        finalise_sheet(wb, output, nfile, length, sum_unimpeded_speed,
-                       basefile)
-        print(" done.")
-    else:
+    groups = group_files(pattern)
+    if not groups:
         print(" No files matched - none processed.")
+        return
+
+    manifest = load_manifest()
+    changed = set(basefile for basefile, files in groups.items()
+                  if group_changed(basefile, files, manifest))
+    # Rows in results stores are of the old seed files
+    for options in manifest['stores'].values():
+        options[:] = [option for option in options if option not in changed]
+    store = fmt = None
+    stored = groups
+    if args.store:
+        store, fmt = results_store.store_format(args.store)
+        if not os.path.isfile(store):
+            manifest['stores'].pop(store, None)     # Deleted since
+        stored = manifest['stores'].get(store, [])
+    unchanged = [basefile for basefile in groups if not args.force and
+                 basefile not in changed and basefile in stored]
+    for basefile in unchanged:
+        print(basefile, "unchanged")
+        del groups[basefile]
+
+    try:
+        if args.jobs == 1:
+            failed, averaged, rows = record_groups(groups, (
+                average_group(basefile, files, bool(store))
+                for basefile, files in groups.items()), manifest)
+        else:
+            with concurrent.futures.ProcessPoolExecutor(args.jobs) as \
+                    executor:
+                failed, averaged, rows = record_groups(groups, executor.map(
+                    average_group, groups.keys(), groups.values(),
+                    [bool(store)] * len(groups)), manifest)
+        if store and rows:
+            print("Results saved in", results_store.update(store, fmt,
+                                                           rows))
+            manifest['stores'][store] = sorted(set(
+                manifest['stores'].get(store, []) + averaged))
+        elif store and os.path.isfile(store):
+            print("Results in %s unchanged." % store)
+        elif store:
+            print("No results to save - %s not written." % store)
+    finally:
+        save_manifest(manifest)
+
+    if failed:
+        sys.exit("%i of %i option groups failed. Exiting..."
+                 % (failed, len(groups)))
+    print(" done.")
 
 
 if __name__ == '__main__':
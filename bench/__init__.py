@@ -0,0 +1,8 @@
+""" Benchmarks of the Simon scripts on synthetic Trarr files.
+
+synth.py makes format valid ROD, OUT, TRF template and TRFdata workbook files
+at any scale and run.py times option_editor.py, make_trf.py and avg_seeds.py
+on them, eg: python -m bench.run --baseline bench/baseline.json
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
@@ -0,0 +1,95 @@
+#! /usr/bin/env python
+""" Check the import time of the Simon scripts against budgets.
+
+Each module is imported in a new Python process with -X importtime and the
+best cumulative time of --repeat runs kept, as batch files calling simon
+many times pay it on every call. Modules that must start without a heavy
+dependency are checked not to import it, eg:
+    python -m bench.imports
+    python -m bench.imports --factor 2
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+import argparse
+import subprocess
+import sys
+
+
+#          [module,          budget ms, heavy modules not imported]
+BUDGETS = [['simon',          10,  ['openpyxl', 'numpy', 'argparse']],
+           ['instrument',     10,  ['cProfile', 'json']],
+           ['option_editor',  80,  ['openpyxl', 'numpy', 'argparse',
+                                    'hashlib']],
+           ['simon_run',      100, ['openpyxl', 'numpy']],
+           ['trarr_stub',     80,  ['openpyxl', 'numpy']]]
+HEAVY_CHECK = ("import sys, %s; print(' '.join(name for name in %r"
+               " if name in sys.modules))")
+
+
+def usage():
+    """ Return command line parser """
+    parser = argparse.ArgumentParser(description=
+            "Check the import time of the Simon scripts against budgets.",
+            epilog=' eg: python -m bench.imports --factor 2')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Imports of each module, best is kept'
+                             ' (default: 5)')
+    parser.add_argument('--factor', type=float, default=1.0,
+                        help='Budget multiplier for slow machines'
+                             ' (default: 1)')
+    return parser
+
+
+def import_ms(module):
+    """ Return cumulative milliseconds to import module in a new process """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                              'import ' + module], stderr=subprocess.PIPE,
+                             universal_newlines=True)
+    if process.returncode:
+        sys.exit("Import of %s failed:\n%s Exiting..." % (module,
+                                                           process.stderr))
+    for line in reversed(process.stderr.splitlines()):
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1000.0
+    sys.exit("No import time of %s. Exiting..." % module)
+
+
+def heavy_imports(module, heavy):
+    """ Return list of heavy modules imported with module """
+    output = subprocess.check_output([sys.executable, '-c', HEAVY_CHECK
+                                      % (module, tuple(heavy))],
+                                     universal_newlines=True)
+    return output.split()
+
+
+def main():
+
+    args = usage().parse_args()
+    if args.repeat < 1 or args.factor <= 0:
+        sys.exit("Repeat must be at least 1 and factor positive. Exiting...")
+
+    failed = []
+    print("%-16s %10s %10s  %s" % ('Module', 'Budget ms', 'Import ms',
+                                   'Heavy imports'))
+    for module, budget, heavy in BUDGETS:
+        budget *= args.factor
+        best = min(import_ms(module) for run in range(args.repeat))
+        imported = heavy_imports(module, heavy)
+        status = ''
+        if best > budget or imported:
+            status = ' OVER BUDGET' if best > budget else ' HEAVY IMPORT'
+            failed.append(module)
+        print("%-16s %10.1f %10.1f  %s%s" % (module, budget, best,
+              ', '.join(imported) or '-', status))
+
+    if failed:
+        sys.exit("%i of %i modules failed. Exiting..."
+                 % (len(failed), len(BUDGETS)))
+    print(" done.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+#! /usr/bin/env python
+""" Time the Simon scripts on synthetic files and report regressions.
+
+Each benchmark makes its files in a temporary directory (see synth.py), runs
+the script functions in this process and keeps the best time per item of
+--repeat runs. Results can be saved as a baseline and later runs compared
+with it, eg:
+    python -m bench.run --save bench/baseline.json
+    python -m bench.run --baseline bench/baseline.json
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+from collections import OrderedDict
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import avg_seeds
+import make_trf
+import option_editor
+from bench import synth
+from trf_template import TrfTemplate
+
+
+STUDY = 'proj'
+OPTION_LENGTH_KM = 1.5
+
+
+def usage():
+    """ Return command line parser """
+    parser = argparse.ArgumentParser(description=
+            "Time the Simon scripts on synthetic Trarr files.",
+            epilog=' eg: python -m bench.run --baseline bench/baseline.json')
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help='Benchmarks to run (default: all of %s)'
+                             % ', '.join(BENCHMARKS))
+    parser.add_argument('--scale', type=int, default=1,
+                        help='File count and size multiplier (default: 1)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Runs of each benchmark, best is kept'
+                             ' (default: 5)')
+    parser.add_argument('--baseline', default=None,
+                        help='Baseline results file to compare with')
+    parser.add_argument('--save', default=None,
+                        help='Save results as a baseline file')
+    parser.add_argument('--tolerance', type=float, default=10.0,
+                        help='Slow down reported as a regression, percent'
+                             ' (default: 10)')
+    return parser
+
+
+def timed(function, *args):
+    """ Return seconds to call function """
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def option_editor_bench(scale):
+    """ Return (seconds, options) to make overtaking lane options """
+    nrecs = 2500 * scale
+    road = synth.write_road('R001', nrecs)
+    options = 100 * scale
+    step_km = (nrecs * 0.1 - OPTION_LENGTH_KM) / options
+    sources = {}
+
+    def make_options():
+        for number in range(options):
+            start_km = round(number * step_km, 1)
+            option_editor.make_option(
+                ['option_editor.py', road, str(start_km),
+                 str(start_km + OPTION_LENGTH_KM), 'PCB'[number % 3],
+                 'R001_OT%03i.ROD' % number, "Option %i" % number], sources)
+        for rod in sources.values():
+            rod.close()
+
+    return timed(make_options), options
+
+
+def make_trf_bench(scale):
+    """ Return (seconds, columns) to make the TRF files of each column """
+    names = synth.traffic_names(40 * scale)
+    synth.write_template('../template.TRF')
+    workbook = synth.write_workbook('TrarrSetupTRF.xlsx', names)
+
+    def make_columns():
+        template = TrfTemplate.from_file('../template.TRF')
+        for col, column in make_trf.traffic_columns(
+                make_trf.read_columns(workbook)):
+            make_trf.write_traff_files(column, template)
+
+    return timed(make_columns), len(names)
+
+
+def avg_seeds_bench(scale):
+    """ Return (seconds, groups) to average option groups of 10 seeds """
+    groups = ['R%03i_T001' % number for number in range(1, 4 * scale + 1)]
+    seeds = [1001 + 7 * seed for seed in range(10)]
+    files = dict((basefile, synth.write_outs(basefile, seeds))
+                 for basefile in groups)
+
+    def average_groups():
+        for basefile in groups:
+            error, entries, rows = avg_seeds.average_group(basefile,
+                                                           files[basefile])
+            if error:
+                raise RuntimeError(error)
+
+    return timed(average_groups), len(groups)
+
+
+BENCHMARKS = OrderedDict([('option_editor', option_editor_bench),
+                          ('make_trf', make_trf_bench),
+                          ('avg_seeds', avg_seeds_bench)])
+
+
+def run_bench(name, scale, repeat):
+    """ Return best seconds per item of benchmark name """
+    best = None
+    cwd = os.getcwd()
+    for run in range(repeat):
+        directory = tempfile.mkdtemp(prefix='simon_bench_')
+        try:
+            os.makedirs(os.path.join(directory, STUDY))
+            os.chdir(os.path.join(directory, STUDY))
+            seconds, items = BENCHMARKS[name](scale)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(directory, ignore_errors=True)
+        if best is None or seconds / items < best:
+            best = seconds / items
+    return best
+
+
+def load_baseline(filename, scale):
+    """ Return results of baseline file """
+    if not os.path.isfile(filename):
+        sys.exit("File path %s does not exist. Exiting..." % filename)
+    with open(filename) as fp:
+        baseline = json.load(fp)
+    if baseline.get('scale') != scale:
+        print("Baseline scale %s differs from --scale %i - times per item"
+              " may not compare." % (baseline.get('scale'), scale))
+    return baseline['results']
+
+
+def report(results, baseline, tolerance):
+    """ Print results against baseline, return names of regressions """
+    regressed = []
+    print("%-16s %12s %12s %8s" % ('Benchmark', 'Baseline ms', 'Current ms',
+                                   'Change'))
+    for name, seconds in results.items():
+        if name not in baseline:
+            print("%-16s %12s %12.3f" % (name, '-', seconds * 1000))
+            continue
+        change = 100.0 * (seconds / baseline[name] - 1)
+        status = ''
+        if change > tolerance:
+            status = ' REGRESSION'
+            regressed.append(name)
+        print("%-16s %12.3f %12.3f %+7.1f%%%s" % (name, baseline[name] * 1000,
+              seconds * 1000, change, status))
+    return regressed
+
+
+def main():
+
+    args = usage().parse_args()
+    names = args.names or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            sys.exit("Benchmark %s is invalid, must be one of %s. Exiting..."
+                     % (name, ', '.join(BENCHMARKS)))
+    if args.scale < 1 or args.repeat < 1:
+        sys.exit("Scale and repeat must be at least 1. Exiting...")
+    baseline = {}
+    if args.baseline:
+        baseline = load_baseline(args.baseline, args.scale)
+
+    results = OrderedDict()
+    for name in names:
+        results[name] = run_bench(name, args.scale, args.repeat)
+    regressed = report(results, baseline, args.tolerance)
+
+    if args.save:
+        with open(args.save, 'w') as fp:
+            json.dump({'scale': args.scale, 'results': results}, fp,
+                      indent=1)
+        print("Baseline saved in", args.save)
+    if regressed:
+        sys.exit("%i of %i benchmarks regressed. Exiting..."
+                 % (len(regressed), len(results)))
+    print(" done.")
+
+
+if __name__ == '__main__':
+    main()
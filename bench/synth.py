@@ -0,0 +1,164 @@
+#! /usr/bin/env python
+""" Make synthetic, format valid Trarr files for benchmarks.
+
+Road (ROD, MLT, OBS) files have a 9 line header and one RECORD_SIZE record
+for each 0.1 km. OUT files have the seed in the header, DIR1, DIR2 and
+INTERVAL blocks at the INDICIES field offsets and a ** FREE block. TRFdata
+workbooks have one traffic column for each name at the make_trf.py rows.
+Values come from a random generator seeded by file name, so the same call
+always makes the same file. OUT values of one traffic vary a little between
+seeds, like Trarr results.
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+import os
+import random
+import outfile
+import rodfile
+
+
+NEWLINE = '\r\n'                        # Trarr files are made on Windows
+OUT_LENGTH_M = 12345.6
+FREE_LINES = 20
+SEED_SPREAD = 0.05                      # Standard deviation, fraction
+TEMPLATE_LINES = 60
+
+
+def road_record(km, newline=NEWLINE):
+    """ Return ROD record of chainage km without overtaking lanes """
+    width = rodfile.RECORD_SIZE - len(newline)
+    text = ("%*.3f" % (rodfile.CHAINAGE_WIDTH, km) + '   F    F     F    F')
+    return text.ljust(width, ' ')[:width] + newline
+
+
+def write_road(basename, nrecs, start_km=0.0, newline=NEWLINE):
+    """ Write basename .ROD, .MLT and .OBS files, return ROD filename """
+    with open(basename + '.ROD', 'w', newline='') as fp:
+        fp.write(basename + '.ROD' + newline)
+        fp.write("Synthetic road of %i records" % nrecs + newline)
+        for line in range(2, rodfile.HEADER_LINES):
+            fp.write("Header line %i" % line + newline)
+        for nrec in range(nrecs):
+            fp.write(road_record(start_km + nrec * rodfile.ODO_STEP_KM,
+                                 newline))
+    with open(basename + '.MLT', 'w', newline='') as fp:
+        fp.write(basename + '.MLT' + newline + "Multiple runs" + newline)
+    with open(basename + '.OBS', 'w', newline='') as fp:
+        fp.write("Observation points" + newline)
+    return basename + '.ROD'
+
+
+def block_line(rnd, label, base):
+    """ Return OUT block line of vehicle label and random field values.
+
+    Values vary by SEED_SPREAD between seeds around the values of base.
+    """
+    widths = [stop - start for start, stop in
+              zip(outfile.INDICIES, outfile.INDICIES[1:])] + [8]
+    line = label[:widths[0]].ljust(widths[0])
+    for width in widths[1:]:
+        value = base.uniform(0.5, 150.0) * (1 + rnd.gauss(0, SEED_SPREAD))
+        if rnd.random() < 0.05:
+            line += ' ' * width                 # Blank field
+        else:
+            line += "%*.1f" % (width, max(value, 0.1))
+    return line
+
+
+def out_lines(name, seed, length_m=OUT_LENGTH_M):
+    """ Return list of OUT file lines of traffic name and seed """
+    rnd = random.Random("%s_seed%i" % (name, seed))
+    base = random.Random(name)
+    lines = ['1 TRARR SIMULATION', ' SYNTHETIC OUTPUT',
+             ' %s_seed%i.TRF' % (name, seed), '']
+    for search, extra_rows, block in outfile.BLOCKS:
+        lines.append(search.decode() + "   LENGTH (%.1f m)" % length_m)
+        lines.extend([' ' + '-' * 40] * (extra_rows - 1))
+        lines.extend([' Vehicle     Time     Speed', ' Category',
+                      ' ' + '-' * 40])
+        lines.extend(block_line(rnd, vehicle, base)
+                     for vehicle in outfile.VEHICLES)
+        lines.append('')
+    lines.append(outfile.FREE.decode() + ' FLOW SPEEDS')
+    for row in range(1, outfile.FREE_ROWS):
+        lines.append(' free speed row %i' % row)
+    speed = "%6.1f" % rnd.uniform(80.0, 110.0)
+    lines.append(' ALL VEHICLES'.ljust(outfile.FREE_SPEED.start) + speed)
+    lines.extend(' end of output %i' % row for row in range(FREE_LINES))
+    return lines
+
+
+def write_out(filename, name, seed, length_m=OUT_LENGTH_M, newline=NEWLINE):
+    """ Write OUT file of traffic name and seed, return filename """
+    with open(filename, 'w', newline='') as fp:
+        fp.write(newline.join(out_lines(name, seed, length_m)) + newline)
+    return filename
+
+
+def write_outs(basefile, seeds, length_m=OUT_LENGTH_M):
+    """ Write <basefile>_seed<n>.OUT of each seed, return filenames """
+    name = basefile.split('_')[-1]
+    return [write_out("%s_seed%i.OUT" % (basefile, seed), name, seed,
+                      length_m) for seed in seeds]
+
+
+def write_template(filename, nlines=TEMPLATE_LINES):
+    """ Write TRF template with value slots at the trf_template lines """
+    with open(filename, 'w') as fp:
+        for line in range(1, nlines + 1):
+            fp.write(("%8i" % 0) * 6 + "  TEMPLATE LINE %i\n" % line)
+
+
+def write_workbook(filename, names, enabled=None):
+    """ Write TRFdata workbook with one traffic column for each name.
+
+    The first enabled seeds of each column are enabled (all by default).
+    """
+    import openpyxl
+    import make_trf
+    import trf_template
+    enabled = make_trf.NO_SEEDS if enabled is None else enabled
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = make_trf.TRF_SHEET
+    ws.cell(row=1, column=1, value="Synthetic traffic")
+    for col, name in enumerate(names, start=make_trf.FIRST_TRAF_COL):
+        rnd = random.Random(name)
+        ws.cell(row=make_trf.TRF_NAME_ROW, column=col, value=name)
+        for row in range(len(trf_template.ITEMS)):
+            ws.cell(row=make_trf.ITEM_START_ROW + row, column=col,
+                    value=rnd.randint(1, 500))
+        for start in make_trf.CLASS_START_ROWS:
+            for row in range(start, start + make_trf.TRF_CLASSES):
+                ws.cell(row=row, column=col,
+                        value=round(rnd.uniform(0.0, 100.0), 2))
+        for seed in range(make_trf.NO_SEEDS):
+            ws.cell(row=make_trf.ENABLE_START_ROW + seed, column=col,
+                    value=1 if seed < enabled else 0)
+            ws.cell(row=make_trf.SEED_START_ROW + seed, column=col,
+                    value=1001 + 7 * seed)
+    wb.save(filename)
+    return filename
+
+
+def traffic_names(count, prefix='T'):
+    """ Return count traffic names """
+    return ["%s%03i" % (prefix, number) for number in range(1, count + 1)]
+
+
+def make_study(directory, nroads=1, nrecs=250, ntraffics=2, nseeds=5):
+    """ Make directory of road, template and TRFdata workbook files.
+
+    template.TRF is made in the parent of directory as make_trf.py expects.
+    Returns (list of road files, workbook filename).
+    """
+    os.makedirs(directory, exist_ok=True)
+    write_template(os.path.join(os.path.dirname(os.path.abspath(directory)),
+                                'template.TRF'))
+    roads = [write_road(os.path.join(directory, "R%03i" % number), nrecs)
+             for number in range(1, nroads + 1)]
+    workbook = write_workbook(os.path.join(directory, 'TrarrSetupTRF.xlsx'),
+                              traffic_names(ntraffics), enabled=nseeds)
+    return roads, workbook
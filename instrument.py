@@ -0,0 +1,113 @@
+#! /usr/bin/env python
+""" Timing and throughput trace of Simon stages.
+
+Set environment variable SIMON_TRACE to a filename to append one JSON line
+for each stage of each file: stage, file, process id, start time, wall, CPU
+and child process CPU seconds, bytes read and written and item counts. Lines
+are appended in one write each so processes of a pool can share the file.
+
+Set SIMON_PROFILE to a stage name (eg "parse OUT") to also save cProfile
+statistics of that stage, summed over the process, to
+<stage>.<process id>.prof (view with python -m pstats).
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+import os
+import time
+
+
+TRACE_ENV = 'SIMON_TRACE'
+PROFILE_ENV = 'SIMON_PROFILE'
+
+_profile = None                         # Profile of SIMON_PROFILE stage
+
+
+def file_size(filename):
+    """ Return size of filename, 0 if it does not exist """
+    try:
+        return os.path.getsize(filename)
+    except (OSError, TypeError):
+        return 0
+
+
+def child_cpu():
+    """ Return CPU seconds of finished child processes (0 on Windows) """
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+def write_trace(record):
+    """ Append record as one JSON line to SIMON_TRACE file """
+    import json
+    line = (json.dumps(record, sort_keys=True) + '\n').encode('utf-8')
+    fd = os.open(os.environ[TRACE_ENV],
+                 os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def profile_name(name):
+    """ Return cProfile statistics filename of stage name """
+    import re
+    return "%s.%i.prof" % (re.sub(r'\W+', '_', name), os.getpid())
+
+
+class Stage(object):
+    """ Time one stage of one file, use as a context manager.
+
+    Counts (bytes_read, bytes_written, items, ...) can be given at the start
+    or added with add() before the stage ends. Does nothing unless
+    SIMON_TRACE or SIMON_PROFILE is set.
+    """
+
+    def __init__(self, name, filename=None, **counts):
+        self.name = name
+        self.filename = filename
+        self.counts = counts
+        self.trace = bool(os.environ.get(TRACE_ENV))
+        self.profile = os.environ.get(PROFILE_ENV) == name
+
+    def add(self, **counts):
+        """ Add to stage counts """
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def __enter__(self):
+        global _profile
+        self.start = time.time()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.child_cpu = child_cpu()
+        if self.profile:
+            if _profile is None:
+                import cProfile
+                _profile = cProfile.Profile()
+            _profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.profile:
+            _profile.disable()
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        children = child_cpu() - self.child_cpu
+        if self.profile:
+            _profile.dump_stats(profile_name(self.name))
+        if self.trace:
+            record = {'stage': self.name, 'file': self.filename,
+                      'pid': os.getpid(), 'start': round(self.start, 6),
+                      'wall': round(wall, 6), 'cpu': round(cpu, 6),
+                      'child_cpu': round(children, 6),
+                      'ok': exc_type is None}
+            record.update(self.counts)
+            write_trace(record)
+        return False
+
+
+def stage(name, filename=None, **counts):
+    """ Return Stage context manager timing name of filename """
+    return Stage(name, filename, **counts)
@@ -4,20 +4,40 @@
 Program requires template.TFR in same directory and
  trf files created in same directory as trf_values workbook.
 
+The TRFdata sheet is read once, row by row in read-only mode, into a list of
+columns of cell values. Seed files of each column are rendered from the
+template read once (see trf_template.py). Columns can be made in parallel
+with --jobs. If columns have the same traffic name the last column is used.
+
 By Neale Irons version 30/05/2018 (CC BY-SA 4.0)
 """
 
 from __future__ import print_function
 import argparse
+import concurrent.futures
 import fnmatch
 import openpyxl
+from itertools import zip_longest
 import os
-import shutil
 import sys
 from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
 from shutil import move
 from sys import argv
+from instrument import file_size, stage
+from trf_template import ITEMS, TEMPLATE, TrfTemplate
+
+
+TRF_SHEET = 'TRFdata'
+TRF_NAME_ROW = 3
+FIRST_TRAF_COL = 3
+ITEM_START_ROW = 36
+TRF_CLASSES = 6
+CLASS_START_ROWS = [51, 59, 69]         # Rows of template CLASS_LINES
+NO_SEEDS = 10
+ENABLE_START_ROW = 77
+SEED_START_ROW = 88
+LAST_ROW = SEED_START_ROW + NO_SEEDS - 1
 
 
 def usage():
@@ -27,138 +47,153 @@ def usage():
             epilog=' eg: make_trf.py "Trarr trf Values Demo.xlsm"'
                    ' Filenames with spaces must be enclosed in quotes.')
     parser.add_argument('filename', help='Excel workbook to process')
-    args = parser.parse_args()
-
-
-def write_traff_files(ws, src_name, col):
-    """ Write traff files for each seed. """
-    TRF_NAME_ROW = 3
-    dst_basename = ws.cell(column=col, row=TRF_NAME_ROW).value  # Base f'name
-    print(dst_basename)
-    for seed in enabled_seeds(ws, col):
-        # print(seed)
-        dst_name = dst_basename + "_seed" + str(seed) + ".TRF"
-        with open(src_name) as src, open(dst_name, 'w') as dst:  # Temp file
-            templines = src.read().splitlines()
-            templines[0] = dst_name
-            padded_seed = "      " + str(seed)  # Works
-            templines[18] = padded_seed[-6:] + templines[18][6:]
-            # for line in templines:
-            dst.writelines("%s\n" % l for l in templines)
-            dst.write('\n')
-            shutil.copyfileobj(src, dst)        # Copy rest of file
-        # os.rename(dst.name, text_filename)      # rename new version
-
-
-def get_cells(ws, row, col, no_rows):
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of columns to make at once'
+                             ' (default 1)')
+    return parser
+
+
+def read_columns(wb_name):
+    """ Return list of TRFdata sheet columns of row 1 to LAST_ROW values """
+    with stage('read workbook', wb_name,
+               bytes_read=file_size(wb_name)) as timing:
+        wb = load_workbook(wb_name, read_only=True, data_only=True)
+        try:
+            ws = wb[TRF_SHEET]
+            # Saved dimensions may be stale, rows would be cut to them
+            ws.reset_dimensions()
+            rows = ws.iter_rows(min_row=1, max_row=LAST_ROW, values_only=True)
+            columns = list(zip_longest(*rows))
+        finally:
+            wb.close()
+        timing.add(items=len(columns))
+    padding = (None,) * LAST_ROW
+    return [(column + padding)[:LAST_ROW] for column in columns]
+
+
+def cell(column, row):
+    """ Return value of column at row (from 1) """
+    return column[row - 1]
+
+
+def get_cells(column, row, no_rows):
     """ Return list of cell range values """
-    for col in ws.iter_cols(min_row = row, min_col = col,
-                            max_row = row + no_rows - 1, max_col = col):
-        for cell in col:
-            yield cell.value
-
-
-def enabled_seeds(ws, col):
-    """ Return list of enabled seeds from worksheet. """
-    NO_SEEDS = 10
-    ENABLE_START_ROW = 77
-    ENABLE_END_ROW = ENABLE_START_ROW + NO_SEEDS - 1
-    SEED_START_ROW = 88
-    SEED_END_ROW = SEED_START_ROW + NO_SEEDS - 1
-
-    col_letter = get_column_letter(col)
-    seeds_range = [(col_letter + str(ENABLE_START_ROW) + ":" +
-                    col_letter + str(ENABLE_END_ROW))]
-    seeds_range.append(col_letter + str(SEED_START_ROW) + ":" +
-                       col_letter + str(SEED_END_ROW))
-    # print(seeds_range)      # Debug
-    seeds = [cell[1][0].value for cell in zip(ws[seeds_range[0]], ws[seeds_range[1]])
-                                              if cell[0][0].value]
-
-    # Test this ***
-    # use itertools.izip to zip the generators in order to process
-    # the elements one by one instead of generating them all at once
-    # seeds = [cell[1] for cell in itertools.izip(
-    #             get_cells(ENABLE_START_ROW, col, NO_SEEDS),
-    #             get_cells(SEED_START_ROW, col, NO_SEEDS)) if cell[0]]
-
-    return seeds;
+    return column[row - 1:row - 1 + no_rows]
+
+
+def write_traff_files(column, template):
+    """ Write traff files for each seed, return list of filenames. """
+    dst_basename = cell(column, TRF_NAME_ROW)   # Base f'name
+    items = get_cells(column, ITEM_START_ROW, len(ITEMS))
+    classes = [get_cells(column, row, TRF_CLASSES)
+               for row in CLASS_START_ROWS]
+    with stage('render TRF', dst_basename) as timing:
+        filenames = template.write_seeds(dst_basename, items, classes,
+                                         enabled_seeds(column))
+        timing.add(items=len(filenames),
+                   bytes_written=sum(file_size(filename)
+                                     for filename in filenames))
+    return filenames
+
+
+def enabled_seeds(column):
+    """ Return list of enabled seeds from worksheet column. """
+    return [seed for enable, seed in
+            zip(get_cells(column, ENABLE_START_ROW, NO_SEEDS),
+                get_cells(column, SEED_START_ROW, NO_SEEDS)) if enable]
+
+
+def traffic_columns(columns):
+    """ Return list of (column number, column) with a traffic name.
+
+    Only the last column of each traffic name is kept.
+    """
+    named = {}
+    for col, column in enumerate(columns[FIRST_TRAF_COL - 1:],
+                                 start=FIRST_TRAF_COL):
+        name = cell(column, TRF_NAME_ROW)
+        if not name:
+            continue
+        if name in named:
+            ignored = get_column_letter(named[name][0])
+            print("Traffic name %s in column %s is repeated in column %s"
+                  " - column %s ignored." % (name, ignored,
+                  get_column_letter(col), ignored), file=sys.stderr)
+        named[name] = (col, column)
+    return sorted(named.values(), key=lambda item: item[0])
+
+
+def make_column(column, template):
+    """ Write traff files of column.
+
+    Returns (error message or None, list of filenames).
+    """
+    try:
+        return None, write_traff_files(column, template)
+    except (TypeError, ValueError) as err:
+        return "Invalid value in %s - %s" % (cell(column, TRF_NAME_ROW),
+                                            err), []
+    except (IOError, OSError) as err:
+        return "Error writing %s - %s" % (cell(column, TRF_NAME_ROW),
+                                          err), []
+
+
+def load_template():
+    """ Return TrfTemplate of template file """
+    try:
+        return TrfTemplate.from_file(TEMPLATE)
+    except (IOError, OSError):
+        sys.exit("File path %s does not exist. Exiting..." % TEMPLATE)
+    except ValueError as err:
+        sys.exit("%s. Exiting..." % err)
 
 
 def main():
 
-    #       [ item,  line, rw, i,  fmt   ]
-    item = [['TUN',     6, 36, 0, '%8i'  ],
-            ['TSE',     7, 37, 0, '%8.1f'],
-            ['tsi',     8, 38, 0, '%8.1f'],
-            ['OPTION', 10, 39, 0, '%8i'  ],
-            ['DTS1',   12, 40, 0, '%8.1f'],
-            ['DTS2',   13, 41, 0, '%8.1f'],
-            ['ppfol1', 14, 42, 0, '%8.1f'],
-            ['ppfol2', 15, 43, 0, '%8.1f'],
-            ['NSTR',   17, 44, 0, '%8i'  ],
-            ['NSEED0', 19, 45, 0, '%8.1f'],
-            ['ICHECK', 20, 46, 0, '%8i'  ]]
-
-    # DATA = [['C69:C74', 'C51:C56', 'C59:C64'],  # Source range
-    DATA = [[69, 51, 59],                 # Source row start
-            ['%8.1f', '%8.2f', '%8.2f']]  # Format
-
-    TRF_CLASSES = 6
-    TRF_NAME_ROW = 3                    # *** Required in other procedures
-    FIRST_TRAF_COL = 3
-
+    parser = usage()
+    args = parser.parse_args()
     # File integrity check
-    if len(argv) == 2 and os.path.isfile(argv[1]):
-        wb_name = argv[1]
+    if os.path.isfile(args.filename):
+        wb_name = args.filename
     else:
-        if len(argv) > 1:
-            if not '-h' in argv[1]:
-                print("File path %s does not exist." % argv[1])
-        usage()
+        print("File path %s does not exist." % args.filename)
+        parser.print_usage()
         sys.exit()
+    if args.jobs < 1:
+        sys.exit("Invalid number of jobs %i - must be at least 1. Exiting..."
+                 % args.jobs)
 
     # src_name = os.path.splitext(argv[1])
-    wb = load_workbook(wb_name, data_only=True)
-    ws = wb['TRFdata']
+    columns = read_columns(wb_name)
 
     print("Processing", wb_name, "to column",
-          get_column_letter(ws.max_column), "...")
-    for col in range(FIRST_TRAF_COL, ws.max_column + 1):  # If unreliable use 40 ***
-        for i in range(len(item)):
-            item[i][TRF_NAME_ROW] = ws.cell(column=col, row=i + 36).value
-        if not ws.cell(column=col, row=TRF_NAME_ROW).value:
-            continue
-        with open('../template.TRF') as f:
-            templines = f.read().splitlines()       # Trap no file found error
-        tmp_name = '../temp.trf'
-        with open(tmp_name, 'w') as f:
-            # i is line, j is item number, k is direction
-            j = 0
-            k = 1
-            for i in range(len(templines)):
-                if i + 1 in (6, 7, 8, 10, 12, 13, 14, 15, 17, 19, 20):
-                    f.write(item[j][4] % item[j][3])
-                    f.write(templines[i][8:])
-                    j += 1
-                elif i + 1 in (48, 50, 54):  # Vehicle proportion / volume
-                    if i + 1 == 48:
-                        src_row = DATA[0][k]
-                    elif i + 1 == 50:
-                        src_row = DATA[0][k]
-                    elif i + 1 == 54:
-                        src_row = DATA[0][k]
-                    for element in get_cells(ws, src_row, col, TRF_CLASSES):
-                        f.write(DATA[1][k] % element)
-                        # print(DATA[1][k] % element)
-                    f.write(templines[i][48:])
-                    k = (k + 1) % 3
-                else:
-                    f.write(templines[i])
-                f.write('\n')
-
-        write_traff_files(ws, tmp_name, col)
-    os.remove(tmp_name)
+          get_column_letter(len(columns)), "...")
+    template = load_template()
+    traffic = traffic_columns(columns)
+    if args.jobs == 1:
+        outcomes = (make_column(column, template) for col, column in traffic)
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(args.jobs)
+        outcomes = executor.map(make_column,
+                                [column for col, column in traffic],
+                                [template] * len(traffic))
+    # Report in column order
+    failed = 0
+    written = 0
+    for (col, column), (error, filenames) in zip(traffic, outcomes):
+        print(cell(column, TRF_NAME_ROW))
+        if error:
+            failed += 1
+            print("Column %s: %s" % (get_column_letter(col), error),
+                  file=sys.stderr)
+        written += len(filenames)
+    if args.jobs > 1:
+        executor.shutdown()
+
+    print(" %i TRF files written for %i columns." % (written, len(traffic)))
+    if failed:
+        sys.exit("%i of %i columns failed. Exiting..."
+                 % (failed, len(traffic)))
     print(" done.")
 
 
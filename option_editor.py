@@ -1,288 +1,466 @@
 #! /usr/bin/env python
 """ Use existing road file to create new overtaking lane option file(s).
 
-By Neale Irons version 06/04/2019 (CC BY-SA 4.0)
+Options can be made one per call or many per call from a batch file of
+Infile, Start, End, Direction, Outfile, Description rows (csv or a
+MakeSimonSetup batch file). Each source road file is read once per batch
+and edited in memory (see rodfile.py). With --fanout options are made from
+one road file for every combination, or sliding position, of a list of
+candidate overtaking lanes.
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
 Known bugs:
 """
 
 from __future__ import print_function
-import argparse
-import hashlib
+import csv
+import itertools
 import os
-import shutil
-from shutil import move
+import re
+import shlex
 import sys
-import tempfile
-from tempfile import NamedTemporaryFile
 import logging
-
-
-def main():
-
-    def usage():
-        parser = argparse.ArgumentParser(description=
-                "Use existing road files to create new overtaking lane.",
-                epilog=
-                ' eg: option_editor.py Demo.ROD 1.5 2.2 P Option.ROD'
-                ' "Option description"')
-        parser.add_argument("Infile", help="Input ROD file")
-        parser.add_argument("Start", type=float, help="Start km")
-        parser.add_argument("End", type=float, help="End km")
-        parser.add_argument("Direction",
-                            help="Direction P, C or B (direction 1 and/or 2)",
-                            choices=["P", "C", "B"])
-        parser.add_argument("Outfile", help="Output ROD file")
-        parser.add_argument('"Description"', nargs='?',
-                            help="Description line for Outfile")
-        args = parser.parse_args()
-
-    def validate_command_line(argv, otlane_direction_codes):
-        """ Check command line is valid. """
-        if len(argv) < 6 or len(argv) > 7:
-            usage()
-            sys.exit()
-
-        src = argv[1]
-        otl_start_km = round(float(argv[2]), 1)
-        otl_end_km = round(float(argv[3]), 1)
-        otl_direction = argv[4]
-        dst = argv[5]
-        if len(argv) == 7:
-            description = argv[6]
-            description = description[:50]
-        else:
-            description = ''
-
-        if otl_start_km > otl_end_km:
-            sys.exit("Invalid start/end overtaking lane chainage - "
-                     "start must be less than end. Exiting...")
-
-        if otl_direction not in OTLANE_DIRECTION_CODES:
-            sys.exit("Direction %s is invalid, must be P, C or B. "
-                     "Exiting..." % argv[4])
-
-        logging.debug('Infile Start End Dir Outfile: %s, %3.1f, %3.1f, %s, %s',
-                      src, otl_start_km, otl_end_km, otl_direction, dst)
-
-        return(src, otl_start_km, otl_end_km, otl_direction, dst, description)
-
-    def validate_file(src, dst, hashfile, record_size):
-        """ File integrity checks. """
-        if not os.path.isfile(src):
-            sys.exit("File path %s does not exist. Exiting..." % src)
-
-        src_name, src_ext = os.path.splitext(src)
-        if src != dst:
-            # Validate support files
-            src_name, src_ext = os.path.splitext(src)
-            if not os.path.isfile(src_name + '.MLT'):
-                sys.exit("Requires support file %s. Exiting..."
-                         % (src_name + '.MLT'))
-            if not os.path.isfile(src_name + '.OBS'):
-                sys.exit("Requires support file %s. Exiting..."
-                         % (src_name + '.OBS'))
-
-        # Validate HashCode
-        if not hashcode_register(HASHFILE, src, "validate"):
-            sys.exit("Invalid file - %s failed HashCode validation. Exiting..."
-                     % src)
-
-        # Read header
-        with open(src) as fp:
-            # Fails - "Invalid file format - first 9 lines must be file header
-            for x in range(1, 10):
-                line = fp.readline()
-            header_length = fp.tell()       # Calculate header length
-            fp.seek(0, 2)
-            file_length = fp.tell()         # Get file length
-
-        if (file_length - header_length) % RECORD_SIZE != 0:
-            sys.exit("Invalid file size - must be 9 line header and records"
-                     " must be %s characters long. Exiting..." % RECORD_SIZE)
-
-        nrecs = (file_length - header_length) // RECORD_SIZE
-        if nrecs < 1:
-            sys.exit("Invalid file format"
-                     " - file must contain at least one record. Exiting...")
-
-        logging.debug('src_name header_length nrecs: %s, %i, %i',
-                      src_name, header_length, nrecs)
-
-        return(src_name, header_length, nrecs)
-
-    def hashcode_register(hashfile, src, service):
-        """Validate or update register hashcode returning true/false.
-
-        By Neale Irons version 04/03/2018 (CC BY-SA 4.0)
-
-        Keyword arguments:
-        hashfile - hashcode_register filename
-        src - filename to service
-        service - using src, validate or update register
-
-        Returns True for success or False for failure
-
-        import hashlib
-        import os
-        """
-        return True  # Works but disabled, future feature
-        # hashcode_register must exist or error
-        if not os.path.isfile(hashfile):
-            return False
-        hashcode = hashlib.md5(open(src, 'rb').read()).hexdigest()
-        # hashcode is lowercase
-
-        if service == 'validate':
-            with open(hashfile) as hf:
-                for line in hf:
-                    if hashcode in line.lower():
-                        # hashcode found but filename might not match
+from instrument import file_size, stage
+from rodfile import ODO_STEP_KM, ROUNDING_KM, RodFile, copy_file
+
+
+# Constants
+OTLANE_DIRECTION_CODES = "PCB"
+HASHFILE = "Hashcode.MD5"
+BATCH_COLUMNS = ["Infile", "Start", "End", "Direction", "Outfile",
+                 "Description"]
+DESCRIPTION_LENGTH = 50
+SKIPPED_LINE = re.compile(r'\s*(::|@?(rem|echo)\b)', re.IGNORECASE)
+
+
+def usage(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description=
+            "Use existing road files to create new overtaking lane.",
+            epilog=
+            ' eg: option_editor.py Demo.ROD 1.5 2.2 P Option.ROD'
+            ' "Option description"'
+            ' or: option_editor.py --batch MakeSimonSetup.csv'
+            ' or: option_editor.py --fanout Demo.ROD Lanes.csv')
+    parser.add_argument("Infile", help="Input ROD file")
+    parser.add_argument("Start", type=float, help="Start km")
+    parser.add_argument("End", type=float, help="End km")
+    parser.add_argument("Direction",
+                        help="Direction P, C or B (direction 1 and/or 2)",
+                        choices=["P", "C", "B"])
+    parser.add_argument("Outfile", help="Output ROD file")
+    parser.add_argument('"Description"', nargs='?',
+                        help="Description line for Outfile")
+    args = parser.parse_args(argv)
+
+
+def validate_command_line(argv, otlane_direction_codes):
+    """ Check command line is valid. """
+    if len(argv) < 6 or len(argv) > 7:
+        usage(argv[1:])
+        sys.exit()
+
+    src = argv[1]
+    otl_start_km = round(float(argv[2]), 1)
+    otl_end_km = round(float(argv[3]), 1)
+    otl_direction = argv[4]
+    dst = argv[5]
+    if len(argv) == 7:
+        description = argv[6]
+        description = description[:DESCRIPTION_LENGTH]
+    else:
+        description = ''
+
+    if otl_start_km > otl_end_km:
+        sys.exit("Invalid start/end overtaking lane chainage - "
+                 "start must be less than end. Exiting...")
+
+    if otl_direction not in otlane_direction_codes:
+        sys.exit("Direction %s is invalid, must be P, C or B. "
+                 "Exiting..." % argv[4])
+
+    logging.debug('Infile Start End Dir Outfile: %s, %3.1f, %3.1f, %s, %s',
+                  src, otl_start_km, otl_end_km, otl_direction, dst)
+
+    return(src, otl_start_km, otl_end_km, otl_direction, dst, description)
+
+
+def file_key(filename):
+    """ Return key identifying filename in source file cache """
+    return os.path.normcase(os.path.abspath(filename))
+
+
+def validate_file(src, dst, hashfile, sources=None):
+    """ File integrity checks.
+
+    sources is an optional cache of RodFiles shared by batch rows.
+    """
+    if not os.path.isfile(src):
+        sys.exit("File path %s does not exist. Exiting..." % src)
+
+    src_name, src_ext = os.path.splitext(src)
+    if src != dst:
+        # Validate support files
+        if not os.path.isfile(src_name + '.MLT'):
+            sys.exit("Requires support file %s. Exiting..."
+                     % (src_name + '.MLT'))
+        if not os.path.isfile(src_name + '.OBS'):
+            sys.exit("Requires support file %s. Exiting..."
+                     % (src_name + '.OBS'))
+
+    # Validate HashCode
+    if not hashcode_register(hashfile, src, "validate"):
+        sys.exit("Invalid file - %s failed HashCode validation. Exiting..."
+                 % src)
+
+    # Read file once
+    if sources is None:
+        sources = {}
+    if file_key(src) not in sources:
+        try:
+            sources[file_key(src)] = RodFile.from_file(src)
+        except ValueError as err:
+            sys.exit("%s. Exiting..." % err)
+
+    return(src_name, sources[file_key(src)])
+
+
+def hashcode_register(hashfile, src, service):
+    """Validate or update register hashcode returning true/false.
+
+    By Neale Irons version 04/03/2018 (CC BY-SA 4.0)
+
+    Keyword arguments:
+    hashfile - hashcode_register filename
+    src - filename to service
+    service - using src, validate or update register
+
+    Returns True for success or False for failure
+
+    import hashlib
+    import os
+    """
+    return True  # Works but disabled, future feature
+    import hashlib
+    import tempfile
+    # hashcode_register must exist or error
+    if not os.path.isfile(hashfile):
+        return False
+    hashcode = hashlib.md5(open(src, 'rb').read()).hexdigest()
+    # hashcode is lowercase
+
+    if service == 'validate':
+        with open(hashfile) as hf:
+            for line in hf:
+                if hashcode in line.lower():
+                    # hashcode found but filename might not match
+                    return True
+
+    elif service == "update":
+        with open(hashfile) as hf:
+            for lcnt, line in enumerate(hf):
+                register_hash, register_file = line[:-1].split(" *")
+                if register_file == src:
+                    if hashcode == register_hash.lower():
+                        # File already registered
                         return True
+                    else:
+                        # Remove invalid hashcode record from register
+                        hf.seek(0)
+                        with tempfile.NamedTemporaryFile(delete=False) as tmp:
+                            for lnum, line in enumerate(hf):
+                                if lnum != lcnt:
+                                    tmp.write(line)
+                        # Rename tmp as file
+                        hf.close()
+                        os.unlink(hashfile)
+                        os.rename(tmp.name, hashfile)
+                        break
+        with open(hashfile, 'a') as hf:
+            # Append new hashcode file record to register
+            hf.write(hashcode + ' *' + src + '\n')
+            return True
+
+    return False
+
+
+def edit_file(rod, otl_start_km, otl_end_km, otl_direction):
+    """ Return copy of road file with overtaking lane records changed. """
+    option = rod.copy()
+    try:
+        option.set_overtaking_lane(otl_start_km, otl_end_km, otl_direction)
+    except ValueError as err:
+        sys.exit("%s. Exiting..." % err)
+    return option
+
+
+def write_files(src, dst, src_name, option, description, sources):
+    """ Write option file and its supporting files. """
+    if dst != src:
+        # Create new supporting files
+        dst_name, dst_ext = os.path.splitext(dst)
+        copy_file(src_name + '.MLT', dst_name + '.MLT', dst_name + '.MLT')
+        copy_file(src_name + '.OBS', dst_name + '.OBS')
+
+    rod = sources.pop(file_key(dst), None)   # Later rows read the new file
+    if rod is not None and file_key(dst) != file_key(src):
+        rod.close()                          # Release before replacing
+    option.write(dst, dst, description)
+    hashcode_register(HASHFILE, dst, "update")
+
+
+def make_option(argv, sources):
+    """ Make one option file from command line style argv. """
+    # Validate command line
+    src, otl_start_km, otl_end_km, otl_direction, dst, description = \
+        validate_command_line(argv, OTLANE_DIRECTION_CODES)
+
+    with stage('make option', dst, items=1) as timing:
+        if file_key(src) not in (sources or {}):
+            timing.add(bytes_read=file_size(src))
+
+        # Validate file
+        src_name, rod = validate_file(src, dst, HASHFILE, sources)
+
+        # Edit file
+        option = edit_file(rod, otl_start_km, otl_end_km, otl_direction)
+        write_files(src, dst, src_name, option, description, sources)
+        timing.add(bytes_written=file_size(dst))
+    return dst
+
+
+def read_batch(fp, csv_rows=True):
+    """ Yield (line number, argument list) for each option in batch file.
+
+    Lines calling option_editor.py (MakeSimonSetup batch files) are accepted,
+    and if csv_rows csv rows of Infile, Start, End, Direction, Outfile,
+    Description. Other batch file lines are skipped.
+    """
+    for lnum, line in enumerate(fp, start=1):
+        # Commented out and echoed lines are not run by cmd.exe
+        if not line.strip() or SKIPPED_LINE.match(line):
+            continue
+        if 'option_editor.py' in line:
+            args = shlex.split(line.split('option_editor.py', 1)[1],
+                               posix=False)
+            yield lnum, [arg[1:-1] if len(arg) > 1 and arg[0] == arg[-1] == '"'
+                         else arg for arg in args]
+            continue
+        if not csv_rows:
+            continue
+        row = next(csv.reader([line]))
+        while row and not row[-1]:
+            row.pop()                   # Empty trailing columns
+        if row and row[0] != BATCH_COLUMNS[0]:
+            yield lnum, row
+
+
+def read_batch_file(batchfile):
+    """ Return list of (line number, argument list) of batch file or stdin.
+
+    csv rows are only read from .csv files and stdin.
+    """
+    if batchfile == '-':
+        return list(read_batch(sys.stdin))
+    if not os.path.isfile(batchfile):
+        sys.exit("File path %s does not exist. Exiting..." % batchfile)
+    with open(batchfile) as fp:
+        return list(read_batch(fp, batchfile.lower().endswith('.csv')))
+
+
+def make_row(lnum, row, sources):
+    """ Make option of batch row, return its filename or None on error. """
+    try:
+        dst = make_option(['option_editor.py'] + row, sources)
+    except SystemExit as err:
+        if isinstance(err.code, str):
+            print("Line %i: %s" % (lnum, err.code), file=sys.stderr)
+        else:
+            print("Line %i: invalid option %s"
+                  % (lnum, ' '.join(row)), file=sys.stderr)
+        return None
+    except ValueError as err:
+        print("Line %i: %s" % (lnum, err), file=sys.stderr)
+        return None
+    print(dst)
+    return dst
+
+
+def run_batch(batchfile):
+    """ Make all options in batch file in one process, return failures. """
+    sources = {}
+    failed = 0
+    total = 0
+    rows = read_batch_file(batchfile)
+
+    with stage('option batch', batchfile, items=len(rows)):
+        for lnum, row in rows:
+            total += 1
+            if make_row(lnum, row, sources) is None:
+                failed += 1
+    for rod in sources.values():
+        rod.close()
+    return failed, total
+
+
+def fanout_usage(argv):
+    """ Return fan-out arguments """
+    import argparse
+    parser = argparse.ArgumentParser(prog='option_editor.py --fanout',
+            description="Make overtaking lane options of every combination"
+                        " of candidate lanes.",
+            epilog=' eg: option_editor.py --fanout Demo.ROD Lanes.csv'
+                   ' --max-lanes 2')
+    parser.add_argument("Infile", help="Input ROD file")
+    parser.add_argument("Lanes",
+                        help="csv file of Start, End, Direction rows of"
+                             " candidate lanes ('-' for standard input)")
+    parser.add_argument("--max-lanes", type=int, default=None,
+                        help="Most lanes in one option (default: all)")
+    parser.add_argument("--window", type=float, default=None,
+                        metavar="STEP",
+                        help="Instead of combinations, slide each lane"
+                             " along the road in STEP km")
+    parser.add_argument("--prefix", default=None,
+                        help="Outfile name before the option number"
+                             " (default: Infile name + _OT)")
+    parser.add_argument("--first", type=int, default=1,
+                        help="First option number (default: 1)")
+    return parser.parse_args(argv)
+
+
+def read_lanes(fp):
+    """ Return list of (start, end, direction) lanes of csv rows """
+    lanes = []
+    for lnum, row in enumerate(csv.reader(fp), start=1):
+        row = [cell.strip() for cell in row]
+        if not row or not row[0] or row[0].startswith('#') or \
+                row[0] == BATCH_COLUMNS[1]:
+            continue
+        try:
+            start_km = round(float(row[0]), 1)
+            end_km = round(float(row[1]), 1)
+            direction = row[2].upper()
+        except (IndexError, ValueError):
+            sys.exit("Line %i: invalid lane %s. Exiting..."
+                     % (lnum, ','.join(row)))
+        if start_km > end_km or direction not in OTLANE_DIRECTION_CODES:
+            sys.exit("Line %i: invalid lane %s - start must be less than"
+                     " end and direction P, C or B. Exiting..."
+                     % (lnum, ','.join(row)))
+        lanes.append((start_km, end_km, direction))
+    return lanes
+
+
+def lane_combinations(lanes, max_lanes=None):
+    """ Yield tuples of lanes of every combination """
+    for count in range(1, min(max_lanes or len(lanes), len(lanes)) + 1):
+        for combination in itertools.combinations(lanes, count):
+            yield combination
+
+
+def lane_windows(lanes, rod, step_km):
+    """ Yield one lane tuple for each step_km position of each lane """
+    odo_start_km = rod.odo_start_km
+    last_km = rod.odo_end_km + ODO_STEP_KM
+    for start_km, end_km, direction in lanes:
+        length_km = end_km - start_km
+        position = 0
+        last_start = None
+        while True:
+            start = round(odo_start_km + position * step_km, 1)
+            if start + length_km > last_km + ROUNDING_KM:
+                break
+            position += 1
+            if start == last_start:
+                continue                # Same 0.1 km position once rounded
+            last_start = start
+            yield ((start, round(start + length_km, 1), direction),)
+
+
+def lanes_description(lanes):
+    """ Return option description of lanes """
+    return ("Overtaking Lane%s: %s" % ('s' if len(lanes) > 1 else '',
+            ', '.join("%.1f-%.1fkm %s" % lane for lane in lanes))
+            )[:DESCRIPTION_LENGTH]
+
+
+def run_fanout(argv):
+    """ Make options of candidate lanes on one road, return failures. """
+    args = fanout_usage(argv)
+    if args.window is not None and args.window < ODO_STEP_KM - ROUNDING_KM:
+        sys.exit("Invalid window step %s - must be at least %.1f km."
+                 " Exiting..." % (args.window, ODO_STEP_KM))
+    if args.Lanes == '-':
+        lanes = read_lanes(sys.stdin)
+    else:
+        if not os.path.isfile(args.Lanes):
+            sys.exit("File path %s does not exist. Exiting..." % args.Lanes)
+        with open(args.Lanes, newline='') as fp:
+            lanes = read_lanes(fp)
+    if not lanes:
+        sys.exit("No lanes in %s. Exiting..." % args.Lanes)
+
+    src = args.Infile
+    src_ext = os.path.splitext(src)[1]
+    prefix = args.prefix or os.path.splitext(src)[0] + '_OT'
+    sources = {}
+    src_name, rod = validate_file(src, None, HASHFILE, sources)
+    for start_km, end_km, direction in lanes:
+        try:
+            rod.record_range(start_km, end_km)
+        except ValueError as err:
+            sys.exit("Lane %.1f-%.1fkm %s: %s. Exiting..."
+                     % (start_km, end_km, direction, err))
+    if args.window is None:
+        options = lane_combinations(lanes, args.max_lanes)
+    else:
+        options = lane_windows(lanes, rod, args.window)
+
+    failed = 0
+    total = 0
+    with stage('option fanout', src) as timing:
+        for number, option_lanes in enumerate(options, start=args.first):
+            total += 1
+            dst = "%s%03i%s" % (prefix, number, src_ext)
+            if os.path.exists(dst) and os.path.samefile(src, dst):
+                failed += 1             # Other options are copied from src
+                print("%s: Outfile must not be the Infile - not made."
+                      % dst, file=sys.stderr)
+                continue
+            description = lanes_description(option_lanes)
+            option = rod.copy()
+            try:
+                for lane in option_lanes:
+                    option.set_overtaking_lane(*lane)
+                write_files(src, dst, src_name, option, description, sources)
+            except (ValueError, IOError, OSError) as err:
+                failed += 1
+                print("%s: %s" % (dst, err), file=sys.stderr)
+                continue
+            print(dst, description)
+        timing.add(items=total)
+    for rod in sources.values():
+        rod.close()
+    return failed, total
 
-        elif service == "update":
-            with open(hashfile) as hf:
-                for lcnt, line in enumerate(hf):
-                    register_hash, register_file = line[:-1].split(" *")
-                    if register_file == src:
-                        if hashcode == register_hash.lower():
-                            # File already registered
-                            return True
-                        else:
-                            # Remove invalid hashcode record from register
-                            hf.seek(0)
-                            with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                                for lnum, line in enumerate(hf):
-                                    if lnum != lcnt:
-                                        tmp.write(line)
-                            # Rename tmp as file
-                            hf.close()
-                            os.unlink(hashfile)
-                            os.rename(tmp.name, hashfile)
-                            break
-            with open(hashfile, 'a') as hf:
-                # Append new hashcode file record to register
-                hf.write(hashcode + ' *' + src + '\n')
-                return True
-
-        return False
 
-    def edit_file(src, dst, header_length, otl_start_km, otl_end_km,
-                  otl_direction, odo_step_km, record_size, barrier_column1,
-                  barrier_column2, barrier_value, otlane_column1,
-                  otlane_column2, otlane_value, hashfile, nrecs, description):
-        """ Change file records. """
-        # Make temporary copy of source file to change
-        # dst_tmp = tempfile.NamedTemporaryFile(delete=False) # Not working **
-        dst_tmp = src + ".tmp"                                # Workaround ***
-        shutil.copy2(src, dst_tmp)
-
-        # Open file for random read/write
-        with open(dst_tmp, 'r+b') as fp:
-            fp.seek(header_length, 0)
-            odo_start_km = float((fp.read(9)))
-            fp.seek(RECORD_SIZE * -1, 2)
-            odo_end_km = float((fp.read(9)))
-
-            if otl_start_km < odo_start_km:
-                logging.error('otl_start_km, odo_start_km:   %f, %f',
-                              otl_start_km, odo_start_km)
-                sys.exit("Invalid start overtaking lane chainage -"
-                         " Overtaking lane can't start before first road"
-                         " chainage. Exiting...")
-            if otl_end_km > odo_end_km + ODO_STEP_KM:
-                logging.error('otl_end_km, odo_end_km:       %f, %f',
-                              otl_start_km, odo_start_km)
-                sys.exit("Invalid end overtaking lane chainage - Overtaking "
-                         "lane can't end after last road chainage. Exiting...")
-
-            if int(round((odo_end_km - odo_start_km)/ODO_STEP_KM) + 1) != nrecs:
-                sys.exit("Invalid file format - wrong number of lines "
-                         "between start and end distances. Exiting...")
-
-            logging.debug('odo_start_km  odo_end_km:     %3.3f, %3.3f',
-                          odo_start_km, odo_end_km)
-
-            while otl_start_km + .000001 < otl_end_km:   # 1mm rounding error
-                nrec = (otl_start_km - .000001 - odo_start_km) // \
-                        ODO_STEP_KM + 1
-                fpos = int(header_length + (nrec * RECORD_SIZE) - 1)
-
-                logging.debug('nrec fpos  otl_start_km: %3.0f, %i, %3.1f',
-                              nrec, fpos, otl_start_km)
-
-                fp.seek(BARRIER_COLUMN1 + fpos)
-                fp.write(BARRIER_VALUE)
-                fp.seek(BARRIER_COLUMN2 + fpos)
-                fp.write(BARRIER_VALUE)
-
-                if otl_direction == "P" or otl_direction == "B":
-                    fp.seek(OTLANE_COLUMN1 + fpos)
-                    fp.write(OTLANE_VALUE)
-                if otl_direction == "C" or otl_direction == "B":
-                    fp.seek(OTLANE_COLUMN2 + fpos)
-                    fp.write(OTLANE_VALUE)
-                otl_start_km += ODO_STEP_KM
-
-        if dst != src:
-            # Create new supporting files
-            dst_name, dst_ext = os.path.splitext(dst)
-            shutil.copy2(src_name + '.MLT', dst_name + '.MLT')
-            replace_textfile_line(dst_name + '.MLT', dst_name + '.MLT', '')
-            shutil.copy2(src_name + '.OBS', dst_name + '.OBS')
-
-        replace_textfile_line(dst_tmp, dst, description)
-        move(dst_tmp, dst)
-        hashcode_register(HASHFILE, dst, "update")
-
-    def replace_textfile_line(text_filename, new_text, description):
-        """ Replace first line with new_text.
-
-        Adapted from ReplFHdr.py
-        By Neale Irons version 14/02/2018 (CC BY-SA 4.0)
-        import sys, os, tempfile
-        """
-
-        with open(text_filename) as src:
-            with tempfile.NamedTemporaryFile('w',
-              dir=os.path.dirname(text_filename), delete=False) as dst:
-                line = src.readline()               # Read first line
-                dst.write(new_text + '\n')          # Replace first line
-                if description:                     # If description not empty
-                    line = src.readline()           # Read second line
-                    dst.write(description + '\n')   # Replace second line
-                shutil.copyfileobj(src, dst)        # Copy rest of file
-        os.unlink(text_filename)                    # remove old version
-        os.rename(dst.name, text_filename)          # rename new version
-
-    # Constants
-    ODO_STEP_KM = 0.1
-    RECORD_SIZE = 109
-    BARRIER_COLUMN1 = 11
-    BARRIER_COLUMN2 = 16
-    BARRIER_VALUE = b'-'     # Debug - use '+' instead of '-'
-    OTLANE_COLUMN1 = 22
-    OTLANE_COLUMN2 = 27
-    OTLANE_VALUE = b'T'      # Debug - use 'Y' instead of 'T'
-    OTLANE_DIRECTION_CODES = "PCB"
-    HASHFILE = "Hashcode.MD5"
+def main():
 
     # Enable logging with level=logging.DEBUG, disable with .ERROR
     logging.basicConfig(level=logging.ERROR,
                         format='%(levelname)s - %(message)s')
 
-    # Validate command line
-    src, otl_start_km, otl_end_km, otl_direction, dst, description = validate_command_line(
-        sys.argv, OTLANE_DIRECTION_CODES)
-
-    # Validate file
-    src_name, header_length, nrecs = validate_file(src, dst, HASHFILE,
-                                                   RECORD_SIZE)
-
-    # Edit file
-    edit_file(src, dst, header_length, otl_start_km, otl_end_km, otl_direction,
-              ODO_STEP_KM, RECORD_SIZE, BARRIER_COLUMN1, BARRIER_COLUMN2,
-              BARRIER_VALUE, OTLANE_COLUMN1, OTLANE_COLUMN2, OTLANE_VALUE,
-              HASHFILE, nrecs, description)
+    if len(sys.argv) == 3 and sys.argv[1] == '--batch':
+        failed, total = run_batch(sys.argv[2])
+        if failed:
+            sys.exit("%i of %i options failed. Exiting..." % (failed, total))
+    elif len(sys.argv) > 1 and sys.argv[1] == '--fanout':
+        failed, total = run_fanout(sys.argv[2:])
+        if failed:
+            sys.exit("%i of %i options failed. Exiting..." % (failed, total))
+    else:
+        make_option(sys.argv, {})
 
     print(" done.")
 
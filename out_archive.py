@@ -0,0 +1,263 @@
+#! /usr/bin/env python
+""" Archive Trarr OUT files compressed, with a binary summary for averaging.
+
+Each <name>.OUT is stored as <name>.OUT.gz plus a <name>.OUT.sum summary of
+what avg_seeds.py reads from it (see outfile.py), then removed. A summary
+is a fixed layout little endian file:
+    HEADER      magic, version, SHAPE, seed, length, unimpeded speed,
+                number of block lines, length of text
+    values      float64 block values of SHAPE
+    text        block line fields, NUL between fields and newline between
+                lines, with SAME for a value field that is its value to one
+                decimal place, so values are not stored twice
+so it is read with one memory map and no text parsing. Archived files are
+read like OUT files by read(), from the OUT file if there is one again (eg
+simulated again), else the summary, else the compressed file. eg:
+    python ..\\out_archive.py HW4*
+    python ..\\out_archive.py HW4_Sec3b_HW4S3b_seed1001 --extract
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+from array import array
+import argparse
+import fnmatch
+import gzip
+import io
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import outfile
+from rodfile import file_mode
+
+
+GZIP_EXT = '.gz'
+SUMMARY_EXT = '.sum'
+ARCHIVE_EXTS = [SUMMARY_EXT, GZIP_EXT]  # Read order after the OUT file
+MAGIC = b'SIMONSUM'
+VERSION = 2
+#                 magic, version, SHAPE, seed, length, unimpeded speed,
+#                 block lines, text length
+HEADER = struct.Struct('<8sH3HiidHI')
+NVALUES = outfile.SHAPE[0] * outfile.SHAPE[1] * outfile.SHAPE[2]
+SAME = b'='                             # Field is its value as %.1f
+WIDTHS = [stop - start for start, stop in
+          zip(outfile.INDICIES, outfile.INDICIES[1:])] + [0]
+
+
+def usage():
+    """ Return command line parser """
+    parser = argparse.ArgumentParser(description=
+            "Archive Trarr output files compressed with a binary summary.",
+            epilog=' eg: out_archive.py HW4*')
+    parser.add_argument('filename', nargs='?',
+                        help='full or part file specification (default: all)')
+    parser.add_argument('--keep', action='store_true',
+                        help='Keep the OUT files')
+    parser.add_argument('--extract', action='store_true',
+                        help='Restore OUT files from archived files')
+    return parser
+
+
+def stored_name(filename):
+    """ Return name of file holding OUT filename: itself, else its summary
+    or compressed file, else None """
+    for name in [filename] + [filename + ext for ext in ARCHIVE_EXTS]:
+        if os.path.isfile(name):
+            return name
+    return None
+
+
+def out_names(pattern, names):
+    """ Return sorted OUT filenames, stored or archived, matching pattern """
+    found = set()
+    for name in names:
+        for ext in ARCHIVE_EXTS:
+            if name.endswith(ext):
+                name = name[:-len(ext)]
+                break
+        if fnmatch.fnmatch(name, pattern):
+            found.add(name)
+    return sorted(found)
+
+
+def line_text(line, bidx, row, values):
+    """ Return summary text of block line, value fields as SAME if they
+    are the value to one decimal place """
+    fields = outfile.fields(line)
+    if row >= outfile.BLOCK_HEADER_ROWS:
+        pos = outfile.index(bidx, row - 2, 0)
+        for col in range(1, len(fields)):
+            if fields[col] and fields[col] == b'%.1f' % values[pos + col]:
+                fields[col] = SAME
+    return b'\0'.join(fields)
+
+
+def text_line(text, bidx, row, values):
+    """ Return block line of summary text, fields at the INDICIES """
+    fields = text.split(b'\0')
+    if len(fields) != len(WIDTHS):
+        raise ValueError("summary line does not have %i fields"
+                         % len(WIDTHS))
+    if row >= outfile.BLOCK_HEADER_ROWS:
+        pos = outfile.index(bidx, row - 2, 0)
+        for col in range(1, len(fields)):
+            if fields[col] == SAME:
+                fields[col] = b'%.1f' % values[pos + col]
+    return (fields[0].ljust(WIDTHS[0]) +
+            b''.join(field.rjust(width)
+                     for field, width in zip(fields[1:], WIDTHS[1:]))
+            ).rstrip(b' ')
+
+
+def summary_bytes(result):
+    """ Return summary file contents of OutFile result """
+    text = b'\n'.join(line_text(line, bidx, row, result.values)
+                      for bidx, block in enumerate(result.lines)
+                      for row, line in enumerate(block))
+    values = array('d', result.values)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return (HEADER.pack(MAGIC, VERSION, *(outfile.SHAPE + (
+                result.seed, result.length, result.unimpeded_speed,
+                len(outfile.BLOCKS) * outfile.BLOCK_DATA_ROWS, len(text)))) +
+            values.tobytes() + text)
+
+
+def read_summary(filename):
+    """ Return OutFile read from summary file.
+
+    Block lines have the fields of the OUT file lines, not their spacing.
+    Raises ValueError if the file is not a summary of this layout.
+    """
+    with open(filename, 'rb') as fp:
+        try:
+            data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError("empty summary file")
+    with data:
+        if len(data) < HEADER.size:
+            raise ValueError("summary header not found")
+        (magic, version, blocks, rows, fields, seed, length, unimpeded_speed,
+         nlines, size) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or \
+                (blocks, rows, fields) != outfile.SHAPE:
+            raise ValueError("summary layout not version %i" % VERSION)
+        start = HEADER.size + 8 * NVALUES
+        if len(data) != start + size:
+            raise ValueError("summary size does not match header")
+        values = array('d', data[HEADER.size:start])
+        texts = data[start:].split(b'\n')
+    if sys.byteorder != 'little':
+        values.byteswap()
+    rows = outfile.BLOCK_DATA_ROWS
+    if len(texts) != nlines or nlines != len(outfile.BLOCKS) * rows:
+        raise ValueError("summary does not have %i block lines"
+                         % (len(outfile.BLOCKS) * rows))
+    return outfile.OutFile(seed, length, unimpeded_speed, values, tuple(
+        tuple(text_line(texts[bidx * rows + row], bidx, row, values)
+              for row in range(rows))
+        for bidx in range(len(outfile.BLOCKS))))
+
+
+def read(filename):
+    """ Return OutFile of OUT filename, archived or not """
+    name = stored_name(filename)
+    if name is None:
+        raise IOError("File %s not found" % filename)
+    if name.endswith(SUMMARY_EXT):
+        return read_summary(name)
+    if name.endswith(GZIP_EXT):
+        with gzip.open(name, 'rb') as fp:
+            return outfile.parse(fp)
+    return outfile.read(name)
+
+
+def write_file(filename, data, mtime, mode):
+    """ Write data to filename through a temporary file, with mtime and
+    permissions mode """
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(filename) or '.',
+                                     delete=False) as tmp:
+        tmp.write(data)
+    os.chmod(tmp.name, mode)
+    os.utime(tmp.name, (mtime, mtime))
+    os.replace(tmp.name, filename)
+
+
+def archive(filename, keep=False):
+    """ Write compressed and summary files of OUT filename, return sizes
+    (OUT, archived).
+
+    Raises ValueError if the OUT file format is not recognised.
+    """
+    with open(filename, 'rb') as fp:
+        data = fp.read()
+    mtime = os.stat(filename).st_mtime
+    mode = file_mode(filename)
+    summary = summary_bytes(outfile.parse(io.BytesIO(data)))
+    compressed = io.BytesIO()
+    with gzip.GzipFile(os.path.basename(filename), 'wb', fileobj=compressed,
+                       mtime=0) as fp:
+        fp.write(data)
+    write_file(filename + GZIP_EXT, compressed.getvalue(), mtime, mode)
+    write_file(filename + SUMMARY_EXT, summary, mtime, mode)
+    if not keep:
+        os.remove(filename)
+    return len(data), len(compressed.getvalue()) + len(summary)
+
+
+def extract(filename):
+    """ Restore OUT filename from its compressed file """
+    with gzip.open(filename + GZIP_EXT, 'rb') as src, \
+            tempfile.NamedTemporaryFile(dir=os.path.dirname(filename) or '.',
+                                        delete=False) as tmp:
+        shutil.copyfileobj(src, tmp)
+    mtime = os.stat(filename + GZIP_EXT).st_mtime
+    os.chmod(tmp.name, file_mode(filename + GZIP_EXT))
+    os.utime(tmp.name, (mtime, mtime))
+    os.replace(tmp.name, filename)
+
+
+def main():
+
+    args = usage().parse_args()
+    pattern = (args.filename or '*') + '.OUT'
+    names = out_names(pattern, os.listdir('.'))
+    if not names:
+        print(" No files matched - none processed.")
+        return
+
+    if args.extract:
+        names = [name for name in names if os.path.isfile(name + GZIP_EXT)
+                 and not os.path.isfile(name)]
+        for name in names:
+            extract(name)
+        print(" %i OUT files extracted." % len(names))
+        return
+
+    names = [name for name in names if os.path.isfile(name)]
+    failed = 0
+    out_bytes = archived_bytes = 0
+    for name in names:
+        try:
+            sizes = archive(name, args.keep)
+        except ValueError as err:
+            print("Invalid file %s - %s - not archived." % (name, err),
+                  file=sys.stderr)
+            failed += 1
+            continue
+        out_bytes += sizes[0]
+        archived_bytes += sizes[1]
+    print(" %i OUT files archived, %.1f MB to %.1f MB."
+          % (len(names) - failed, out_bytes / 1e6, archived_bytes / 1e6))
+    if failed:
+        sys.exit("%i of %i files failed. Exiting..." % (failed, len(names)))
+    print(" done.")
+
+
+if __name__ == '__main__':
+    main()
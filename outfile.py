@@ -0,0 +1,109 @@
+#! /usr/bin/env python
+""" Read Trarr simulation output (OUT) files.
+
+Each OUT file is read once, line by line, into an OutFile holding the seed,
+road length, unimpeded speed of all vehicles and the DIR1, DIR2 and INTERVAL
+block values as one flat array of SHAPE (block, vehicle row, field). Row 0
+and field 0 (the vehicle category) of each block are not used. The raw
+block lines are kept for the Model_Output sheet.
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+from array import array
+from collections import namedtuple
+from itertools import zip_longest
+
+
+BLOCK_DATA_ROWS = 10
+BLOCK_HEADER_ROWS = 3
+INDICIES = [0, 9, 17, 23, 33, 38, 46, 54, 65, 72, 82, 91, 100, 110, 119]
+FIELDS = [slice(i, j) for i, j in zip_longest(INDICIES, INDICIES[1:])]
+#          [search,                  extra rows, name]
+BLOCKS = [[b' DIR1',                 2,          'DIR1'],
+          [b' DIR2',                 2,          'DIR2'],
+          [b'          * INTERVAL',  3,          'INTERVAL']]
+VEHICLES = ['Cars', 'Cars Towing', 'Rigids', 'Single Artics',
+            'Double Artics', 'Road Trains', 'All']  # Block rows 1 to 7
+FREE = b' ** FREE'                      # Unimpeded speed block
+FREE_ROWS = 13                          # Row of all vehicles
+FREE_SPEED = slice(20, 26)
+SEED_ROW = 3
+SHAPE = (len(BLOCKS), BLOCK_DATA_ROWS - 2, len(INDICIES))
+
+OutFile = namedtuple('OutFile', 'seed length unimpeded_speed values lines')
+
+
+def fields(line):
+    """ Return list of stripped fields of block line """
+    return [line[field].strip(b' ') for field in FIELDS]
+
+
+def index(bidx, row, col):
+    """ Return position of block, vehicle row and field in values """
+    return (bidx * SHAPE[1] + row) * SHAPE[2] + col
+
+
+def parse(lines):
+    """ Return OutFile from iterable of OUT file lines (bytes).
+
+    Raises ValueError if the file format is not recognised.
+    """
+    lines = iter(lines)
+    values = array('d', bytes(8 * SHAPE[0] * SHAPE[1] * SHAPE[2]))
+    blocks = []
+    try:
+        # Seed from file header
+        for x in range(SEED_ROW):
+            line = next(lines)
+        try:
+            seed = int(line.split(b'.')[0].split(b'_seed')[1])
+        except (IndexError, ValueError):
+            raise ValueError("file header does not contain seed")
+
+        for bidx, (search, extra_rows, name) in enumerate(BLOCKS):
+            # Find block
+            for line in lines:
+                if line.startswith(search):
+                    break
+            else:
+                raise ValueError("%s block not found" % name)
+            if not bidx:
+                length = int(line.split(b'(')[1].split(b'.')[0])
+            # Skip block header
+            for x in range(extra_rows - 1):
+                next(lines)
+            # Load each model output row line from block
+            block = tuple(next(lines).rstrip(b'\r\n')
+                          for x in range(BLOCK_DATA_ROWS))
+            for row in range(BLOCK_HEADER_ROWS, BLOCK_DATA_ROWS):
+                line = block[row]
+                pos = index(bidx, row - 2, 0)
+                for col in range(1, SHAPE[2]):
+                    field = line[FIELDS[col]]
+                    if field and not field.isspace():
+                        values[pos + col] = float(field)
+            blocks.append(block)
+
+        # Find unimpeded speed all
+        for line in lines:
+            if line.startswith(FREE):
+                break
+        else:
+            raise ValueError("unimpeded speed block not found")
+        for x in range(FREE_ROWS):
+            line = next(lines)
+        unimpeded_speed = float(line[FREE_SPEED])
+    except StopIteration:
+        raise ValueError("unexpected end of file")
+    except IndexError:
+        raise ValueError("block length not found")
+
+    return OutFile(seed, length, unimpeded_speed, values, tuple(blocks))
+
+
+def read(filename):
+    """ Return OutFile read from filename """
+    with open(filename, 'rb') as fp:
+        return parse(fp)
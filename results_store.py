@@ -0,0 +1,156 @@
+#! /usr/bin/env python
+""" Columnar store of Trarr seed results for analysis across options.
+
+One tidy row is kept for each option, seed, block, vehicle category and
+metric. The store is a Parquet or Feather file when the optional pyarrow
+package is installed, otherwise a csv file.
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+import csv
+import os
+import tempfile
+import outfile
+from rodfile import file_mode
+
+
+COLUMNS = ['option', 'seed', 'block', 'vehicle', 'metric', 'value']
+# Field number (from 1) and metric name
+METRICS = [(2, 'travel_time_sec'),
+           (4, 'speed_kmh'),
+           (12, 'petrol_ml'),
+           (13, 'diesel_ml'),
+           (6, 'ptsf_pct'),
+           (15, 'flow_vph')]
+
+
+def tidy_rows(option, results):
+    """ Yield store rows for OutFile results of an option """
+    for result in results:
+        for bidx, block in enumerate(outfile.BLOCKS):
+            for row, vehicle in enumerate(outfile.VEHICLES, start=1):
+                pos = outfile.index(bidx, row, 0)
+                for col, metric in METRICS:
+                    yield (option, result.seed, block[2], vehicle, metric,
+                           result.values[pos + col - 1])
+
+
+def store_format(store):
+    """ Return (store filename, format) falling back to csv """
+    name, ext = os.path.splitext(store)
+    ext = ext.lower()
+    if ext in ('.parquet', '.feather'):
+        try:
+            import pyarrow
+        except ImportError:
+            print("pyarrow is not installed - writing %s.csv" % name)
+            return name + '.csv', 'csv'
+        return store, ext[1:]
+    return store, 'csv'
+
+
+def read_csv(store):
+    with open(store, newline='') as fp:
+        reader = csv.reader(fp)
+        next(reader, None)                  # Column headings
+        for row in reader:
+            yield (row[0], int(row[1]), row[2], row[3], row[4],
+                   float(row[5]))
+
+
+def arrow_table(rows):
+    """ Return pyarrow table of rows """
+    import pyarrow
+    schema = pyarrow.schema([('option', pyarrow.string()),
+                             ('seed', pyarrow.int64()),
+                             ('block', pyarrow.string()),
+                             ('vehicle', pyarrow.string()),
+                             ('metric', pyarrow.string()),
+                             ('value', pyarrow.float64())])
+    columns = list(zip(*rows)) or [[]] * len(COLUMNS)
+    return pyarrow.Table.from_arrays(
+        [pyarrow.array(column, type=field.type)
+         for column, field in zip(columns, schema)], schema=schema)
+
+
+def write_table(store, fmt, rows):
+    """ Write rows (or pyarrow table) to store through a temporary file """
+    fd, tmp = tempfile.mkstemp(suffix='.' + fmt,
+                               dir=os.path.dirname(store) or '.')
+    os.close(fd)
+    if fmt == 'csv':
+        with open(tmp, 'w', newline='') as fp:
+            writer = csv.writer(fp)
+            writer.writerow(COLUMNS)
+            writer.writerows(rows)
+    else:
+        table = rows if hasattr(rows, 'schema') else arrow_table(rows)
+        if fmt == 'parquet':
+            import pyarrow.parquet
+            pyarrow.parquet.write_table(table, tmp)
+        else:
+            import pyarrow.feather
+            pyarrow.feather.write_feather(table, tmp)
+    os.chmod(tmp, file_mode(store))
+    os.replace(tmp, store)
+
+
+def read_arrow(store, fmt):
+    """ Return pyarrow table of Parquet or Feather store """
+    if fmt == 'parquet':
+        import pyarrow.parquet
+        return pyarrow.parquet.read_table(store)
+    import pyarrow.feather
+    return pyarrow.feather.read_table(store)
+
+
+def read_table(store, fmt):
+    """ Return list of rows in store """
+    if not os.path.isfile(store):
+        return []
+    if fmt == 'csv':
+        return list(read_csv(store))
+    table = read_arrow(store, fmt)
+    return list(zip(*[table.column(name).to_pylist() for name in COLUMNS]))
+
+
+def update_csv(store, options, rows):
+    """ Append rows to csv store, first removing rows of options if any """
+    with open(store, newline='') as fp:
+        reader = csv.reader(fp)
+        next(reader, None)                  # Column headings
+        kept = [row for row in reader if row[0] not in options]
+        replace = reader.line_num != len(kept) + 1
+    if replace:
+        write_table(store, 'csv', kept + rows)
+    else:
+        with open(store, 'a', newline='') as fp:
+            csv.writer(fp).writerows(rows)
+
+
+def update(store, fmt, rows):
+    """ Replace rows of the options in rows of store, in fmt of
+    store_format(), return store filename.
+
+    A csv store is appended to unless it has rows of the options. Parquet
+    and Feather tables are filtered without converting them to rows.
+    """
+    rows = list(rows)
+    options = set(row[0] for row in rows)
+    if not os.path.isfile(store):
+        write_table(store, fmt, rows)
+    elif fmt == 'csv':
+        update_csv(store, options, rows)
+    else:
+        import pyarrow
+        import pyarrow.compute
+        table = read_arrow(store, fmt)
+        kept = table.filter(pyarrow.compute.invert(pyarrow.compute.is_in(
+            table.column('option'), value_set=pyarrow.array(
+                sorted(options), type=pyarrow.string()))))
+        new = arrow_table(rows)
+        write_table(store, fmt, pyarrow.concat_tables(
+            [kept.cast(new.schema), new]))
+    return store
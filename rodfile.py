@@ -0,0 +1,298 @@
+#! /usr/bin/env python
+""" Trarr road (ROD) file model.
+
+A ROD file is a 9 line header followed by fixed width records, one for each
+0.1 km of road, starting with the chainage (km) in the first 9 columns.
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+import locale
+import logging
+import math
+import mmap
+import os
+import stat
+import tempfile
+
+
+HEADER_LINES = 9
+RECORD_SIZE = 109
+CHAINAGE_WIDTH = 9
+ODO_STEP_KM = 0.1
+ROUNDING_KM = .000001                   # 1mm rounding error
+BARRIER_COLUMNS = (11, 16)
+BARRIER_VALUE = b'-'     # Debug - use '+' instead of '-'
+OTLANE_COLUMNS = {'P': (22,), 'C': (27,), 'B': (22, 27)}
+OTLANE_VALUE = b'T'      # Debug - use 'Y' instead of 'T'
+HEADER_BYTES = 4096                     # Enough for the header of most files
+
+
+def header_length(data, lines=HEADER_LINES):
+    """ Return length of first lines of data (all data if fewer lines) """
+    length = 0
+    for x in range(lines):
+        length = data.find(b'\n', length) + 1
+        if not length:
+            return len(data)
+    return length
+
+
+def file_records(filename):
+    """ Return number of records in ROD file from its size """
+    with open(filename, 'rb') as fp:
+        header = fp.read(HEADER_BYTES)
+        if header.count(b'\n') < HEADER_LINES:
+            header += fp.read()
+    return (os.path.getsize(filename) - header_length(header)) // RECORD_SIZE
+
+
+def replace_header(data, new_text, description=''):
+    """ Return (new first line(s), offset of rest of data).
+
+    First line is replaced with new_text and, if description is not empty,
+    second line with description. Line endings follow the source data.
+    """
+    encoding = locale.getpreferredencoding(False)
+    offset = data.find(b'\n') + 1
+    newline = b'\r\n' if data[offset - 2:offset] == b'\r\n' else b'\n'
+    header = new_text.encode(encoding) + newline
+    if description:
+        offset = data.find(b'\n', offset) + 1
+        header += description.encode(encoding) + newline
+    return header, offset
+
+
+def file_mode(filename):
+    """ Return permissions of filename, else of a new file (umask applied).
+
+    Temporary files are made 0600, so are given this mode before being
+    renamed as filename.
+    """
+    try:
+        return stat.S_IMODE(os.stat(filename).st_mode)
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_file(dst, blocks):
+    """ Write blocks of bytes to a temporary file and rename as dst. """
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(dst) or '.',
+                                     delete=False) as tmp:
+        for block in blocks:
+            tmp.write(block)
+    os.chmod(tmp.name, file_mode(dst))
+    os.replace(tmp.name, dst)
+
+
+def map_file(filename):
+    """ Return read-only memory map of file (bytes if file is empty) """
+    with open(filename, 'rb') as fp:
+        try:
+            return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:                  # Empty files can't be mapped
+            return b''
+
+
+def same_file(filename1, filename2):
+    return (os.path.normcase(os.path.abspath(filename1)) ==
+            os.path.normcase(os.path.abspath(filename2)))
+
+
+def copy_file(src, dst, new_text=None, description=''):
+    """ Copy text file src to dst, optionally replacing first line(s). """
+    data = map_file(src)
+    offset = 0
+    header = b''
+    if new_text is not None:
+        header, offset = replace_header(data, new_text, description)
+    if same_file(src, dst):
+        # Windows can't replace a file while it is mapped
+        with memoryview(data) as view:
+            blocks = [header, view[offset:].tobytes()]
+        if isinstance(data, mmap.mmap):
+            data.close()
+        write_file(dst, blocks)
+        return
+    with memoryview(data) as view:
+        write_file(dst, [header, view[offset:]])
+    if isinstance(data, mmap.mmap):
+        data.close()
+
+
+class RodFile(object):
+    """ ROD file header and records.
+
+    Records are read from the source data, a read-only memory map when read
+    from a file. Edits copy only the spans of changed records into patches,
+    so writing an option is one pass of the source into the new file.
+
+    Raises ValueError if data is not a valid ROD file.
+    """
+
+    def __init__(self, data, filename=None):
+        self.filename = filename
+        length = header_length(data)
+        if (len(data) - length) % RECORD_SIZE != 0:
+            raise ValueError("Invalid file size - must be 9 line header and"
+                             " records must be %s characters long"
+                             % RECORD_SIZE)
+        if len(data) - length < RECORD_SIZE:
+            raise ValueError("Invalid file format"
+                             " - file must contain at least one record")
+        self.header = bytes(data[:length])
+        self._data = data
+        self._records = memoryview(data)[length:]
+        self._patches = []                  # [first, stop, bytearray]
+        logging.debug('filename header_length nrecs: %s, %i, %i',
+                      filename, length, self.nrecs)
+
+    @classmethod
+    def from_file(cls, filename):
+        """ Return RodFile mapped from filename """
+        data = map_file(filename)
+        try:
+            return cls(data, filename)
+        except ValueError:
+            if isinstance(data, mmap.mmap):
+                data.close()
+            raise
+
+    def close(self):
+        """ Release memory map of source file (shared by copies) """
+        if isinstance(self._data, mmap.mmap) and not self._data.closed:
+            self._records.release()
+            self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def copy(self):
+        """ Return independent copy for editing, sharing the source data """
+        rod = self.__class__.__new__(self.__class__)
+        rod.filename = self.filename
+        rod.header = self.header
+        rod._data = self._data
+        rod._records = self._records
+        rod._patches = [[first, stop, bytearray(buf)]
+                        for first, stop, buf in self._patches]
+        return rod
+
+    @property
+    def nrecs(self):
+        return len(self._records) // RECORD_SIZE
+
+    def record(self, nrec):
+        """ Return record number nrec (from 0) """
+        for first, stop, buf in self._patches:
+            if first <= nrec < stop:
+                offset = (nrec - first) * RECORD_SIZE
+                return bytes(buf[offset:offset + RECORD_SIZE])
+        offset = nrec * RECORD_SIZE
+        return self._records[offset:offset + RECORD_SIZE].tobytes()
+
+    def chainage(self, nrec):
+        """ Return chainage (km) of record number nrec (from 0) """
+        return float(self.record(nrec)[:CHAINAGE_WIDTH])
+
+    @property
+    def odo_start_km(self):
+        return self.chainage(0)
+
+    @property
+    def odo_end_km(self):
+        return self.chainage(self.nrecs - 1)
+
+    def record_index(self, km):
+        """ Return number of first record at or after chainage km """
+        return int(math.ceil((km - ROUNDING_KM - self.odo_start_km)
+                             / ODO_STEP_KM))
+
+    def record_range(self, start_km, end_km):
+        """ Return (first, stop) record numbers from start_km to end_km. """
+        odo_start_km = self.odo_start_km
+        odo_end_km = self.odo_end_km
+        if start_km < odo_start_km:
+            logging.error('otl_start_km, odo_start_km:   %f, %f',
+                          start_km, odo_start_km)
+            raise ValueError("Invalid start overtaking lane chainage -"
+                             " Overtaking lane can't start before first road"
+                             " chainage")
+        if end_km > odo_end_km + ODO_STEP_KM:
+            logging.error('otl_end_km, odo_end_km:       %f, %f',
+                          end_km, odo_end_km)
+            raise ValueError("Invalid end overtaking lane chainage -"
+                             " Overtaking lane can't end after last road"
+                             " chainage")
+        if int(round((odo_end_km - odo_start_km) / ODO_STEP_KM) + 1) != \
+                self.nrecs:
+            raise ValueError("Invalid file format - wrong number of lines"
+                             " between start and end distances")
+
+        first = self.record_index(start_km)
+        stop = first + max(0, int(math.ceil((end_km - start_km - ROUNDING_KM)
+                                            / ODO_STEP_KM)))
+        logging.debug('start_km end_km first stop: %3.1f, %3.1f, %i, %i',
+                      start_km, end_km, first, stop)
+        return first, min(stop, self.nrecs)
+
+    def _patch(self, first, stop):
+        """ Return (first record, buffer) of patch covering first to stop.
+
+        Overlapping and adjoining patches are merged into the new patch.
+        """
+        merge = [patch for patch in self._patches
+                 if patch[0] <= stop and patch[1] >= first]
+        lo = min([first] + [patch[0] for patch in merge])
+        hi = max([stop] + [patch[1] for patch in merge])
+        buf = bytearray(self._records[lo * RECORD_SIZE:hi * RECORD_SIZE])
+        for pfirst, pstop, pbuf in merge:
+            buf[(pfirst - lo) * RECORD_SIZE:(pstop - lo) * RECORD_SIZE] = pbuf
+        merged = set(id(patch) for patch in merge)
+        self._patches = sorted([patch for patch in self._patches
+                                if id(patch) not in merged] + [[lo, hi, buf]])
+        return lo, buf
+
+    def set_column(self, column, value, first, stop):
+        """ Set one character column (from 1) of records first to stop """
+        if stop > first:
+            lo, buf = self._patch(first, stop)
+            offset = column - 1
+            buf[(first - lo) * RECORD_SIZE + offset:
+                (stop - lo) * RECORD_SIZE:RECORD_SIZE] = value * (stop - first)
+
+    def set_overtaking_lane(self, start_km, end_km, direction):
+        """ Add barrier line and overtaking lane from start_km to end_km.
+
+        direction is P, C or B (direction 1 and/or 2).
+        """
+        first, stop = self.record_range(start_km, end_km)
+        for column in BARRIER_COLUMNS:
+            self.set_column(column, BARRIER_VALUE, first, stop)
+        for column in OTLANE_COLUMNS[direction]:
+            self.set_column(column, OTLANE_VALUE, first, stop)
+
+    def blocks(self):
+        """ Yield record data, unchanged spans straight from the source """
+        pos = 0
+        for first, stop, buf in self._patches:
+            yield self._records[pos * RECORD_SIZE:first * RECORD_SIZE]
+            yield buf
+            pos = stop
+        yield self._records[pos * RECORD_SIZE:]
+
+    def write(self, dst, new_text, description=''):
+        """ Write file as dst with first line new_text, second description """
+        header, offset = replace_header(self.header, new_text, description)
+        blocks = [header, self.header[offset:]] + list(self.blocks())
+        if self.filename and same_file(dst, self.filename):
+            # Release source before replacing it
+            blocks = [bytes(block) for block in blocks]
+            self.close()
+        write_file(dst, blocks)
@@ -0,0 +1,110 @@
+#! /usr/bin/env python
+""" Content addressed cache of Trarr OUT files.
+
+A simulation is identified by the MD5 hashcodes of its road (ROD, MLT, OBS)
+and traffic (TRF) files plus the Trarr executable, so an unchanged road and
+traffic pair is never simulated twice. Least recently used OUT files are
+removed when the cache grows past its size limit.
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+
+INDEX_FILE = 'index.json'
+HASH_BLOCK_SIZE = 1024 * 1024
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+def file_hashcode(src):
+    """ Return lowercase MD5 hashcode of file """
+    hashcode = hashlib.md5()
+    with open(src, 'rb') as fp:
+        for block in iter(lambda: fp.read(HASH_BLOCK_SIZE), b''):
+            hashcode.update(block)
+    return hashcode.hexdigest()
+
+
+class RunCache(object):
+    """ Least recently used OUT file store keyed on simulation inputs. """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._hashcodes = {}
+        os.makedirs(directory, exist_ok=True)
+        self._index = OrderedDict()     # key: OUT size, oldest first
+        try:
+            with open(os.path.join(directory, INDEX_FILE)) as fp:
+                for key, size in json.load(fp):
+                    self._index[key] = size
+        except (IOError, OSError, ValueError):
+            pass
+
+    def hashcode(self, src):
+        """ Return file hashcode, hashing each unchanged file once """
+        stat = os.stat(src)
+        stamp = (os.path.abspath(src), stat.st_size, stat.st_mtime)
+        if stamp not in self._hashcodes:
+            self._hashcodes[stamp] = file_hashcode(src)
+        return self._hashcodes[stamp]
+
+    def job_key(self, road, traffic, trarr):
+        """ Return cache key for road and traffic files run by trarr """
+        road_name = os.path.splitext(road)[0]
+        key = hashlib.md5()
+        for src in (road_name + '.ROD', road_name + '.MLT',
+                    road_name + '.OBS', traffic, trarr):
+            key.update(self.hashcode(src).encode('ascii'))
+        return key.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.OUT')
+
+    def get(self, key, dst):
+        """ Copy cached OUT file to dst returning True, False if missing. """
+        size = self._index.get(key)
+        path = self._path(key)
+        if not size or not os.path.isfile(path) or \
+                os.path.getsize(path) != size:
+            self._index.pop(key, None)
+            return False
+        shutil.copyfile(path, dst)
+        self._index.move_to_end(key)
+        return True
+
+    def put(self, key, src):
+        """ Store copy of OUT file src under key. """
+        with tempfile.NamedTemporaryFile(dir=self.directory,
+                                         delete=False) as tmp:
+            with open(src, 'rb') as fp:
+                shutil.copyfileobj(fp, tmp)
+        os.replace(tmp.name, self._path(key))
+        self._index[key] = os.path.getsize(self._path(key))
+        self._index.move_to_end(key)
+        self.evict()
+
+    def evict(self):
+        """ Remove least recently used OUT files until under size cap. """
+        total = sum(self._index.values())
+        while total > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            total -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def save(self):
+        """ Write index file. """
+        with tempfile.NamedTemporaryFile('w', dir=self.directory,
+                                         delete=False) as tmp:
+            json.dump(list(self._index.items()), tmp)
+        os.replace(tmp.name, os.path.join(self.directory, INDEX_FILE))
@@ -0,0 +1,111 @@
+#! /usr/bin/env python
+""" Run times of past Trarr simulations to run the longest first.
+
+The work of a simulation is estimated from its input files without reading
+them in full: the number of ROD records (0.1 km each), the simulated time
+(TSE and tsi, TRF lines 7 and 8) and the vehicle class values of TRF lines
+48, 50 and 54. A simulation run before is expected to take as long as its
+last run, any other its work times the median seconds per work of past runs.
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+from collections import OrderedDict
+import json
+import os
+import tempfile
+from rodfile import file_records
+from trf_template import CLASS_LINES, CLASS_WIDTH, ITEMS, ITEM_WIDTH
+
+
+HISTORY_FILE = 'simon_run.history'
+MAX_RUNS = 100000                       # Oldest runs are forgotten
+TIME_ITEMS = ['TSE', 'tsi']             # Simulated time and warm up
+
+
+def job_name(road, traffic):
+    """ Return <road>_<traffic> name of simulation """
+    return (os.path.splitext(os.path.basename(road))[0] + '_' +
+            os.path.splitext(os.path.basename(traffic))[0])
+
+
+def traffic_features(traffic):
+    """ Return (simulated time, sum of vehicle class values) of TRF file """
+    with open(traffic) as fp:
+        lines = fp.read().splitlines()
+    sim_time = sum(float(lines[line - 1][:ITEM_WIDTH])
+                   for name, line, fmt in ITEMS if name in TIME_ITEMS)
+    volume = 0.0
+    for line, fmt in CLASS_LINES:
+        text = lines[line - 1][:CLASS_WIDTH]
+        volume += sum(float(text[start:start + ITEM_WIDTH])
+                      for start in range(0, CLASS_WIDTH, ITEM_WIDTH)
+                      if text[start:start + ITEM_WIDTH].strip())
+    return sim_time, volume
+
+
+class RunHistory(object):
+    """ Seconds and work of past simulations by <road>_<traffic> name. """
+
+    def __init__(self, filename=HISTORY_FILE):
+        self.filename = filename
+        self._runs = OrderedDict()      # name: [seconds, work], oldest first
+        self._records = {}
+        self._traffics = {}
+        self._rate = None
+        try:
+            with open(filename) as fp:
+                for name, seconds, work in json.load(fp):
+                    self._runs[name] = [seconds, work]
+        except (IOError, OSError, ValueError):
+            pass
+
+    def work(self, road, traffic):
+        """ Return work of simulation, 1 if the files can't be read """
+        try:
+            if road not in self._records:
+                self._records[road] = file_records(road)
+            if traffic not in self._traffics:
+                self._traffics[traffic] = traffic_features(traffic)
+        except (IOError, OSError, IndexError, ValueError):
+            return 1.0
+        sim_time, volume = self._traffics[traffic]
+        return float(max(self._records[road], 1) * max(sim_time, 1.0) *
+                     max(volume, 1.0))
+
+    def rate(self):
+        """ Return median seconds per work of past runs (1 if none) """
+        if self._rate is None:
+            rates = sorted(seconds / work for seconds, work in
+                           self._runs.values() if work > 0)
+            self._rate = rates[len(rates) // 2] if rates else 1.0
+        return self._rate
+
+    def estimate(self, road, traffic):
+        """ Return expected seconds (or work if no history) of simulation """
+        run = self._runs.get(job_name(road, traffic))
+        if run:
+            return run[0]
+        return self.work(road, traffic) * self.rate()
+
+    def order(self, jobs):
+        """ Return (road, traffic) jobs longest first, ties in job order """
+        return sorted(jobs, key=lambda job: -self.estimate(*job))
+
+    def record(self, road, traffic, seconds):
+        """ Record seconds of simulation """
+        name = job_name(road, traffic)
+        self._runs[name] = [round(seconds, 3), self.work(road, traffic)]
+        self._runs.move_to_end(name)
+        while len(self._runs) > MAX_RUNS:
+            self._runs.popitem(last=False)
+        self._rate = None
+
+    def save(self):
+        """ Write history file. """
+        with tempfile.NamedTemporaryFile(
+                'w', dir=os.path.dirname(self.filename) or '.',
+                delete=False) as tmp:
+            json.dump([[name] + run for name, run in self._runs.items()], tmp)
+        os.replace(tmp.name, self.filename)
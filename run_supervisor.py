@@ -0,0 +1,220 @@
+#! /usr/bin/env python
+""" Supervise Trarr processes for long unattended runs.
+
+An asyncio event loop runs several Trarr processes at once. Each run is
+killed when it passes its wall clock timeout, or when the files it writes in
+its scratch directory (OUT and the fort.?? work files) stop growing for the
+stall time, as a hung or looping Trarr would otherwise hold its processor
+all night. Killed runs and crashes (no PASS or FAIL file) are retried after
+a backoff doubled on each retry. Runs Trarr marks FAIL are not retried as
+the same files fail again. Trarr output of every attempt is appended to
+<road>_<traffic>.stdout and .stderr logs.
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+import asyncio
+import os
+import shutil
+import sys
+import time
+from instrument import file_size, stage
+from simon_run import (FAIL_FILE, OUT_FILE, ROAD_FILES, TRAFFIC_FILE,
+                       TRARR_EXE, Result, bad_out_name, collect_job,
+                       out_name, prepare_job, trarr_command)
+
+
+LOGS = 'LOGS'
+POLL_SECONDS = 1.0                      # Longest time between stall checks
+MAX_BACKOFF = 600.0
+INPUT_FILES = [name for ext, name in ROAD_FILES] + [TRAFFIC_FILE]
+
+
+def log_names(road, traffic, logs=None):
+    """ Return (stdout, stderr) log filenames, in LOGS beside road file """
+    road_dir, name = os.path.split(os.path.splitext(out_name(road,
+                                                             traffic))[0])
+    directory = logs or os.path.join(road_dir, LOGS)
+    return (os.path.join(directory, name + '.stdout'),
+            os.path.join(directory, name + '.stderr'))
+
+
+def output_size(workdir):
+    """ Return total size of files Trarr has written in workdir """
+    return sum(file_size(os.path.join(workdir, name))
+               for name in os.listdir(workdir) if name not in INPUT_FILES)
+
+
+def backoff_seconds(backoff, retry):
+    """ Return seconds to wait before retry number (from 1) """
+    return min(backoff * 2 ** (retry - 1), MAX_BACKOFF)
+
+
+class Supervisor(object):
+    """ Run Trarr processes with timeouts, stall kills and retries.
+
+    timeout and stall are seconds, 0 for no limit.
+    """
+
+    def __init__(self, trarr=TRARR_EXE, max_workers=None, scratch=None,
+                 timeout=0, stall=0, retries=0, backoff=0, logs=None):
+        self.trarr = trarr
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.scratch = scratch
+        self.timeout = timeout
+        self.stall = stall
+        self.retries = retries
+        self.backoff = backoff
+        self.logs = logs
+        self.poll = min([POLL_SECONDS] + [limit / 4.0 for limit in
+                                          (timeout, stall) if limit])
+        self.workers = None
+
+    async def watch(self, process, workdir):
+        """ Wait for process, return why it was killed ('' if not) """
+        start = last_growth = time.perf_counter()
+        size = -1
+        waiting = asyncio.ensure_future(process.wait())
+        try:
+            while True:
+                done, pending = await asyncio.wait([waiting],
+                                                   timeout=self.poll)
+                if done:
+                    return ''
+                now = time.perf_counter()
+                new_size = output_size(workdir)
+                if new_size != size:
+                    size, last_growth = new_size, now
+                if self.timeout and now - start > self.timeout:
+                    reason = "timed out after %gs" % self.timeout
+                elif self.stall and now - last_growth > self.stall:
+                    reason = "stalled, no output for %gs" % self.stall
+                else:
+                    continue
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass                # Finished since the last check
+                await waiting
+                return reason
+        finally:
+            waiting.cancel()
+
+    async def attempt(self, road, traffic, number, logs):
+        """ Run Trarr once, return (Result, True if worth a retry) """
+        loop = asyncio.get_event_loop()
+        try:
+            workdir = await loop.run_in_executor(None, prepare_job, road,
+                                                 traffic, self.scratch)
+        except (IOError, OSError) as err:
+            return Result(road, traffic, None, False, str(err)), False
+        process = None
+        try:
+            with open(logs[0], 'ab') as out_log, \
+                    open(logs[1], 'ab') as err_log:
+                header = ("*** %s attempt %i %s\n" % (
+                    out_name(road, traffic), number,
+                    time.strftime('%Y-%m-%d %H:%M:%S'))).encode()
+                for log in (out_log, err_log):
+                    log.write(header)
+                    log.flush()
+                with stage('TRARR run', out_name(road, traffic),
+                           items=1) as timing:
+                    start = time.perf_counter()
+                    process = await asyncio.create_subprocess_exec(
+                        *trarr_command(self.trarr), cwd=workdir,
+                        stdin=asyncio.subprocess.DEVNULL, stdout=out_log,
+                        stderr=err_log)
+                    killed = await self.watch(process, workdir)
+                    seconds = time.perf_counter() - start
+                    timing.add(bytes_written=file_size(
+                        os.path.join(workdir, OUT_FILE)))
+            trarr_failed = os.path.isfile(os.path.join(workdir, FAIL_FILE))
+            result = await loop.run_in_executor(None, collect_job, workdir,
+                                                road, traffic)
+            result = result._replace(seconds=seconds)
+            if killed:
+                return result._replace(passed=False, message=killed), True
+            if not result.passed and not trarr_failed:
+                return result._replace(message="crashed, exit code %i"
+                                       % process.returncode), True
+            return result, False
+        except (IOError, OSError) as err:
+            return Result(road, traffic, None, False, str(err)), False
+        finally:
+            if process is not None and process.returncode is None:
+                process.kill()          # Cancelled, eg by Ctrl+C
+                await process.wait()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    async def simulate(self, road, traffic):
+        """ Run simulation with retries, return Result of the last attempt.
+
+        The worker is freed while waiting to retry.
+        """
+        logs = log_names(road, traffic, self.logs)
+        os.makedirs(os.path.dirname(logs[0]), exist_ok=True)
+        number = 1
+        while True:
+            async with self.workers:
+                result, retry = await self.attempt(road, traffic, number,
+                                                   logs)
+            if not retry or number > self.retries:
+                break
+            delay = backoff_seconds(self.backoff, number)
+            print("RETRY", out_name(road, traffic), result.message,
+                  "- attempt %i in %gs" % (number + 1, delay))
+            await asyncio.sleep(delay)
+            number += 1
+        if number > 1 and result.passed:
+            try:
+                os.remove(bad_out_name(road, traffic))  # Of a killed attempt
+            except OSError:
+                pass
+        elif number > 1:
+            result = result._replace(message="%s (%i attempts)"
+                                     % (result.message, number))
+        return result
+
+    async def start(self, jobs):
+        """ Return task of each (road, traffic) job, started in job order """
+        if self.workers is None:
+            self.workers = asyncio.Semaphore(self.max_workers)
+        return [asyncio.ensure_future(self.simulate(road, traffic))
+                for road, traffic in jobs]
+
+
+def supervise_jobs(jobs, trarr=TRARR_EXE, max_workers=None, scratch=None,
+                   **limits):
+    """ Run (road, traffic) jobs under a Supervisor, yield each Result.
+
+    limits are the timeout, stall, retries, backoff and logs of Supervisor.
+    Jobs wait for a free worker in order. jobs may be an iterator given more
+    jobs as results are yielded (see adaptive_seeds.py). Trarr processes
+    still running when the caller stops are killed.
+    """
+    if sys.platform == 'win32' and sys.version_info < (3, 8):
+        asyncio.set_event_loop_policy(
+            asyncio.WindowsProactorEventLoopPolicy())
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    supervisor = Supervisor(trarr, max_workers, scratch, **limits)
+    jobs = iter(jobs)
+    pending = set()
+    try:
+        while True:
+            pending.update(loop.run_until_complete(supervisor.start(jobs)))
+            if not pending:
+                break
+            done, pending = loop.run_until_complete(asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED))
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.wait(pending))
+        loop.close()
+        asyncio.set_event_loop(None)
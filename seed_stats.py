@@ -0,0 +1,97 @@
+#! /usr/bin/env python
+""" Statistics of Trarr simulation outputs across seeds.
+
+The values of each seed OUT file are stacked into one array of shape
+(seeds, blocks, rows, fields). As in the average sheets only positive values
+are counted, so blank and zero fields are left out of each statistic.
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+from collections import namedtuple
+import numpy as np
+import outfile
+
+
+# Two sided 95% Student t values by degrees of freedom (normal above 30)
+T95 = [np.nan, 12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306,
+       2.262, 2.228, 2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101,
+       2.093, 2.086, 2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048,
+       2.045, 2.042, 1.960]
+
+# Key metrics of INTERVAL block (both directions), All vehicles row
+KEY_BLOCK = 2
+KEY_ROW = 7
+#               [name,          field]
+KEY_METRICS = [['Speed',        3],
+               ['PTSF',         5],
+               ['Travel Time',  1]]
+
+SeedStats = namedtuple('SeedStats', 'count mean std min max ci')
+
+
+def stack(results):
+    """ Return array of OutFile values (seeds, blocks, rows, fields) """
+    return np.stack([np.frombuffer(result.values).reshape(outfile.SHAPE)
+                     for result in results])
+
+
+def averages(values):
+    """ Return averages of stacked values rounded to one decimal place.
+
+    Sums are divided by the number of positive values, sums that are not
+    positive are left unchanged.
+    """
+    total = values.sum(axis=0)
+    count = (values > 0).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / count
+    # Python round as np.round differs on halves
+    rounded = np.reshape([round(value, 1) for value in mean.ravel().tolist()],
+                         mean.shape)
+    return np.where(total > 0, rounded, total)
+
+
+def t95(dof):
+    """ Return 95% t values for array of degrees of freedom """
+    return np.take(T95, np.clip(dof, 0, len(T95) - 1))
+
+
+def statistics(values):
+    """ Return SeedStats of positive stacked values across seeds.
+
+    Statistics without enough positive values are nan.
+    """
+    mask = values > 0
+    count = mask.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(mask, values, 0.0).sum(axis=0) / count
+        dev = np.where(mask, values - mean, 0.0)
+        std = np.sqrt((dev * dev).sum(axis=0) / (count - 1))
+        std[count < 2] = np.nan
+        ci = t95(count - 1) * std / np.sqrt(count)
+    lowest = np.where(mask, values, np.inf).min(axis=0)
+    highest = np.where(mask, values, -np.inf).max(axis=0)
+    lowest[count == 0] = np.nan
+    highest[count == 0] = np.nan
+    return SeedStats(count, mean, std, lowest, highest, ci)
+
+
+def relative_ci(stats):
+    """ Return 95% confidence intervals as a fraction of the means """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(stats.mean > 0, stats.ci / stats.mean, np.nan)
+
+
+def precision(stats):
+    """ Return [(name, relative 95% CI)] of key metrics, nan if unknown """
+    relative = relative_ci(stats)
+    return [(name, float(relative[KEY_BLOCK, KEY_ROW, field]))
+            for name, field in KEY_METRICS]
+
+
+def converged(stats, tolerance):
+    """ Return True if the relative 95% CI of every key metric is within
+    tolerance (a fraction) """
+    return all(value <= tolerance for name, value in precision(stats))
@@ -0,0 +1,68 @@
+#! /usr/bin/env python
+""" Simon command line, one entry point for the Simon scripts.
+
+Each subcommand imports only the script it runs, so eg simon option starts
+without loading openpyxl or numpy. Arguments after the subcommand are those
+of the script, eg:
+    simon option Demo.ROD 1.5 2.2 P Option.ROD "Option description"
+    simon trf "TrarrSetupTRF Demo.xlsx" --jobs 8
+    simon run proj_Demo\\Demo proj_Demo\\Demo --jobs 8
+    simon average "Demo*"
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+import importlib
+import sys
+
+
+#            [command,    module,           description]
+COMMANDS = [['option',   'option_editor',  "Make overtaking lane option road"
+                                           " files (option_editor.py)"],
+            ['trf',      'make_trf',       "Make traffic files from a"
+                                           " TRFdata workbook (make_trf.py)"],
+            ['run',      'simon_run',      "Run Trarr simulations in"
+                                           " parallel (simon_run.py)"],
+            ['worker',   'simon_worker',   "Run Trarr simulations from a"
+                                           " shared queue (simon_worker.py)"],
+            ['average',  'avg_seeds',      "Make average sheets of seed"
+                                           " OUT files (avg_seeds.py)"],
+            ['pipeline', 'simon_pipeline', "Make, run and average in one"
+                                           " pipeline (simon_pipeline.py)"],
+            ['archive',  'out_archive',    "Compress OUT files with a"
+                                           " summary (out_archive.py)"]]
+
+
+def usage():
+    """ Display usage information """
+    print("usage: simon {%s} ..." % ','.join(command[0]
+                                             for command in COMMANDS))
+    print()
+    print("Simon command line for Trarr traffic simulations.")
+    print()
+    print("commands:")
+    for command, module, description in COMMANDS:
+        print("  %-10s%s" % (command, description))
+    print()
+    print("Use simon <command> -h for help on a command.")
+
+
+def main(argv=None):
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ('-h', '--help'):
+        usage()
+        sys.exit()
+    modules = dict((command, module) for command, module, x in COMMANDS)
+    if argv[0] not in modules:
+        usage()
+        sys.exit("Command %s is invalid. Exiting..." % argv[0])
+
+    # Run script as if called directly
+    sys.argv = ['simon ' + argv[0]] + argv[1:]
+    importlib.import_module(modules[argv[0]]).main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+#! /usr/bin/env python
+""" Make, simulate and average Trarr options in one pipeline.
+
+Alternative to DoSimon.bat. Instead of waiting for each stage to finish, the
+stages are tasks of one dependency graph sharing one process pool:
+ - traffic files of each TrarrSetupTRF column (make_trf.py),
+ - option road files of each MakeSimonSetup row (option_editor.py),
+ - Trarr simulations of each road and traffic file (simon_run.py), started
+   as soon as both files are made,
+ - averages of each <road>_<traffic> group (avg_seeds.py), written as soon
+   as all its seeds are simulated.
+
+Run from the proj_ directory with the same parameters as DoSimon, eg:
+python ..\\simon_pipeline.py HW4_Sec3b HW4S3b S3b
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+import argparse
+import concurrent.futures
+import fnmatch
+import glob
+import logging
+import os
+import sys
+import avg_seeds
+import make_trf
+import option_editor
+import simon_run
+from trf_template import trf_name
+
+
+TRF_WORKBOOK = 'TrarrSetupTRF%s.xlsx'
+SETUP_FILE = 'MakeSimonSetup%s.bat'
+STAGES = ['traffic', 'option', 'simulation', 'average']
+
+
+def usage():
+    """ Return command line parser """
+    parser = argparse.ArgumentParser(description=
+            "Make, simulate and average Trarr options in one pipeline.",
+            epilog=' eg: simon_pipeline.py HW4_Sec3b HW4S3b S3b -j 8')
+    parser.add_argument('road', nargs='?', default='',
+                        help='Roadfile (without extension, default: all)')
+    parser.add_argument('traffic', nargs='?', default='',
+                        help='Trafficfile (without extension, default: all)')
+    parser.add_argument('roadsec', nargs='?', default='',
+                        help='Suffix of %s and %s'
+                             % (TRF_WORKBOOK, SETUP_FILE))
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='Number of tasks to run at once'
+                             ' (default: number of processors)')
+    parser.add_argument('--trarr', default=simon_run.TRARR_EXE,
+                        help='Trarr executable (default: %(default)s)')
+    parser.add_argument('--scratch', default=None,
+                        help='Directory for job working directories'
+                             ' (default: system temp directory)')
+    return parser
+
+
+def group_name(road, traffic):
+    """ Return average group (basefile) of road and traffic file """
+    return os.path.basename(simon_run.out_name(road, traffic)).split(
+        '_seed')[0]
+
+
+class Pipeline(object):
+    """ Tasks of a Simon study and the files each task waits for.
+
+    Road and traffic files are ready when no option row or traffic column
+    still has to make them. Each road and traffic pair is simulated once
+    both are ready, and a group is averaged once all its pairs are done.
+    Roads of failed option rows and traffic files of failed traffic
+    columns are not simulated, even if made before.
+    """
+
+    def __init__(self, executor, trarr, scratch=None):
+        self.executor = executor
+        self.trarr = trarr
+        self.scratch = scratch
+        self.tasks = {}                 # future: (stage, key)
+        self.roads = {}                 # road: rows still to make it
+        self.traffics = {}              # traffic: columns still to make it
+        self.failed_roads = set()       # Roads of failed option rows
+        self.failed_traffics = set()    # Traffics of failed columns
+        self.groups = {}                # basefile: [pairs to do, simulated]
+        self.done = dict((stage, 0) for stage in STAGES)
+        self.failed = dict((stage, 0) for stage in STAGES)
+        self.manifest = avg_seeds.load_manifest()
+
+    def add_traffics(self, pattern, columns):
+        """ Add traffic files matching pattern, existing or from columns.
+
+        Returns list of traffic files made by each column.
+        """
+        pattern += '*.TRF'
+        for traffic in glob.glob(pattern):
+            self.traffics.setdefault(traffic, 0)
+        made = []
+        for col, column in columns:
+            name = make_trf.cell(column, make_trf.TRF_NAME_ROW)
+            traffics = [trf_name(name, seed)
+                        for seed in make_trf.enabled_seeds(column)]
+            traffics = [traffic for traffic in traffics
+                        if fnmatch.fnmatch(traffic, pattern)]
+            for traffic in traffics:
+                self.traffics[traffic] = self.traffics.get(traffic, 0) + 1
+            made.append(traffics)
+        return made
+
+    def add_roads(self, pattern, rows):
+        """ Add road files matching pattern, existing or from option rows """
+        pattern += '*.ROD'
+        for road in glob.glob(pattern):
+            self.roads.setdefault(road, 0)
+        for lnum, row in rows:
+            if len(row) > 4 and fnmatch.fnmatch(row[4], pattern):
+                self.roads[row[4]] = self.roads.get(row[4], 0) + 1
+        for road in self.roads:
+            for traffic in self.traffics:
+                basefile = group_name(road, traffic)
+                self.groups.setdefault(basefile, [0, 0])[0] += 1
+
+    def submit(self, stage, key, fn, *args):
+        """ Submit task of stage to the process pool """
+        self.tasks[self.executor.submit(fn, *args)] = (stage, key)
+
+    def start(self):
+        """ Simulate all pairs of road and traffic files already ready """
+        for road, count in sorted(self.roads.items()):
+            if not count:
+                self.road_ready(road)
+
+    def road_ready(self, road):
+        if road in self.failed_roads or not os.path.isfile(road):
+            print("%s %s - not simulated." % (road, "option failed" if road
+                  in self.failed_roads else "not made"), file=sys.stderr)
+            del self.roads[road]
+            for traffic in sorted(self.traffics):
+                self.pair_done(road, traffic, False)
+            return
+        for traffic, count in sorted(self.traffics.items()):
+            if not count:
+                self.simulate(road, traffic)
+
+    def traffic_ready(self, traffic):
+        if traffic in self.failed_traffics or not os.path.isfile(traffic):
+            print("%s %s - not simulated." % (traffic, "column failed"
+                  if traffic in self.failed_traffics else "not made"),
+                  file=sys.stderr)
+            del self.traffics[traffic]
+            for road in sorted(self.roads):
+                self.pair_done(road, traffic, False)
+            return
+        for road, count in sorted(self.roads.items()):
+            if not count:
+                self.simulate(road, traffic)
+
+    def option_made(self, dst, made=True):
+        """ Record option row of road dst as made (or failed) """
+        if dst in self.roads:
+            if not made:
+                self.failed_roads.add(dst)
+            self.roads[dst] -= 1
+            if not self.roads[dst]:
+                self.road_ready(dst)
+
+    def traffic_made(self, traffics, made=True):
+        """ Record traffic column of traffic files as made (or failed) """
+        for traffic in traffics:
+            if not made:
+                self.failed_traffics.add(traffic)
+            self.traffics[traffic] -= 1
+            if not self.traffics[traffic]:
+                self.traffic_ready(traffic)
+
+    def simulate(self, road, traffic):
+        self.submit('simulation', (road, traffic), simon_run.run_job,
+                    self.trarr, road, traffic, self.scratch)
+
+    def simulated(self, result):
+        simon_run.report(result)
+        self.record('simulation', result.passed)
+        self.pair_done(result.road, result.traffic, True)
+
+    def pair_done(self, road, traffic, simulated):
+        """ Average group once all its road and traffic pairs are done """
+        group = self.groups[group_name(road, traffic)]
+        group[0] -= 1
+        group[1] += simulated
+        if not group[0] and group[1]:
+            self.average(group_name(road, traffic))
+
+    def average(self, basefile):
+        files = avg_seeds.group_files(basefile + '_seed*.OUT').get(basefile)
+        if files:
+            self.submit('average', (basefile, files), avg_seeds.average_group,
+                        basefile, files)
+        else:
+            print("%s has no OUT files to average." % basefile,
+                  file=sys.stderr)
+            self.record('average', False)
+
+    def record(self, stage, passed):
+        self.done[stage] += 1
+        if not passed:
+            self.failed[stage] += 1
+
+    def finish(self, future):
+        """ Report finished task and start the tasks waiting for it """
+        stage, key = self.tasks.pop(future)
+        if stage == 'traffic':
+            name, traffics = key
+            error, filenames = future.result()
+            print(name)
+            if error:
+                print(error, file=sys.stderr)
+            self.record(stage, not error)
+            self.traffic_made(traffics, not error)
+        elif stage == 'simulation':
+            self.simulated(future.result())
+        else:
+            basefile, files = key
+            error, entries, rows = future.result()
+            print("AVERAGES", basefile)
+            if error:
+                print(error, file=sys.stderr)
+                self.manifest['groups'].pop(basefile, None)
+            else:
+                self.manifest['groups'][basefile] = files
+                self.manifest['files'].update(entries)
+            self.record(stage, not error)
+
+    def wait(self, timeout=None):
+        """ Wait for at least one task to finish (up to timeout seconds) """
+        done, not_done = concurrent.futures.wait(
+            list(self.tasks), timeout,
+            return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            self.finish(future)
+
+
+def main():
+
+    logging.basicConfig(level=logging.ERROR,
+                        format='%(levelname)s - %(message)s')
+
+    args = usage().parse_args()
+    if not os.path.isfile(args.trarr):
+        sys.exit("Error - Trarr executable %s not found. Exiting..."
+                 % args.trarr)
+    if args.jobs < 1:
+        sys.exit("Invalid number of jobs %i - must be at least 1. Exiting..."
+                 % args.jobs)
+
+    # Traffic columns and option rows
+    columns = []
+    wb_name = TRF_WORKBOOK % args.roadsec
+    if os.path.isfile(wb_name):
+        template = make_trf.load_template()
+        columns = make_trf.traffic_columns(make_trf.read_columns(wb_name))
+    rows = []
+    setup = SETUP_FILE % args.roadsec
+    if os.path.isfile(setup):
+        rows = option_editor.read_batch_file(setup)
+
+    with concurrent.futures.ProcessPoolExecutor(args.jobs) as executor:
+        pipeline = Pipeline(executor, args.trarr, args.scratch)
+        made = pipeline.add_traffics(args.traffic, columns)
+        pipeline.add_roads(args.road, rows)
+        print("Please wait - making %i traffic columns and %i options on"
+              " %i processors ..." % (len(columns), len(rows), args.jobs))
+        for (col, column), traffics in zip(columns, made):
+            name = make_trf.cell(column, make_trf.TRF_NAME_ROW)
+            pipeline.submit('traffic', (name, traffics), make_trf.make_column,
+                            column, template)
+        pipeline.start()
+
+        try:
+            # Make options between checking for finished tasks
+            sources = {}
+            for lnum, row in rows:
+                dst = option_editor.make_row(lnum, row, sources)
+                pipeline.record('option', dst is not None)
+                pipeline.option_made(row[4] if len(row) > 4 else None,
+                                     dst is not None)
+                pipeline.wait(0)
+            for rod in sources.values():
+                rod.close()
+            print("Simulating %i road and traffic files ..."
+                  % (len(pipeline.roads) * len(pipeline.traffics)))
+            while pipeline.tasks:
+                pipeline.wait()
+        finally:
+            avg_seeds.save_manifest(pipeline.manifest)
+
+    failed = 0
+    for stage in STAGES:
+        if pipeline.failed[stage]:
+            print("%i of %i %s tasks failed." % (pipeline.failed[stage],
+                  pipeline.done[stage], stage), file=sys.stderr)
+        failed += pipeline.failed[stage]
+    if failed:
+        sys.exit("%i of %i tasks failed. Exiting..."
+                 % (failed, sum(pipeline.done.values())))
+    print(" done.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+#! /usr/bin/env python
+""" Run Trarr simulations on all road and traffic files in parallel.
+
+Alternative to Simon.bat/SimonSays.bat. Each simulation gets its own scratch
+directory holding the fixed name Trarr input files (ROAD, MULTIP, OBS, TRAF)
+so several copies of Trarr can run on one computer at the same time.
+Simulations expected to take longest (see run_history.py) are run first and
+only a few are queued for each processor, so no processor is left idle while
+a long simulation finishes at the end of the run.
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+from collections import namedtuple
+import argparse
+import concurrent.futures
+import glob
+import itertools
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from adaptive_seeds import MIN_SEEDS, ROUND_SEEDS, TOLERANCE, SeedRounds
+from instrument import file_size, stage
+from run_cache import RunCache
+from run_history import HISTORY_FILE, RunHistory
+
+
+# Source file extension and Trarr fixed file name
+ROAD_FILES = [('.ROD', 'ROAD'),
+              ('.MLT', 'MULTIP'),
+              ('.OBS', 'OBS')]
+TRAFFIC_FILE = 'TRAF'
+OUT_FILE = 'OUT'
+PASS_FILE = 'PASS'
+FAIL_FILE = 'FAIL'
+BADOUTS = 'BADOUTS'
+TRARR_EXE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'Trarr.exe')
+QUEUED_PER_WORKER = 2
+
+Result = namedtuple('Result', 'road traffic outfile passed message seconds',
+                    defaults=(0.0,))
+
+
+def usage():
+    """ Return command line parser """
+    parser = argparse.ArgumentParser(description=
+            "Run Trarr simulations on all road and traffic files.",
+            epilog=' eg: simon_run.py proj_HW4\\HW4S3 proj_HW4\\HW4S3 -j 8')
+    parser.add_argument('road', nargs='?', default='',
+                        help='Roadfile (without extension, default: all)')
+    parser.add_argument('traffic', nargs='?', default='',
+                        help='Trafficfile (without extension, default: all)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='Number of simulations to run at once'
+                             ' (default: number of processors)')
+    parser.add_argument('--trarr', default=TRARR_EXE,
+                        help='Trarr executable (default: %(default)s)')
+    parser.add_argument('--scratch', default=None,
+                        help='Directory for job working directories'
+                             ' (default: system temp directory)')
+    parser.add_argument('--cache', default=None,
+                        help='Directory of cached OUT files, unchanged road'
+                             ' and traffic files are not simulated again')
+    parser.add_argument('--cache-size', type=int, default=1024,
+                        help='Cache size limit in MB (default: %(default)s)')
+    parser.add_argument('--history', default=os.path.join(
+                            os.path.dirname(TRARR_EXE), HISTORY_FILE),
+                        help='Run times of past simulations, used to run the'
+                             ' longest first (default: %(default)s)')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Simulate seeds in rounds until the averages'
+                             ' of each road and traffic converge, seeds'
+                             ' with OUT files are not simulated again')
+    parser.add_argument('--tolerance', type=float, default=100 * TOLERANCE,
+                        help='Converged when the 95%% confidence interval of'
+                             ' speed, PTSF and travel time is within this'
+                             ' percent of the mean (default: %(default)s)')
+    parser.add_argument('--min-seeds', type=int, default=MIN_SEEDS,
+                        help='Seeds simulated before --adaptive checks'
+                             ' convergence (default: %(default)s)')
+    parser.add_argument('--round-seeds', type=int, default=ROUND_SEEDS,
+                        help='Seeds added in each --adaptive round'
+                             ' (default: %(default)s)')
+    parser.add_argument('--enqueue', default=None, metavar='QUEUE',
+                        help='Add simulations to a shared queue file for'
+                             ' simon_worker.py instead of running them')
+    supervise = parser.add_argument_group(
+        'supervised runs', 'Any of these options runs Trarr under a'
+        ' supervisor (see run_supervisor.py) that kills and retries hung'
+        ' simulations and keeps Trarr output in LOGS beside the road files')
+    supervise.add_argument('--timeout', type=float, default=0,
+                           help='Wall clock seconds before a simulation is'
+                                ' killed (default: no limit)')
+    supervise.add_argument('--stall', type=float, default=0,
+                           help='Seconds without Trarr output file growth'
+                                ' before a simulation is killed'
+                                ' (default: no limit)')
+    supervise.add_argument('--retries', type=int, default=0,
+                           help='Retries of killed or crashed simulations'
+                                ' (default: 0)')
+    supervise.add_argument('--backoff', type=float, default=10.0,
+                           help='Seconds before the first retry, doubled on'
+                                ' each retry (default: %(default)s)')
+    supervise.add_argument('--logs', default=None,
+                           help='Directory of Trarr output logs'
+                                ' (default: LOGS beside the road file)')
+    return parser
+
+
+def find_jobs(road_pattern, traffic_pattern):
+    """ Return (road, traffic) file pairs in Simon.bat order. """
+    roads = sorted(glob.glob(road_pattern + '*.ROD'))
+    traffics = sorted(glob.glob(traffic_pattern + '*.TRF'))
+    return [(road, traffic) for road in roads for traffic in traffics]
+
+
+def out_name(road, traffic):
+    """ Return <road>_<traffic>.OUT name beside road file """
+    return (os.path.splitext(road)[0] + '_' +
+            os.path.splitext(os.path.basename(traffic))[0] + '.OUT')
+
+
+def bad_out_name(road, traffic):
+    """ Return failed OUT name in BADOUTS directory beside road file """
+    road_dir, road_file = os.path.split(out_name(road, traffic))
+    return os.path.join(road_dir, BADOUTS, road_file)
+
+
+def trarr_command(trarr):
+    """ Return command list to run Trarr (python stand-ins allowed) """
+    trarr = os.path.abspath(trarr)
+    if trarr.lower().endswith('.py'):
+        return [sys.executable, trarr]
+    return [trarr]
+
+
+def move_file(src, dst):
+    """ Move file replacing dst, also across drives """
+    try:
+        os.replace(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+        os.remove(src)
+
+
+def prepare_job(road, traffic, scratch=None):
+    """ Make scratch directory holding Trarr fixed name input files. """
+    with stage('prepare job', out_name(road, traffic)) as timing:
+        workdir = tempfile.mkdtemp(prefix='simon_', dir=scratch)
+        road_name = os.path.splitext(road)[0]
+        copies = [(road_name + ext, name) for ext, name in ROAD_FILES]
+        for src, name in copies + [(traffic, TRAFFIC_FILE)]:
+            shutil.copyfile(src, os.path.join(workdir, name))
+            timing.add(bytes_written=file_size(src), items=1)
+    return workdir
+
+
+def collect_job(workdir, road, traffic):
+    """ Move OUT file to its final name, BADOUTS if Trarr did not PASS. """
+    out = os.path.join(workdir, OUT_FILE)
+    if not os.path.isfile(out):
+        return Result(road, traffic, None, False, "no OUT file")
+    if os.path.isfile(os.path.join(workdir, PASS_FILE)):
+        dst = out_name(road, traffic)
+        move_file(out, dst)
+        return Result(road, traffic, dst, True, '')
+    dst = bad_out_name(road, traffic)
+    os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+    move_file(out, dst)
+    return Result(road, traffic, dst, False, "FAIL")
+
+
+def run_job(trarr, road, traffic, scratch=None):
+    """ Run Trarr on one road and traffic file pair, return Result. """
+    try:
+        workdir = prepare_job(road, traffic, scratch)
+    except (IOError, OSError) as err:
+        return Result(road, traffic, None, False, str(err))
+    try:
+        with stage('TRARR run', out_name(road, traffic), items=1) as timing:
+            start = time.perf_counter()
+            subprocess.call(trarr_command(trarr), cwd=workdir,
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
+            seconds = time.perf_counter() - start
+            timing.add(bytes_written=file_size(os.path.join(workdir,
+                                                            OUT_FILE)))
+        return collect_job(workdir, road, traffic)._replace(seconds=seconds)
+    except (IOError, OSError) as err:
+        return Result(road, traffic, None, False, str(err))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_jobs(jobs, trarr=TRARR_EXE, max_workers=None, scratch=None):
+    """ Run (road, traffic) jobs over a process pool, yield each Result.
+
+    Jobs are started in order, each by the first free worker. jobs may be
+    an iterator given more jobs as results are yielded (see
+    adaptive_seeds.py).
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    jobs = iter(jobs)
+    with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+        pending = set()
+        while True:
+            for road, traffic in itertools.islice(
+                    jobs, QUEUED_PER_WORKER * max_workers - len(pending)):
+                pending.add(executor.submit(run_job, trarr, road, traffic,
+                                            scratch))
+            if not pending:
+                break
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def cached_jobs(cache, jobs, trarr, keys):
+    """ Restore cached OUT files, return jobs still to simulate.
+
+    keys is filled with the cache key of each job to simulate.
+    """
+    remaining = []
+    for road, traffic in jobs:
+        try:
+            key = cache.job_key(road, traffic, trarr)
+        except (IOError, OSError):
+            remaining.append((road, traffic))   # Missing files fail in run
+            continue
+        if cache.get(key, out_name(road, traffic)):
+            print("CACHED", out_name(road, traffic))
+            continue
+        keys[road, traffic] = key
+        remaining.append((road, traffic))
+    return remaining
+
+
+def report(result):
+    """ Print one line per finished simulation """
+    if result.passed:
+        print("PASS", result.outfile)
+    else:
+        print("FAIL", out_name(result.road, result.traffic),
+              result.message)
+
+
+def main():
+
+    args = usage().parse_args()
+    if not os.path.isfile(args.trarr) and not args.enqueue:
+        sys.exit("Error - Trarr executable %s not found. Exiting..."
+                 % args.trarr)
+    if args.jobs < 1:
+        sys.exit("Invalid number of jobs %i - must be at least 1. Exiting..."
+                 % args.jobs)
+    if min(args.timeout, args.stall, args.retries, args.backoff) < 0:
+        sys.exit("Timeout, stall, retries and backoff must not be negative."
+                 " Exiting...")
+    supervised = args.timeout or args.stall or args.retries or args.logs
+    if args.adaptive and (args.tolerance <= 0 or args.min_seeds < 2 or
+                          args.round_seeds < 1):
+        sys.exit("Tolerance must be positive, min seeds at least 2 and round"
+                 " seeds at least 1. Exiting...")
+    if args.adaptive and args.enqueue:
+        sys.exit("--adaptive can't be used with --enqueue. Exiting...")
+
+    found = jobs = find_jobs(args.road, args.traffic)
+    if not jobs:
+        print(" No files matched - none processed.")
+        return
+
+    cache = None
+    keys = {}
+    if args.cache:
+        cache = RunCache(args.cache, args.cache_size * 1024 * 1024)
+        jobs = cached_jobs(cache, jobs, args.trarr, keys)
+    existing = {}
+    if args.adaptive:
+        # Seeds simulated before or restored from the cache count
+        existing = dict((job, out_name(*job)) for job in found
+                        if os.path.isfile(out_name(*job)))
+        jobs = [job for job in jobs if job not in existing]
+    history = RunHistory(args.history)
+    jobs = history.order(jobs)
+    if args.enqueue:
+        from work_queue import WorkQueue
+        queue = WorkQueue(args.enqueue)
+        queue.enqueue(jobs, [history.estimate(*job) for job in jobs])
+        queue.close()
+        print(" %i simulations queued in %s - run simon_worker.py %s on"
+              " each computer." % (len(jobs), args.enqueue, args.enqueue))
+        return
+    print("Please wait - simulating %i road and traffic files on %i"
+          " processors ..." % (len(jobs), args.jobs))
+    total = len(jobs)
+    rounds = None
+    if args.adaptive:
+        rounds = jobs = SeedRounds(jobs, args.tolerance / 100,
+                                   args.min_seeds, args.round_seeds,
+                                   existing)
+        if existing:
+            print(" %i seeds already simulated." % len(existing))
+        for message in rounds.messages:
+            print("CONVERGED", message)
+
+    if supervised:
+        from run_supervisor import supervise_jobs
+        results = supervise_jobs(jobs, args.trarr, args.jobs, args.scratch,
+                                 timeout=args.timeout, stall=args.stall,
+                                 retries=args.retries, backoff=args.backoff,
+                                 logs=args.logs)
+    else:
+        results = run_jobs(jobs, args.trarr, args.jobs, args.scratch)
+    failed = 0
+    try:
+        for result in results:
+            report(result)
+            if rounds:
+                message = rounds.done(result)
+                if message:
+                    print("CONVERGED", message)
+            if not result.passed:
+                failed += 1
+                continue
+            history.record(result.road, result.traffic, result.seconds)
+            if cache and (result.road, result.traffic) in keys:
+                cache.put(keys[result.road, result.traffic], result.outfile)
+    finally:
+        if cache:
+            cache.save()
+        history.save()
+
+    if rounds:
+        print(" %i of %i seed simulations not needed." % (rounds.skipped,
+                                                           total))
+        total -= rounds.skipped
+    if failed:
+        sys.exit("%i of %i simulations failed." % (failed, total))
+    print(" done.")
+
+
+if __name__ == '__main__':
+    main()
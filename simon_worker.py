@@ -0,0 +1,153 @@
+#! /usr/bin/env python
+""" Run Trarr simulations from a shared queue, on any number of computers.
+
+Queue the simulations of a study once with simon_run.py --enqueue, then
+start a worker on each computer with Trarr installed. Each worker claims
+simulations (longest first) until the queue is empty, runs up to --jobs at
+once like simon_run.py and records each result in the queue. A worker that
+stops without finishing its simulations has them claimed again by the other
+workers after --stale seconds. eg:
+    python simon_run.py proj_HW4\\HW4S3 proj_HW4\\HW4S3 --enqueue S:\\HW4.db
+    python simon_worker.py S:\\HW4.db --jobs 8     (on each computer)
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+import argparse
+import concurrent.futures
+import os
+import socket
+import sys
+import time
+from run_history import HISTORY_FILE, RunHistory
+from simon_run import TRARR_EXE, report, run_job
+from work_queue import STALE_SECONDS, STATES, WorkQueue
+
+
+POLL_SECONDS = 10.0                     # Wait for jobs running elsewhere
+HEARTBEATS_PER_STALE = 5
+
+
+def usage():
+    """ Return command line parser """
+    parser = argparse.ArgumentParser(description=
+            "Run Trarr simulations from a shared queue.",
+            epilog=' eg: simon_worker.py S:\\HW4.db -j 8')
+    parser.add_argument('queue', help='Queue file made by simon_run.py'
+                                      ' --enqueue')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='Number of simulations to run at once'
+                             ' (default: number of processors)')
+    parser.add_argument('--trarr', default=TRARR_EXE,
+                        help='Trarr executable (default: %(default)s)')
+    parser.add_argument('--scratch', default=None,
+                        help='Directory for job working directories'
+                             ' (default: system temp directory)')
+    parser.add_argument('--history', default=os.path.join(
+                            os.path.dirname(TRARR_EXE), HISTORY_FILE),
+                        help='Run times of past simulations'
+                             ' (default: %(default)s)')
+    parser.add_argument('--stale', type=float, default=STALE_SECONDS,
+                        help='Seconds without a heartbeat before a claimed'
+                             ' simulation is run again (default:'
+                             ' %(default)s)')
+    parser.add_argument('--poll', type=float, default=POLL_SECONDS,
+                        help='Seconds between checks for new or stale'
+                             ' simulations (default: %(default)s)')
+    parser.add_argument('--wait', action='store_true',
+                        help='Keep waiting for new simulations when the'
+                             ' queue is empty')
+    parser.add_argument('--status', action='store_true',
+                        help='Print number of simulations in each state'
+                             ' and exit')
+    return parser
+
+
+def status(queue):
+    """ Return queue counts as text """
+    counts = queue.counts()
+    return ', '.join("%i %s" % (counts[state], state) for state in STATES)
+
+
+def main():
+
+    args = usage().parse_args()
+    if not os.path.isfile(args.queue):
+        sys.exit("File path %s does not exist. Exiting..." % args.queue)
+    queue = WorkQueue(args.queue, args.stale)
+    if args.status:
+        print(status(queue))
+        return
+    if not os.path.isfile(args.trarr):
+        sys.exit("Error - Trarr executable %s not found. Exiting..."
+                 % args.trarr)
+    if args.jobs < 1:
+        sys.exit("Invalid number of jobs %i - must be at least 1. Exiting..."
+                 % args.jobs)
+    if args.stale <= 0 or args.poll <= 0:
+        sys.exit("Stale and poll seconds must be positive. Exiting...")
+
+    worker = "%s:%i" % (socket.gethostname(), os.getpid())
+    history = RunHistory(args.history)
+    beat = args.stale / HEARTBEATS_PER_STALE
+    print("Worker %s running %i simulations at once from %s (%s) ..."
+          % (worker, args.jobs, args.queue, status(queue)))
+
+    running = {}                        # future: job id
+    done_count = failed = 0
+    with concurrent.futures.ProcessPoolExecutor(args.jobs) as executor:
+        try:
+            last_beat = time.time()
+            while True:
+                while len(running) < args.jobs:
+                    job = queue.claim(worker)
+                    if not job:
+                        break
+                    job_id, road, traffic = job
+                    running[executor.submit(run_job, args.trarr, road,
+                                            traffic, args.scratch)] = job_id
+                if not running:
+                    counts = queue.counts()
+                    if not (args.wait or counts['queued'] or
+                            counts['running']):
+                        break
+                    time.sleep(args.poll)   # Jobs may be queued or go stale
+                    continue
+
+                finished, pending = concurrent.futures.wait(
+                    running, timeout=min(beat, args.poll),
+                    return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    job_id = running.pop(future)
+                    result = future.result()
+                    report(result)
+                    done_count += 1
+                    if not queue.finish(worker, job_id, result):
+                        print("Claim of %s lost to another worker - result"
+                              " not recorded." % result.outfile)
+                    if not result.passed:
+                        failed += 1
+                        continue
+                    history.record(result.road, result.traffic,
+                                   result.seconds)
+                if time.time() - last_beat >= beat:
+                    lost = set(running.values()) - set(
+                        queue.heartbeat(worker, list(running.values())))
+                    for job_id in lost:
+                        print("Claim of job %i lost to another worker."
+                              % job_id)
+                    last_beat = time.time()
+        finally:
+            queue.release(worker, list(running.values()))
+            history.save()
+
+    print(" Queue %s: %s." % (args.queue, status(queue)))
+    queue.close()
+    if failed:
+        sys.exit("%i of %i simulations failed." % (failed, done_count))
+    print(" done.")
+
+
+if __name__ == '__main__':
+    main()
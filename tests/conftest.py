@@ -0,0 +1,51 @@
+""" Shared fixtures: a small study simulated by trarr_stub.py """
+
+from __future__ import print_function
+import os
+import sys
+import pytest
+from bench import synth
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUB = os.path.join(ROOT, 'trarr_stub.py')
+TRF_LINES = 20
+SEED_LINE = 19
+
+
+def write_traffic(filename, seed):
+    """ Write TRF file read by trarr_stub.py, name line 1, seed line 19 """
+    lines = ['0'] * TRF_LINES
+    lines[0] = os.path.basename(filename)
+    lines[SEED_LINE - 1] = "%6i" % seed
+    with open(filename, 'w') as fp:
+        fp.write('\n'.join(lines) + '\n')
+    return filename
+
+
+def run_main(module, monkeypatch, *args):
+    """ Run main() of module with command line args """
+    monkeypatch.setattr(sys, 'argv', [module.__name__ + '.py'] + list(args))
+    module.main()
+
+
+@pytest.fixture
+def stub_env(monkeypatch):
+    """ Quick, repeatable stub simulations, changed with setenv """
+    for name in list(os.environ):
+        if name.startswith('TRARR_STUB_'):
+            monkeypatch.delenv(name)
+    monkeypatch.setenv('TRARR_STUB_TIME', '0.05')
+    monkeypatch.setenv('TRARR_STUB_DIST', 'fixed')
+    monkeypatch.setenv('TRARR_STUB_SEED', '1')
+    return monkeypatch
+
+
+@pytest.fixture
+def study(tmp_path, stub_env):
+    """ Return list of (road, traffic) jobs of 2 roads and 2 seeds """
+    roads = [synth.write_road(str(tmp_path / name), 30)
+             for name in ('R1', 'R2')]
+    traffics = [write_traffic(str(tmp_path / ("T1_seed%i.TRF" % seed)), seed)
+                for seed in (1001, 1002)]
+    return [(road, traffic) for road in roads for traffic in traffics]
@@ -0,0 +1,77 @@
+""" Seed rounds of simon_run.py --adaptive """
+
+from __future__ import print_function
+import os
+import pytest
+import simon_run
+from adaptive_seeds import SeedRounds
+from bench import synth
+
+
+pytest.importorskip('numpy')
+SEEDS = [1001 + 7 * number for number in range(8)]
+LOOSE = 1.0                             # Converged on any 2 seeds
+TIGHT = 1e-9                            # Never converged
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    """ Return (road, traffic) jobs of one road and traffic, all SEEDS """
+    road = str(tmp_path / 'R1.ROD')
+    return [(road, str(tmp_path / ("T1_seed%i.TRF" % seed)))
+            for seed in SEEDS]
+
+
+def simulate(job):
+    """ Write synthetic OUT file of job, return its Result """
+    filename = simon_run.out_name(*job)
+    seed = int(os.path.basename(job[1]).split('_seed')[1].split('.')[0])
+    synth.write_out(filename, 'T1', seed)
+    return simon_run.Result(job[0], job[1], filename, True, '')
+
+
+def run(rounds):
+    """ Simulate jobs as released, return (jobs simulated, messages) """
+    simulated = []
+    messages = list(rounds.messages)
+    while True:
+        released = list(rounds)
+        if not released:
+            return simulated, messages
+        for job in released:
+            simulated.append(job)
+            message = rounds.done(simulate(job))
+            if message:
+                messages.append(message)
+
+
+def test_converged_at_tolerance(jobs):
+    simulated, messages = run(SeedRounds(jobs, LOOSE, 3, 2))
+    assert simulated == jobs[:3]
+    assert len(messages) == 1
+    assert messages[0].startswith("R1_T1 converged after 3 seeds")
+    assert messages[0].endswith("5 seeds not simulated")
+
+
+def test_last_enabled_seed(jobs):
+    rounds = SeedRounds(jobs[:6], TIGHT, 3, 2)
+    simulated, messages = run(rounds)
+    assert simulated == jobs[:6]
+    assert messages == []
+    assert rounds.skipped == 0
+
+
+def test_existing_out_files(jobs):
+    existing = dict((job, simulate(job).outfile) for job in jobs[:2])
+    simulated, messages = run(SeedRounds(jobs[2:], TIGHT, 3, 2, existing))
+    assert simulated == jobs[2:]
+    simulated, messages = run(SeedRounds(jobs[3:], LOOSE, 3, 2, dict(
+        (job, simon_run.out_name(*job)) for job in jobs[:3])))
+    assert simulated == []
+    assert messages[0].startswith("R1_T1 converged after 3 seeds")
+
+
+def test_existing_first_round(jobs):
+    existing = {jobs[0]: simulate(jobs[0]).outfile}
+    rounds = SeedRounds(jobs[1:], TIGHT, 3, 2, existing)
+    assert list(rounds) == jobs[1:3]
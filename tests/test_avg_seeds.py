@@ -0,0 +1,149 @@
+""" Averages of seed OUT files by avg_seeds.py """
+
+from __future__ import print_function
+import os
+import pytest
+import avg_seeds
+import outfile
+import seed_stats
+from bench import synth
+from conftest import run_main
+
+
+SEEDS = [1001, 1002, 1003, 1004, 1005]
+ROWS = outfile.BLOCK_DATA_ROWS - 2
+
+
+def write_outs(directory, basefile='R_T1', seeds=SEEDS):
+    """ Write synthetic OUT files with zero, negative and blank fields in
+    the DIR1 Cars row, return filenames """
+    filenames = []
+    for number, seed in enumerate(seeds):
+        lines = synth.out_lines(basefile.split('_')[-1], seed)
+        pos = lines.index(next(line for line in lines
+                               if line.startswith(' DIR1'))) + 5
+        fields = outfile.FIELDS
+        line = lines[pos].ljust(outfile.INDICIES[-1] + 8)
+        for k, value in [(2, '0.0' if number % 2 else '50.0'),  # Some zero
+                         (3, '0.0'),                           # All zero
+                         (4, '-1.0'),                          # Negative
+                         (5, '')]:                             # Blank
+            width = fields[k].stop - fields[k].start
+            line = line[:fields[k].start] + value.rjust(width) + \
+                line[fields[k].stop:]
+        lines[pos] = line
+        filename = os.path.join(directory, "%s_seed%i.OUT" % (basefile, seed))
+        with open(filename, 'w', newline='') as fp:
+            fp.write(synth.NEWLINE.join(lines) + synth.NEWLINE)
+        filenames.append(filename)
+    return filenames
+
+
+def baseline_averages(filenames):
+    """ Return averages [block][row][field] as the first avg_seeds.py """
+    total = [[[0.0] * len(outfile.INDICIES) for j in range(ROWS)]
+             for i in range(len(outfile.BLOCKS))]
+    count = [[[0.0] * len(outfile.INDICIES) for j in range(ROWS)]
+             for i in range(len(outfile.BLOCKS))]
+    for filename in filenames:
+        with open(filename, 'rb') as fp:
+            lines = iter(fp.read().split(b'\n'))
+        for bidx, (search, extra_rows, name) in enumerate(outfile.BLOCKS):
+            for line in lines:
+                if line.startswith(search):
+                    break
+            for x in range(extra_rows - 1):
+                next(lines)
+            for index in range(outfile.BLOCK_DATA_ROWS):
+                line = next(lines).rstrip(b'\r\n')
+                fields = [line[field].strip(b' ') for field in outfile.FIELDS]
+                if index > 2:
+                    for k in range(1, len(outfile.INDICIES)):
+                        if fields[k] != b'':
+                            total[bidx][index - 2][k] += float(fields[k])
+                            if float(fields[k]) > 0:
+                                count[bidx][index - 2][k] += 1
+    for i in range(len(outfile.BLOCKS)):
+        for j in range(ROWS):
+            for k in range(len(outfile.INDICIES)):
+                if total[i][j][k] > 0:
+                    total[i][j][k] = round(total[i][j][k] / count[i][j][k], 1)
+    return total
+
+
+def test_averages_match_baseline(tmp_path):
+    filenames = write_outs(str(tmp_path))
+    results = [outfile.read(filename) for filename in filenames]
+    output, unimpeded_speed = avg_seeds.calculate_averages(
+        seed_stats.stack(results), len(results),
+        sum(result.unimpeded_speed for result in results))
+    expected = baseline_averages(filenames)
+    assert output == expected
+    cars = expected[0][1]
+    assert cars[2] == 50.0              # Zero seeds not counted
+    assert cars[3] == 0.0 and cars[4] == -5.0 and cars[5] == 0.0
+    assert unimpeded_speed == round(sum(
+        result.unimpeded_speed for result in results) / len(results), 1)
+
+
+
+GROUPS = ['R1_T1', 'R2_T1']
+
+
+def average(monkeypatch, capsys, *args):
+    """ Run avg_seeds.py, return option groups averaged """
+    capsys.readouterr()
+    run_main(avg_seeds, monkeypatch, *args)
+    lines = capsys.readouterr().out.splitlines()
+    return [line for line in lines if line in GROUPS]
+
+
+@pytest.fixture
+def groups(tmp_path, monkeypatch, capsys):
+    """ Write and average OUT files of GROUPS in tmp_path """
+    pytest.importorskip('openpyxl')
+    monkeypatch.chdir(tmp_path)
+    for basefile in GROUPS:
+        synth.write_outs(basefile, SEEDS[:3])
+    assert average(monkeypatch, capsys) == GROUPS
+    return GROUPS
+
+
+def test_unchanged_skipped(groups, monkeypatch, capsys):
+    os.utime('R1_T1_seed1001.OUT')           # Touched, not changed
+    assert average(monkeypatch, capsys) == []
+
+
+def test_new_file(groups, monkeypatch, capsys):
+    synth.write_outs('R1_T1', SEEDS[3:4])
+    assert average(monkeypatch, capsys) == ['R1_T1']
+    assert average(monkeypatch, capsys) == []
+
+
+def test_removed_file(groups, monkeypatch, capsys):
+    os.remove('R2_T1_seed1002.OUT')
+    assert average(monkeypatch, capsys) == ['R2_T1']
+
+
+def test_modified_file(groups, monkeypatch, capsys):
+    write_outs('.', 'R1_T1', SEEDS[:1])
+    assert average(monkeypatch, capsys) == ['R1_T1']
+
+
+def test_force(groups, monkeypatch, capsys):
+    assert average(monkeypatch, capsys, '--force') == GROUPS
+
+
+def test_store_missing_group(groups, monkeypatch, capsys):
+    assert average(monkeypatch, capsys, 'R1*', '--store', 'a.csv') == \
+        ['R1_T1']
+    assert average(monkeypatch, capsys, '--store', 'a.csv') == ['R2_T1']
+    assert average(monkeypatch, capsys, '--store', 'a.csv') == []
+    assert average(monkeypatch, capsys, '--store', 'b.csv') == GROUPS
+    os.remove('a.csv')
+    assert average(monkeypatch, capsys, '--store', 'a.csv') == GROUPS
+
+
+def test_jobs(groups, monkeypatch, capsys):
+    assert average(monkeypatch, capsys, '--force', '--jobs', '2') == GROUPS
+    assert average(monkeypatch, capsys) == []
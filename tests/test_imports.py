@@ -0,0 +1,41 @@
+""" Heavy modules not imported by the Simon scripts (see bench/imports.py).
+
+Import times depend on the computer, so are checked by bench.imports only.
+"""
+
+from __future__ import print_function
+import os
+import subprocess
+import sys
+import pytest
+from bench import imports
+from bench import synth
+from conftest import ROOT
+
+
+SIMON_OPTION = """import sys
+sys.path.insert(0, %r)
+import simon
+try:
+    simon.main(%r)
+finally:
+    print(' '.join(name for name in %r if name in sys.modules))
+"""
+
+
+@pytest.mark.parametrize('module, budget, heavy', imports.BUDGETS,
+                         ids=[budget[0] for budget in imports.BUDGETS])
+def test_no_heavy_imports(module, budget, heavy):
+    assert imports.heavy_imports(module, heavy) == []
+
+
+def test_simon_option(tmp_path):
+    road = synth.write_road(str(tmp_path / 'R'), 30)
+    option = str(tmp_path / 'R_OT001.ROD')
+    heavy = ('openpyxl', 'numpy')
+    output = subprocess.check_output(
+        [sys.executable, '-c', SIMON_OPTION % (
+            ROOT, ['option', road, '1.0', '1.5', 'P', option, 'Option'],
+            heavy)], cwd=str(tmp_path), universal_newlines=True)
+    assert output.splitlines()[-1] == ''
+    assert os.path.isfile(option)
@@ -0,0 +1,43 @@
+""" Batch files of option_editor.py """
+
+from __future__ import print_function
+import io
+import os
+import option_editor
+from bench import synth
+
+
+BATCH = """@echo off
+rem python ..\\\\option_editor.py R.ROD 1.0 2.0 P R_REM.ROD "rem"
+REM python ..\\\\option_editor.py R.ROD 1.0 2.0 P R_REM2.ROD "rem"
+:: python ..\\\\option_editor.py R.ROD 1.0 2.0 P R_COLON.ROD "colon"
+echo python ..\\\\option_editor.py R.ROD 1.0 2.0 P R_ECHO.ROD "echo"
+python ..\\\\option_editor.py R.ROD 1.0 2.0 P R_OT001.ROD "Option one"
+cd ..
+pause
+"""
+
+
+def test_read_batch_skips_comments():
+    rows = list(option_editor.read_batch(io.StringIO(BATCH), False))
+    assert rows == [(6, ['R.ROD', '1.0', '2.0', 'P', 'R_OT001.ROD',
+                         'Option one'])]
+
+
+def test_read_batch_csv_rows():
+    text = ("Infile,Start,End,Direction,Outfile,Description\n"
+            "R.ROD,1.0,2.0,P,R_OT001.ROD,Option one,,\n")
+    rows = list(option_editor.read_batch(io.StringIO(text)))
+    assert rows == [(2, ['R.ROD', '1.0', '2.0', 'P', 'R_OT001.ROD',
+                         'Option one'])]
+
+
+def test_run_batch_makes_only_uncommented(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    synth.write_road('R', 30)
+    with open('MakeSimonSetup.bat', 'w') as fp:
+        fp.write(BATCH)
+    assert option_editor.run_batch('MakeSimonSetup.bat') == (0, 1)
+    assert sorted(name for name in os.listdir('.')
+                  if name.startswith('R_')) == \
+        ['R_OT001.MLT', 'R_OT001.OBS', 'R_OT001.ROD']
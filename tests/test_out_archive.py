@@ -0,0 +1,93 @@
+""" Archive OUT files with out_archive.py and average them with avg_seeds.py """
+
+from __future__ import print_function
+import os
+import pytest
+import avg_seeds
+import out_archive
+import outfile
+from bench import synth
+from conftest import run_main as run
+
+
+openpyxl = pytest.importorskip('openpyxl')
+BASEFILE = 'R1_T1'
+SEEDS = [1001, 1002, 1003]
+
+
+def averages():
+    """ Return {sheet: rows of cell values} of the _AVERAGES workbook """
+    with open(BASEFILE + avg_seeds.AVERAGES, 'rb') as fp:
+        wb = openpyxl.load_workbook(fp)
+        return dict((ws.title, list(ws.values)) for ws in wb)
+
+
+def fields(result):
+    """ Return OutFile contents, block lines as fields """
+    return (result.seed, result.length, result.unimpeded_speed,
+            result.values.tolist(), [[outfile.fields(line) for line in block]
+                                     for block in result.lines])
+
+
+@pytest.fixture
+def outs(tmp_path, monkeypatch):
+    """ Return OUT filenames written in tmp_path, the working directory """
+    monkeypatch.chdir(tmp_path)
+    return synth.write_outs(BASEFILE, SEEDS)
+
+
+def test_round_trip(outs, monkeypatch, capsys):
+    raw = {}
+    for name in outs:
+        with open(name, 'rb') as fp:
+            raw[name] = fp.read()
+    results = [fields(outfile.read(name)) for name in outs]
+    run(avg_seeds, monkeypatch)
+    expected = averages()
+
+    run(out_archive, monkeypatch)
+    for name in outs:
+        assert not os.path.isfile(name)
+        assert out_archive.stored_name(name) == name + out_archive.SUMMARY_EXT
+        assert os.path.isfile(name + out_archive.GZIP_EXT)
+    assert [fields(out_archive.read(name)) for name in outs] == results
+    capsys.readouterr()
+    run(avg_seeds, monkeypatch)
+    assert BASEFILE + " unchanged" in capsys.readouterr().out
+    run(avg_seeds, monkeypatch, '--force')
+    assert averages() == expected           # From summaries
+
+    for name in outs:
+        os.remove(name + out_archive.SUMMARY_EXT)
+    assert [fields(out_archive.read(name)) for name in outs] == results
+    run(avg_seeds, monkeypatch, '--force')
+    assert averages() == expected           # From compressed files
+
+    run(out_archive, monkeypatch, '--extract')
+    for name in outs:
+        with open(name, 'rb') as fp:
+            assert fp.read() == raw[name]
+    capsys.readouterr()
+    run(avg_seeds, monkeypatch)
+    assert BASEFILE + " unchanged" in capsys.readouterr().out
+    run(avg_seeds, monkeypatch, '--force')
+    assert averages() == expected           # From extracted OUT files
+
+
+def test_summary_smaller_than_lines(outs):
+    name = outs[0]
+    result = outfile.read(name)
+    out_archive.archive(name)
+    lines = sum(len(line) for block in result.lines for line in block)
+    assert os.path.getsize(name + out_archive.SUMMARY_EXT) < \
+        out_archive.HEADER.size + 8 * out_archive.NVALUES + lines / 2
+
+
+def test_archive_file_modes(outs):
+    name = outs[0]
+    os.chmod(name, 0o644)
+    out_archive.archive(name)
+    for ext in out_archive.ARCHIVE_EXTS:
+        assert os.stat(name + ext).st_mode & 0o777 == 0o644
+    out_archive.extract(name)
+    assert os.stat(name).st_mode & 0o777 == 0o644
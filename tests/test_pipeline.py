@@ -0,0 +1,64 @@
+""" Dependency graph of simon_pipeline.py """
+
+from __future__ import print_function
+import concurrent.futures
+import simon_pipeline
+from bench import synth
+from conftest import STUB, write_traffic
+
+
+class Recorder(object):
+    """ Executor recording submitted tasks without running them """
+
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, fn, *args):
+        self.calls.append((fn.__name__,) + args)
+        return concurrent.futures.Future()
+
+
+def simulations(executor):
+    return sorted(call[2:4] for call in executor.calls
+                  if call[0] == 'run_job')
+
+
+def pipeline(tmp_path, monkeypatch):
+    """ Return Pipeline of road R and two stale T1 traffic files made again
+    by one traffic column, and the traffic files """
+    monkeypatch.chdir(tmp_path)
+    synth.write_road('R', 30)
+    traffics = [write_traffic("T1_seed%i.TRF" % seed, seed)
+                for seed in (1001, 1002)]
+    executor = Recorder()
+    graph = simon_pipeline.Pipeline(executor, STUB)
+    graph.traffics = dict((traffic, 1) for traffic in traffics)
+    graph.add_roads('', [])
+    graph.start()
+    return graph, executor, traffics
+
+
+def test_traffic_column_made(tmp_path, monkeypatch):
+    graph, executor, traffics = pipeline(tmp_path, monkeypatch)
+    assert simulations(executor) == []
+    graph.traffic_made(traffics)
+    assert simulations(executor) == [('R.ROD', traffic)
+                                     for traffic in traffics]
+
+
+def test_traffic_column_failed(tmp_path, monkeypatch, capsys):
+    graph, executor, traffics = pipeline(tmp_path, monkeypatch)
+    graph.traffic_made(traffics, False)
+    assert simulations(executor) == []
+    assert "T1_seed1001.TRF column failed - not simulated." in \
+        capsys.readouterr().err
+    assert graph.traffics == {}
+    assert graph.groups == {'R_T1': [0, 0]}
+
+
+def test_option_row_failed(tmp_path, monkeypatch):
+    graph, executor, traffics = pipeline(tmp_path, monkeypatch)
+    graph.roads['R.ROD'] = 1            # Made again by an option row
+    graph.traffic_made(traffics)
+    graph.option_made('R.ROD', False)
+    assert simulations(executor) == []
@@ -0,0 +1,57 @@
+""" Seed results stores of results_store.py """
+
+from __future__ import print_function
+import builtins
+import os
+import pytest
+import outfile
+import results_store
+from bench import synth
+from conftest import run_main
+
+
+def rows(option, value):
+    return [(option, seed, 'DIR1', 'Cars', 'speed_kmh', value)
+            for seed in (1001, 1002)]
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet', 'feather'])
+def test_update(tmp_path, fmt):
+    if fmt != 'csv':
+        pytest.importorskip('pyarrow')
+    store = str(tmp_path / ('results.' + fmt))
+    assert results_store.update(store, fmt, rows('A', 1.5)) == store
+    results_store.update(store, fmt, rows('B', 2.5))
+    results_store.update(store, fmt, rows('A', 3.5))
+    assert sorted(results_store.read_table(store, fmt)) == \
+        sorted(rows('A', 3.5) + rows('B', 2.5))
+
+
+def test_update_csv_appends(tmp_path):
+    store = str(tmp_path / 'results.csv')
+    results_store.update(store, 'csv', rows('A', 1.5))
+    inode = os.stat(store).st_ino
+    results_store.update(store, 'csv', rows('B', 2.5))
+    assert os.stat(store).st_ino == inode       # Not rewritten
+    assert results_store.read_table(store, 'csv') == \
+        rows('A', 1.5) + rows('B', 2.5)
+
+
+def test_fallback_message_once(tmp_path, monkeypatch, capsys):
+    pytest.importorskip('openpyxl')
+    import avg_seeds
+    real_import = builtins.__import__
+
+    def no_pyarrow(name, *args, **kwargs):
+        if name.startswith('pyarrow'):
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, '__import__', no_pyarrow)
+    monkeypatch.chdir(tmp_path)
+    synth.write_outs('R1_T1', [1001, 1002])
+    run_main(avg_seeds, monkeypatch, '--store', 'results.parquet')
+    assert capsys.readouterr().out.count("pyarrow is not installed") == 1
+    assert len(results_store.read_table('results.csv', 'csv')) == \
+        2 * len(outfile.BLOCKS) * len(outfile.VEHICLES) * \
+        len(results_store.METRICS)
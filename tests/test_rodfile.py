@@ -0,0 +1,121 @@
+""" Road file records and writes of rodfile.py """
+
+from __future__ import print_function
+import os
+import stat
+import pytest
+import rodfile
+from bench import synth
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="POSIX permissions")
+def test_write_file_mode(tmp_path):
+    umask = os.umask(0o022)
+    try:
+        new = str(tmp_path / 'new.ROD')
+        rodfile.write_file(new, [b'new'])
+        assert stat.S_IMODE(os.stat(new).st_mode) == 0o644
+        os.chmod(new, 0o640)
+        rodfile.write_file(new, [b'again'])
+        assert stat.S_IMODE(os.stat(new).st_mode) == 0o640
+    finally:
+        os.umask(umask)
+
+
+# Lanes of one option, in the order they are added
+LANES = {'overlapping': [(11.0, 12.0, 'P'), (11.5, 12.5, 'P')],
+         'adjoining': [(11.0, 12.0, 'P'), (12.0, 13.0, 'C')],
+         'P then C': [(11.0, 12.0, 'P'), (11.0, 12.0, 'C')],
+         'road ends': [(10.0, 10.5, 'B'), (13.4, 14.0, 'B')]}
+NEWLINES = {'CRLF': '\r\n', 'LF': '\n'}
+
+
+def baseline_edit(data, start_km, end_km, direction):
+    """ Return road file data edited as the first option_editor.py """
+    data = bytearray(data)
+    length = rodfile.header_length(data)
+    odo_start_km = float(data[length:length + 9])
+    while start_km + .000001 < end_km:
+        nrec = (start_km - .000001 - odo_start_km) // 0.1 + 1
+        fpos = int(length + nrec * rodfile.RECORD_SIZE - 1)
+        for column in (11, 16):
+            data[fpos + column] = ord('-')
+        if direction in 'PB':
+            data[fpos + 22] = ord('T')
+        if direction in 'CB':
+            data[fpos + 27] = ord('T')
+        start_km += 0.1
+    return bytes(data)
+
+
+def baseline_header(data, new_text, description=''):
+    """ Return data with first line new_text and second description, as the
+    first option_editor.py on Windows """
+    newline = b'\r\n' if b'\r\n' in data[:data.find(b'\n') + 1] else b'\n'
+    lines = data.split(newline)
+    lines[0] = new_text.encode()
+    if description:
+        lines[1] = description.encode()
+    return newline.join(lines)
+
+
+def road(tmp_path, newline):
+    """ Return road file R.ROD from 10 km and its data """
+    synth.write_road(str(tmp_path / 'R'), 40, 10.0, newline)
+    with open(str(tmp_path / 'R.ROD'), 'rb') as fp:
+        return str(tmp_path / 'R.ROD'), fp.read()
+
+
+@pytest.mark.parametrize('newline', sorted(NEWLINES))
+@pytest.mark.parametrize('case', sorted(LANES))
+def test_lanes_match_baseline(tmp_path, case, newline):
+    src, data = road(tmp_path, NEWLINES[newline])
+    dst = str(tmp_path / 'R_OT001.ROD')
+    with rodfile.RodFile.from_file(src) as rod:
+        option = rod.copy()
+        for lane in LANES[case]:
+            option.set_overtaking_lane(*lane)
+        option.write(dst, 'R_OT001.ROD', 'Option one')
+    original = data
+    for lane in LANES[case]:
+        data = baseline_edit(data, *lane)
+    assert data.count(b'T') > original.count(b'T')
+    with open(dst, 'rb') as fp:
+        assert fp.read() == baseline_header(data, 'R_OT001.ROD',
+                                            'Option one')
+
+
+@pytest.mark.parametrize('newline', sorted(NEWLINES))
+@pytest.mark.parametrize('case', sorted(LANES))
+def test_batch_in_place_matches_baseline(tmp_path, monkeypatch, case,
+                                         newline):
+    import option_editor
+    src, data = road(tmp_path, NEWLINES[newline])
+    monkeypatch.chdir(tmp_path)
+    # First row makes the option, later rows edit it in place
+    sources = {}
+    rows = [['R.ROD' if number == 0 else 'R_OT001.ROD', str(start_km),
+             str(end_km), direction, 'R_OT001.ROD', "Row %i" % number]
+            for number, (start_km, end_km, direction)
+            in enumerate(LANES[case])]
+    for row in rows:
+        assert option_editor.make_option(['option_editor.py'] + row,
+                                         sources) == 'R_OT001.ROD'
+    for rod in sources.values():
+        rod.close()
+    for number, lane in enumerate(LANES[case]):
+        data = baseline_header(baseline_edit(data, *lane), 'R_OT001.ROD',
+                               "Row %i" % number)
+    with open('R_OT001.ROD', 'rb') as fp:
+        assert fp.read() == data
+    with open('R.MLT', 'rb') as src_mlt, open('R_OT001.MLT', 'rb') as fp:
+        assert fp.read() == baseline_header(src_mlt.read(), 'R_OT001.MLT')
+    with open('R.OBS', 'rb') as src_obs, open('R_OT001.OBS', 'rb') as fp:
+        assert fp.read() == src_obs.read()
+
+
+def test_copy_file_in_place(tmp_path):
+    src, data = road(tmp_path, '\r\n')
+    rodfile.copy_file(src, src, 'R.ROD', 'New description')
+    with open(src, 'rb') as fp:
+        assert fp.read() == baseline_header(data, 'R.ROD', 'New description')
@@ -0,0 +1,193 @@
+""" Run trarr_stub.py simulations through simon_run.py """
+
+from __future__ import print_function
+import os
+import outfile
+import simon_run
+from conftest import STUB
+
+
+def test_run_jobs_pass(study, tmp_path):
+    scratch = tmp_path / 'scratch'
+    scratch.mkdir()
+    results = list(simon_run.run_jobs(study, STUB, 2, str(scratch)))
+    assert sorted((result.road, result.traffic) for result in results) == \
+        sorted(study)
+    for result in results:
+        assert result.passed, result.message
+        assert result.outfile == simon_run.out_name(result.road,
+                                                    result.traffic)
+        assert outfile.read(result.outfile).seed == \
+            int(result.traffic.split('_seed')[1].split('.')[0])
+    assert not os.listdir(str(scratch))
+
+
+def test_run_job_fail(study, stub_env):
+    stub_env.setenv('TRARR_STUB_FAIL', '1')
+    road, traffic = study[0]
+    result = simon_run.run_job(STUB, road, traffic)
+    assert not result.passed
+    assert result.message == 'FAIL'
+    assert result.outfile == simon_run.bad_out_name(road, traffic)
+    assert os.path.isfile(result.outfile)
+    assert not os.path.isfile(simon_run.out_name(road, traffic))
+
+
+def test_run_job_crash(study, stub_env):
+    stub_env.setenv('TRARR_STUB_CRASH', '1')
+    road, traffic = study[0]
+    result = simon_run.run_job(STUB, road, traffic)
+    assert not result.passed
+    assert result.message == 'no OUT file'
+
+
+FLAKY_TRARR = """import os, runpy, sys
+# Crash the first time, then simulate with trarr_stub.py
+if not os.path.isfile(%(marker)r):
+    open(%(marker)r, 'w').close()
+    sys.exit(1)
+sys.path.insert(0, %(root)r)
+runpy.run_path(%(stub)r, run_name='__main__')
+"""
+
+
+def supervise(jobs, **limits):
+    """ Return results of jobs run under a Supervisor """
+    from run_supervisor import supervise_jobs
+    return list(supervise_jobs(jobs, STUB, 2, **limits))
+
+
+def attempts(road, traffic, logs=None):
+    """ Return number of attempts recorded in stdout log """
+    from run_supervisor import log_names
+    with open(log_names(road, traffic, logs)[0]) as fp:
+        return sum(line.startswith('*** ') for line in fp)
+
+
+def test_supervisor_pass(study, tmp_path):
+    logs = str(tmp_path / 'logs')
+    results = supervise(study, logs=logs)
+    assert all(result.passed for result in results)
+    assert len(results) == len(study)
+    for road, traffic in study:
+        assert attempts(road, traffic, logs) == 1
+
+
+def test_supervisor_stall_kill_retry(study, stub_env, tmp_path):
+    stub_env.setenv('TRARR_STUB_HANG', '1')
+    stub_env.setenv('TRARR_STUB_TIME', '0.5')
+    scratch = tmp_path / 'scratch'
+    scratch.mkdir()
+    road, traffic = study[0]
+    result, = supervise([(road, traffic)], scratch=str(scratch), stall=0.5,
+                        retries=1, backoff=0.01)
+    assert not result.passed
+    assert result.message.startswith("stalled")
+    assert result.message.endswith("(2 attempts)")
+    assert attempts(road, traffic) == 2
+    assert not os.listdir(str(scratch))
+
+
+def test_supervisor_timeout(study, stub_env):
+    stub_env.setenv('TRARR_STUB_TIME', '30')
+    result, = supervise(study[:1], timeout=0.5)
+    assert not result.passed
+    assert result.message == "timed out after 0.5s"
+
+
+def test_supervisor_retry_passes(study, tmp_path):
+    from run_supervisor import supervise_jobs
+    trarr = tmp_path / 'flaky_trarr.py'
+    trarr.write_text(FLAKY_TRARR % {'marker': str(tmp_path / 'crashed'),
+                                    'root': os.path.dirname(STUB),
+                                    'stub': STUB})
+    road, traffic = study[0]
+    result, = supervise_jobs([(road, traffic)], str(trarr), 1, retries=2,
+                             backoff=0.01)
+    assert result.passed, result.message
+    assert attempts(road, traffic) == 2
+    assert not os.path.isfile(simon_run.bad_out_name(road, traffic))
+
+
+def test_supervisor_fail_not_retried(study, stub_env):
+    stub_env.setenv('TRARR_STUB_FAIL', '1')
+    road, traffic = study[0]
+    result, = supervise([(road, traffic)], retries=2, backoff=0.01)
+    assert not result.passed
+    assert result.message == 'FAIL'
+    assert attempts(road, traffic) == 1
+
+
+def test_queue_claims_once(study, tmp_path):
+    from work_queue import WorkQueue
+    filename = str(tmp_path / 'queue.db')
+    first, second = WorkQueue(filename), WorkQueue(filename)
+    assert first.enqueue(study) == len(study)
+    claims = []
+    for number in range(len(study)):
+        queue, worker = [(first, 'a'), (second, 'b')][number % 2]
+        claims.append(queue.claim(worker))
+    assert first.claim('a') is None
+    assert len(set(job_id for job_id, road, traffic in claims)) == len(study)
+    assert sorted((road, traffic) for job_id, road, traffic in claims) == \
+        sorted(study)
+    assert first.counts()['running'] == len(study)
+    first.close()
+    second.close()
+
+
+def test_queue_stale_claim(study, tmp_path):
+    import time
+    from work_queue import WorkQueue
+    queue = WorkQueue(str(tmp_path / 'queue.db'), stale=0.2, max_attempts=2)
+    queue.enqueue(study[:1])
+    job_id = queue.claim('a')[0]
+    assert queue.claim('b') is None
+    time.sleep(0.3)
+    assert queue.claim('b')[0] == job_id        # Reclaimed from a
+    assert queue.heartbeat('a', [job_id]) == []
+    result = simon_run.Result(study[0][0], study[0][1], None, True, '')
+    assert not queue.finish('a', job_id, result)
+    time.sleep(0.3)
+    assert queue.claim('c') is None             # Abandoned after 2 claims
+    assert queue.counts()['failed'] == 1
+    queue.close()
+
+
+def run_worker(filename, *options):
+    """ Run simon_worker.py on queue file, return completed process """
+    import subprocess
+    import sys
+    return subprocess.run([sys.executable, os.path.join(os.path.dirname(
+                               STUB), 'simon_worker.py'), filename,
+                           '--trarr', STUB, '--history',
+                           filename + '.history', '--poll', '0.1'] +
+                          list(options), stdout=subprocess.PIPE,
+                          stderr=subprocess.STDOUT, universal_newlines=True,
+                          timeout=60)
+
+
+def test_worker_runs_queue(study, tmp_path):
+    from work_queue import WorkQueue
+    filename = str(tmp_path / 'queue.db')
+    queue = WorkQueue(filename)
+    queue.enqueue(study)
+    process = run_worker(filename, '--jobs', '2')
+    assert process.returncode == 0, process.stdout
+    assert queue.counts()['passed'] == len(study)
+    for road, traffic in study:
+        assert os.path.isfile(simon_run.out_name(road, traffic))
+    queue.close()
+
+
+def test_worker_reclaims_stale(study, tmp_path):
+    from work_queue import WorkQueue
+    filename = str(tmp_path / 'queue.db')
+    queue = WorkQueue(filename)
+    queue.enqueue(study)
+    job_id, road, traffic = queue.claim('crashed:1')
+    process = run_worker(filename, '--jobs', '2', '--stale', '1')
+    assert process.returncode == 0, process.stdout
+    assert queue.counts()['passed'] == len(study)
+    assert os.path.isfile(simon_run.out_name(road, traffic))
+    queue.close()
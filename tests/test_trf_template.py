@@ -0,0 +1,21 @@
+""" Traffic files written by trf_template.py """
+
+from __future__ import print_function
+import os
+import stat
+import pytest
+from bench import synth
+from trf_template import TrfTemplate
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="POSIX permissions")
+def test_write_mode(tmp_path):
+    synth.write_template(str(tmp_path / 'template.TRF'))
+    template = TrfTemplate.from_file(str(tmp_path / 'template.TRF'))
+    umask = os.umask(0o022)
+    try:
+        filename = str(tmp_path / 'T1_seed1001.TRF')
+        template.write(filename, 'text\n')
+        assert stat.S_IMODE(os.stat(filename).st_mode) == 0o644
+    finally:
+        os.umask(umask)
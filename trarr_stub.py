@@ -0,0 +1,145 @@
+#! /usr/bin/env python
+""" Stand-in for Trarr.exe to test running simulations without Trarr.
+
+Reads ROAD, MULTIP, OBS and TRAF from the working directory like Trarr,
+waits for a random run time and writes a format valid OUT file (see
+bench/synth.py) for the traffic name on TRAF line 1 and the seed on TRAF
+line 19. The OUT file grows while the simulation runs and progress is
+printed. Then PASS or FAIL is made, with the fort.?? and CHKOUT files Trarr
+leaves behind.
+
+Set environment variables to change the simulations:
+ TRARR_STUB_TIME         mean run time, seconds (default 0.1)
+ TRARR_STUB_RECORD_TIME  extra run time per ROAD record, seconds (default 0)
+ TRARR_STUB_DIST         run time distribution fixed, uniform, exponential
+                         or lognormal (default lognormal)
+ TRARR_STUB_SIGMA        lognormal sigma (default 0.25)
+ TRARR_STUB_FAIL         fraction of simulations that FAIL (default 0)
+ TRARR_STUB_CRASH        fraction that stop without OUT, PASS or FAIL
+                         (default 0)
+ TRARR_STUB_HANG         fraction that stop writing OUT part way and never
+                         finish, as a hung Trarr (default 0)
+ TRARR_STUB_SEED         random seed, simulations with the same seed, traffic
+                         and road repeat exactly (default: random)
+
+eg: python simon_run.py proj_Demo\\Demo proj_Demo\\Demo --trarr trarr_stub.py
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+import hashlib
+import math
+import os
+import random
+import sys
+import time
+from bench import synth
+from rodfile import RECORD_SIZE, header_length
+
+
+INPUT_FILES = ['ROAD', 'MULTIP', 'OBS', 'TRAF']
+NAME_LINE = 1
+SEED_LINE = 19
+SEED_WIDTH = 6
+STRAY_FILES = ['fort.10', 'fort.11', 'fort.21', 'CHKOUT']
+OUT_STEPS = 10                          # OUT file writes while running
+
+
+def setting(name, default):
+    """ Return float value of environment variable TRARR_STUB_<name> """
+    value = os.environ.get('TRARR_STUB_' + name, '')
+    try:
+        return float(value) if value else default
+    except ValueError:
+        sys.exit("Invalid TRARR_STUB_%s %s - must be a number. Exiting..."
+                 % (name, value))
+
+
+def read_traffic(filename='TRAF'):
+    """ Return (traffic name, seed) of traffic file """
+    with open(filename) as fp:
+        lines = fp.read().splitlines()
+    if len(lines) < SEED_LINE:
+        sys.exit("Invalid file %s - must have at least %i lines. Exiting..."
+                 % (filename, SEED_LINE))
+    name = lines[NAME_LINE - 1].strip().split('_seed')[0]
+    try:
+        seed = int(lines[SEED_LINE - 1][:SEED_WIDTH])
+    except ValueError:
+        sys.exit("Invalid file %s - no seed on line %i. Exiting..."
+                 % (filename, SEED_LINE))
+    return os.path.splitext(name)[0], seed
+
+
+def read_road(filename='ROAD'):
+    """ Return (number of records, hashcode) of road file """
+    with open(filename, 'rb') as fp:
+        data = fp.read()
+    return ((len(data) - header_length(data)) // RECORD_SIZE,
+            hashlib.md5(data).hexdigest())
+
+
+def run_time(rnd, mean):
+    """ Return random run time of TRARR_STUB_DIST with mean seconds """
+    dist = os.environ.get('TRARR_STUB_DIST', 'lognormal').lower()
+    if dist == 'fixed':
+        return mean
+    if dist == 'uniform':
+        return rnd.uniform(0, 2 * mean)
+    if dist == 'exponential':
+        return rnd.expovariate(1 / mean) if mean > 0 else 0
+    if dist == 'lognormal':
+        sigma = setting('SIGMA', 0.25)
+        return mean * rnd.lognormvariate(-sigma * sigma / 2, sigma)
+    sys.exit("Invalid TRARR_STUB_DIST %s - must be fixed, uniform,"
+             " exponential or lognormal. Exiting..." % dist)
+
+
+def main():
+
+    for filename in INPUT_FILES:
+        if not os.path.isfile(filename):
+            sys.exit("Error - %s file not found. Exiting..." % filename)
+    name, seed = read_traffic()
+    nrecs, road = read_road()
+
+    rnd = random.Random()
+    if os.environ.get('TRARR_STUB_SEED'):
+        rnd.seed("%s %s %i %s" % (os.environ['TRARR_STUB_SEED'], name, seed,
+                                  road))
+    duration = run_time(rnd, setting('TIME', 0.1) +
+                        setting('RECORD_TIME', 0.0) * nrecs)
+    failed = rnd.random() < setting('FAIL', 0.0)
+    crashed = rnd.random() < setting('CRASH', 0.0)
+    hung = rnd.random() < setting('HANG', 0.0)
+
+    for stray in STRAY_FILES:
+        open(stray, 'w').close()
+    if crashed:
+        time.sleep(duration * rnd.random())
+        sys.exit("Error - simulated crash. Exiting...")
+
+    # Grow OUT file as the simulation runs
+    print("TRARR stub simulating %s seed %i on %i road records"
+          % (name, seed, nrecs))
+    lines = synth.out_lines(name, seed, nrecs * 100.0)
+    step = int(math.ceil(len(lines) / float(OUT_STEPS)))
+    with open('OUT', 'w', newline='') as fp:
+        for start in range(0, len(lines), step):
+            time.sleep(duration / OUT_STEPS)
+            fp.write(''.join(line + synth.NEWLINE
+                             for line in lines[start:start + step]))
+            fp.flush()
+            print(" %3i%% simulated" % (100 * min(start + step, len(lines))
+                                         // len(lines)))
+            sys.stdout.flush()
+            if hung and start:
+                while True:
+                    time.sleep(60)
+    open('FAIL' if failed else 'PASS', 'w').close()
+    print("TRARR stub %s" % ('FAIL' if failed else 'PASS'))
+
+
+if __name__ == '__main__':
+    main()
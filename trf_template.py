@@ -0,0 +1,105 @@
+#! /usr/bin/env python
+""" Trarr traffic (TRF) file template.
+
+The template is read once and traffic files are rendered from its lines in
+memory: line 1 is the file name, lines 6 to 20 hold the traffic items, lines
+48, 50 and 54 the six vehicle class values and the first 6 characters of
+line 19 the seed. Each seed file is written in one go and renamed into
+place, so the template can also be used to make TRF files on demand.
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+import os
+import tempfile
+from rodfile import file_mode
+
+
+TEMPLATE = '../template.TRF'
+ITEM_WIDTH = 8
+#         [ item,   line, fmt    ]
+ITEMS = [['TUN',      6, '%8i'  ],
+         ['TSE',      7, '%8.1f'],
+         ['tsi',      8, '%8.1f'],
+         ['OPTION',  10, '%8i'  ],
+         ['DTS1',    12, '%8.1f'],
+         ['DTS2',    13, '%8.1f'],
+         ['ppfol1',  14, '%8.1f'],
+         ['ppfol2',  15, '%8.1f'],
+         ['NSTR',    17, '%8i'  ],
+         ['NSEED0',  19, '%8.1f'],
+         ['ICHECK',  20, '%8i'  ]]
+CLASS_WIDTH = 48
+#                [line, fmt    ]      Vehicle proportion / volume
+CLASS_LINES = [[48,   '%8.2f'],
+               [50,   '%8.2f'],
+               [54,   '%8.1f']]
+SEED_LINE = 19
+SEED_WIDTH = 6
+
+
+def trf_name(basename, seed):
+    """ Return traffic filename of seed """
+    return basename + "_seed" + str(seed) + ".TRF"
+
+
+class TrfTemplate(object):
+    """ Lines of a TRF template file.
+
+    Raises ValueError if the template is too short to hold all values.
+    """
+
+    def __init__(self, lines):
+        self.lines = list(lines)
+        if len(self.lines) < CLASS_LINES[-1][0]:
+            raise ValueError("Invalid template file - must have at least %i"
+                             " lines" % CLASS_LINES[-1][0])
+
+    @classmethod
+    def from_file(cls, filename=TEMPLATE):
+        """ Return TrfTemplate read from filename """
+        with open(filename) as fp:
+            return cls(fp.read().splitlines())
+
+    def fill(self, items, classes):
+        """ Return template lines with traffic values.
+
+        items is the list of ITEMS values and classes the list of six
+        vehicle class values for each of CLASS_LINES.
+        """
+        lines = list(self.lines)
+        for (name, line, fmt), value in zip(ITEMS, items):
+            lines[line - 1] = fmt % value + self.lines[line - 1][ITEM_WIDTH:]
+        for (line, fmt), values in zip(CLASS_LINES, classes):
+            lines[line - 1] = (''.join(fmt % value for value in values) +
+                               self.lines[line - 1][CLASS_WIDTH:])
+        return lines
+
+    def text(self, lines, dst_name, seed):
+        """ Return text of traffic file dst_name from filled lines """
+        lines = list(lines)
+        lines[0] = dst_name
+        padded_seed = " " * SEED_WIDTH + str(seed)
+        lines[SEED_LINE - 1] = (padded_seed[-SEED_WIDTH:] +
+                                lines[SEED_LINE - 1][SEED_WIDTH:])
+        return ''.join("%s\n" % line for line in lines) + '\n'
+
+    def write(self, filename, text):
+        """ Write text to a temporary file and rename as filename """
+        with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(filename)
+                                         or '.', delete=False) as tmp:
+            tmp.write(text)
+        os.chmod(tmp.name, file_mode(filename))
+        os.replace(tmp.name, filename)
+
+    def write_seeds(self, basename, items, classes, seeds, directory=''):
+        """ Write traffic file for each seed, return list of filenames """
+        lines = self.fill(items, classes)
+        filenames = []
+        for seed in seeds:
+            dst_name = trf_name(basename, seed)
+            filename = os.path.join(directory, dst_name)
+            self.write(filename, self.text(lines, dst_name, seed))
+            filenames.append(filename)
+        return filenames
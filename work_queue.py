@@ -0,0 +1,178 @@
+#! /usr/bin/env python
+""" Shared SQLite queue of Trarr simulations for several computers.
+
+simon_run.py --enqueue adds road and traffic file pairs to a queue file in a
+shared directory and simon_worker.py processes on any computer claim, run
+and report them. Claims are made in one BEGIN IMMEDIATE transaction, so two
+workers never claim the same simulation. Workers update a heartbeat time
+while a simulation runs, and a claim not updated for the stale time (its
+computer crashed or was switched off) is queued again for another worker.
+
+Road and traffic paths are kept relative to the queue file directory, so
+computers mapping the share to different drive letters find the same files.
+Heartbeats compare computer clocks, so the stale time must be well above
+any clock difference.
+
+By Neale Irons version 18/10/2026 (CC BY-SA 4.0)
+"""
+
+from __future__ import print_function
+import contextlib
+import os
+import sqlite3
+import time
+
+
+QUEUE_FILE = 'simon_queue.db'
+LOCK_TIMEOUT = 60.0                     # Seconds to wait for a locked queue
+STALE_SECONDS = 300.0
+MAX_ATTEMPTS = 3                        # Claims before a job is abandoned
+STATES = ['queued', 'running', 'passed', 'failed']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    road TEXT NOT NULL,
+    traffic TEXT NOT NULL,
+    priority REAL NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'queued',
+    worker TEXT,
+    claimed REAL,
+    heartbeat REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    outfile TEXT,
+    message TEXT,
+    seconds REAL,
+    UNIQUE (road, traffic));
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, priority);
+"""
+
+
+class WorkQueue(object):
+    """ Queue of (road, traffic) simulations in a SQLite file. """
+
+    def __init__(self, filename=QUEUE_FILE, stale=STALE_SECONDS,
+                 max_attempts=MAX_ATTEMPTS):
+        self.filename = filename
+        self.directory = os.path.dirname(os.path.abspath(filename))
+        self.stale = stale
+        self.max_attempts = max_attempts
+        # Transactions are begun explicitly, the rollback journal (not WAL)
+        # works on network shares
+        self._db = sqlite3.connect(filename, timeout=LOCK_TIMEOUT,
+                                   isolation_level=None)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        """ Close queue file """
+        self._db.close()
+
+    def _relative(self, path):
+        """ Return path relative to queue directory (absolute if on another
+        drive) """
+        try:
+            return os.path.relpath(os.path.abspath(path), self.directory)
+        except ValueError:
+            return os.path.abspath(path)
+
+    def path(self, name):
+        """ Return path of queued file name on this computer """
+        return os.path.normpath(os.path.join(self.directory, name))
+
+    @contextlib.contextmanager
+    def _write(self):
+        """ Return cursor of one write transaction, rolled back on error """
+        cursor = self._db.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            yield cursor
+        except BaseException:
+            cursor.execute('ROLLBACK')
+            raise
+        cursor.execute('COMMIT')
+
+    def enqueue(self, jobs, priorities=None):
+        """ Queue (road, traffic) jobs, highest priority claimed first.
+
+        Jobs already queued keep their place, finished jobs are queued again.
+        Returns number of jobs queued.
+        """
+        with self._write() as cursor:
+            for number, (road, traffic) in enumerate(jobs):
+                names = (self._relative(road), self._relative(traffic))
+                priority = priorities[number] if priorities else 0.0
+                cursor.execute("INSERT OR IGNORE INTO jobs (road, traffic)"
+                               " VALUES (?, ?)", names)
+                cursor.execute("UPDATE jobs SET state = 'queued',"
+                               " priority = ?, attempts = 0, worker = NULL,"
+                               " message = NULL WHERE road = ? AND"
+                               " traffic = ? AND state != 'running'",
+                               (priority,) + names)
+        return len(jobs)
+
+    def claim(self, worker):
+        """ Return (id, road path, traffic path) of claimed job, or None.
+
+        Claims not updated for the stale time are first queued again, or
+        failed after max_attempts claims.
+        """
+        now = time.time()
+        with self._write() as cursor:
+            cursor.execute(
+                "UPDATE jobs SET state = 'failed', message = 'abandoned by '"
+                " || worker WHERE state = 'running' AND heartbeat < ? AND"
+                " attempts >= ?", (now - self.stale, self.max_attempts))
+            cursor.execute(
+                "UPDATE jobs SET state = 'queued', worker = NULL WHERE"
+                " state = 'running' AND heartbeat < ?", (now - self.stale,))
+            cursor.execute(
+                "SELECT id, road, traffic FROM jobs WHERE state = 'queued'"
+                " ORDER BY priority DESC, id LIMIT 1")
+            row = cursor.fetchone()
+            if row:
+                cursor.execute(
+                    "UPDATE jobs SET state = 'running', worker = ?,"
+                    " claimed = ?, heartbeat = ?, attempts = attempts + 1"
+                    " WHERE id = ?", (worker, now, now, row[0]))
+        if not row:
+            return None
+        return row[0], self.path(row[1]), self.path(row[2])
+
+    def heartbeat(self, worker, ids):
+        """ Update heartbeat of worker jobs, return those of ids still
+        claimed """
+        with self._write() as cursor:
+            cursor.execute("UPDATE jobs SET heartbeat = ? WHERE worker = ?"
+                           " AND state = 'running'", (time.time(), worker))
+            cursor.execute("SELECT id FROM jobs WHERE worker = ? AND"
+                           " state = 'running'", (worker,))
+            claimed = set(row[0] for row in cursor.fetchall())
+        return [job_id for job_id in ids if job_id in claimed]
+
+    def finish(self, worker, job_id, result):
+        """ Record simon_run Result of job, False if the claim was lost """
+        with self._write() as cursor:
+            cursor.execute(
+                "UPDATE jobs SET state = ?, outfile = ?, message = ?,"
+                " seconds = ? WHERE id = ? AND worker = ? AND"
+                " state = 'running'",
+                ('passed' if result.passed else 'failed',
+                 result.outfile and self._relative(result.outfile),
+                 result.message, result.seconds, job_id, worker))
+            return cursor.rowcount == 1
+
+    def release(self, worker, ids):
+        """ Queue unfinished jobs of a stopping worker again """
+        with self._write() as cursor:
+            for job_id in ids:
+                cursor.execute("UPDATE jobs SET state = 'queued', worker ="
+                               " NULL, attempts = attempts - 1 WHERE id = ?"
+                               " AND worker = ? AND state = 'running'",
+                               (job_id, worker))
+
+    def counts(self):
+        """ Return {state: number of jobs} """
+        counts = dict((state, 0) for state in STATES)
+        counts.update(self._db.execute(
+            "SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+        return counts